@@ -7,7 +7,13 @@ class Config:
     # --- ENVIRONMENT SETTINGS ---
     ENV = os.getenv("ENV", "STAGE").upper()
     BASE_URL = os.getenv("BASE_URL", "https://www.saucedemo.com")
-    TIMEOUT = int(os.getenv("TIMEOUT", 10))
+    TIMEOUT = int(os.getenv("TIMEOUT", "10"))
+    # Condition-based waits (BasePage): short probe for optional elements (cookie banner etc.)
+    WAIT_PROBE_TIMEOUT = float(os.getenv("WAIT_PROBE_TIMEOUT", "1.5"))
+    # Network idle / DOM quiescence: nothing happened for this long (ms)
+    WAIT_QUIET_MS = int(os.getenv("WAIT_QUIET_MS", "300"))
+    # Per-page element cache (BasePage.find): reuse located elements until navigation / staleness
+    ELEMENT_CACHE = os.getenv("ELEMENT_CACHE", "false").lower() == "true"
 
     # --- PLATFORM SELECTION ---
     # Options: 'web' (default), 'android', 'ios'
@@ -25,7 +31,25 @@ class Config:
     # --- SELENOID SETTINGS ---
     RECORD_VIDEO = os.getenv("RECORD_VIDEO", "on_failure").lower()
     SELENIUM_REMOTE_URL = os.getenv("SELENIUM_REMOTE_URL")
+
+    # --- DRIVER SESSION POOL (per xdist worker) ---
+    # DRIVER_POOL_SIZE=0 disables pooling (one fresh session per test).
+    # Remote sessions that record video (RECORD_VIDEO other than 'false') are never pooled:
+    # Selenoid finalizes the video only on quit. Set RECORD_VIDEO=false to get pool hits.
+    DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "1"))
+    DRIVER_POOL_MAX_USES = int(os.getenv("DRIVER_POOL_MAX_USES", "25"))
     
+    # --- API CLIENT (pooled HTTP session per worker) ---
+    API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+    API_TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+    # Retries cover connection errors only (sync and async alike): a 5xx/429 is never
+    # retried away, and a request that reached the server is never sent twice
+    API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+    API_BACKOFF_FACTOR = float(os.getenv("API_BACKOFF_FACTOR", "0.3"))
+    # Attachments: 'smart' (full on failure, preview otherwise) | 'full' | 'off'
+    API_ATTACH_MODE = os.getenv("API_ATTACH_MODE", "smart").lower()
+    API_ATTACH_PREVIEW_BYTES = int(os.getenv("API_ATTACH_PREVIEW_BYTES", "2048"))
+
     # --- DATABASE: NoSQL (ARANGO) ---
     ARANGO_URL = os.getenv("ARANGO_URL", "http://localhost:8529")
     ARANGO_DB = os.getenv("ARANGO_DB_NAME", "_system")
@@ -39,6 +63,18 @@ class Config:
     _PG_USER = os.getenv("POSTGRESQL_USER")
     _PG_PASS = os.getenv("POSTGRESQL_PASSWORD")
 
+    # Connection pool (per xdist worker)
+    SQL_POOL_MIN = int(os.getenv("SQL_POOL_MIN", "1"))
+    SQL_POOL_MAX = int(os.getenv("SQL_POOL_MAX", "5"))
+    # Threads beyond SQL_POOL_MAX wait this long for a free connection (seconds)
+    SQL_POOL_WAIT_TIMEOUT = int(os.getenv("SQL_POOL_WAIT_TIMEOUT", "30"))
+    # Idle connections are pinged only if unused for longer than this (seconds)
+    SQL_HEALTH_CHECK_INTERVAL = int(os.getenv("SQL_HEALTH_CHECK_INTERVAL", "30"))
+    # Test isolation: "off" (shared DB) | "template" (per-worker DB cloned from a seeded
+    # template, every test rolled back at teardown)
+    SQL_ISOLATION = os.getenv("SQL_ISOLATION", "off").lower()
+    SQL_TEMPLATE_DB = os.getenv("SQL_TEMPLATE_DB") # Default: <POSTGRESQL_DB>_template
+
     @property
     def POSTGRES_DSN(self):
         """
@@ -48,7 +84,14 @@ class Config:
         if not all([self._PG_HOST, self._PG_USER, self._PG_PASS, self._PG_DB]):
             return None
         
-        return f"postgresql://{self._PG_USER}:{self._PG_PASS}@{self._PG_HOST}:{self._PG_PORT}/{self._PG_DB}"
+        return self.postgres_dsn_for(self._PG_DB)
+
+    def postgres_dsn_for(self, database):
+        """Same server and credentials, different database (template / per-worker clones)."""
+        if not all([self._PG_HOST, self._PG_USER, self._PG_PASS, database]):
+            return None
+
+        return f"postgresql://{self._PG_USER}:{self._PG_PASS}@{self._PG_HOST}:{self._PG_PORT}/{database}"
 
     @staticmethod
     def is_remote():
@@ -1,24 +1,209 @@
 # pages/base_page.py:
 
+import time
+import uuid
 import logging
 import allure
+from contextlib import contextmanager
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from allure_commons.types import AttachmentType
 from config import Config
+from utilities.screenshot_policy import ScreenshotPolicy
+from utilities.wait_recorder import WaitRecorder
+from utilities.step_profiler import StepProfiler
+
+# Running, finite animations (infinite spinners would never "end")
+_RUNNING_ANIMATIONS_JS = """
+    const el = arguments[0];
+    if (!document.getAnimations) return 0;
+    const animations = el ? el.getAnimations({subtree: true}) : document.getAnimations();
+    return animations.filter(a => a.playState === 'running'
+        && !(a.effect && a.effect.getTiming().iterations === Infinity)).length;
+"""
+
+# Resolves once no DOM mutation happened for quietMs
+_DOM_QUIET_JS = """
+    const done = arguments[arguments.length - 1];
+    const quietMs = arguments[0], timeoutMs = arguments[1];
+    const start = performance.now();
+    let last = start;
+    const observer = new MutationObserver(() => { last = performance.now(); });
+    observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+    (function check() {
+        const now = performance.now();
+        if (now - last >= quietMs) { observer.disconnect(); return done(true); }
+        if (now - start >= timeoutMs) { observer.disconnect(); return done(false); }
+        setTimeout(check, Math.min(50, quietMs));
+    })();
+"""
+
+# Document loaded, no fetch/XHR in flight and no new resource entries for quietMs
+_NETWORK_IDLE_JS = """
+    const done = arguments[arguments.length - 1];
+    const quietMs = arguments[0], timeoutMs = arguments[1];
+    if (!window.__pendingRequests) {
+        window.__pendingRequests = {count: 0};
+        const pending = window.__pendingRequests;
+        const origFetch = window.fetch;
+        if (origFetch) {
+            window.fetch = function() {
+                pending.count++;
+                return origFetch.apply(this, arguments).finally(() => pending.count--);
+            };
+        }
+        const origSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function() {
+            pending.count++;
+            this.addEventListener('loadend', () => pending.count--, {once: true});
+            return origSend.apply(this, arguments);
+        };
+    }
+    const start = performance.now();
+    let lastCount = -1, lastChange = start;
+    (function check() {
+        const now = performance.now();
+        const count = performance.getEntriesByType('resource').length;
+        if (count !== lastCount || document.readyState !== 'complete' || window.__pendingRequests.count > 0) {
+            lastCount = count; lastChange = now;
+        }
+        if (now - lastChange >= quietMs) return done(true);
+        if (now - start >= timeoutMs) return done(false);
+        setTimeout(check, 50);
+    })();
+"""
+
+# Cached element check in ONE round trip: 0 = usable, 1 = detached/hidden, 2 = page navigated
+_CACHED_ELEMENT_JS = """
+    const el = arguments[0];
+    if (window.__basePageToken !== arguments[1]) return 2;
+    return el.isConnected && el.getClientRects().length > 0 ? 0 : 1;
+"""
+
+# Resolves several (By, value) locators at once; a document token marks the current page
+_FIND_MANY_JS = """
+    const locators = arguments[0];
+    function resolve(by, value) {
+        switch (by) {
+            case 'id': return document.getElementById(value);
+            case 'css selector': return document.querySelector(value);
+            case 'xpath': return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            case 'name': return document.getElementsByName(value)[0] || null;
+            case 'class name': return document.getElementsByClassName(value)[0] || null;
+            case 'tag name': return document.getElementsByTagName(value)[0] || null;
+            case 'link text': return Array.from(document.links).find(a => a.textContent.trim() === value) || null;
+            case 'partial link text': return Array.from(document.links).find(a => a.textContent.includes(value)) || null;
+        }
+        return null;
+    }
+    const visible = el => el && el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden';
+    window.__basePageToken = window.__basePageToken || arguments[1];
+    return {
+        token: window.__basePageToken,
+        elements: locators.map(([by, value]) => { const el = resolve(by, value); return visible(el) ? el : null; })
+    };
+"""
+
+# Native value setter (React/Vue value trackers notice the change) + input/change events
+_FILL_FORM_JS = """
+    const elements = arguments[0], values = arguments[1];
+    elements.forEach((el, i) => {
+        const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+            : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+        el.focus();
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, values[i]);
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        el.blur();
+    });
+"""
 
 class BasePage:
-    def __init__(self, driver):
+    def __init__(self, driver, cache_elements=None):
         self.driver = driver
         # BEST PRACTICE: Creates dynamic logger using Class name.
         # Ex: If using LoginPage, logs will show [LoginPage].
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Element cache (ELEMENT_CACHE): locator -> WebElement, valid for one document
+        self.cache_elements = Config.ELEMENT_CACHE if cache_elements is None else cache_elements
+        self._element_cache = {}
+        self._doc_token = None
+
+    # --- ELEMENT CACHE ---
+    def invalidate_cache(self):
+        self._element_cache.clear()
+        self._doc_token = None
 
+    def _cached(self, locator):
+        """A cached element, if still attached + visible on the same document (one round trip)."""
+        element = self._element_cache.get(locator)
+        if element is None:
+            return None
+        try:
+            state = self.driver.execute_script(_CACHED_ELEMENT_JS, element, self._doc_token)
+        except WebDriverException: # StaleElementReference & co.
+            state = 1
+        if state == 0:
+            return element
+        if state == 2:
+            self.invalidate_cache() # Navigation: every element of the old page is gone
+        else:
+            self._element_cache.pop(locator, None)
+        return None
+
+    def _remember(self, locator, element):
+        if self._doc_token is None:
+            # Marks the current document; a navigation drops the mark and so the whole cache
+            self._doc_token = self.driver.execute_script(
+                "window.__basePageToken = window.__basePageToken || arguments[0]; return window.__basePageToken;",
+                uuid.uuid4().hex
+            )
+        self._element_cache[locator] = element
+
+    @StepProfiler.timed("find", lambda self, locator, *a, **k: str(locator))
     def find(self, locator):
-        return WebDriverWait(self.driver, Config.TIMEOUT).until(
+        if self.cache_elements:
+            element = self._cached(locator)
+            if element is not None:
+                return element
+
+        element = WebDriverWait(self.driver, Config.TIMEOUT).until(
             EC.visibility_of_element_located(locator)
         )
+        if self.cache_elements:
+            self._remember(locator, element)
+        return element
+
+    @StepProfiler.timed("find", lambda self, locators, *a, **k: f"{len(locators)} locators")
+    def find_many(self, locators, timeout=None):
+        """
+        Resolves several locators in ONE execute_script round trip (retried until all are visible).
+        Returns the elements in the same order.
+        """
+        locators = list(locators)
+        timeout = Config.TIMEOUT if timeout is None else timeout
+        payload = [[by, value] for by, value in locators]
+        last = {}
+
+        def resolve(driver):
+            result = driver.execute_script(_FIND_MANY_JS, payload, uuid.uuid4().hex)
+            last.update(result)
+            return result if all(el is not None for el in result["elements"]) else False
+
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(resolve)
+        except TimeoutException:
+            missing = [loc for loc, el in zip(locators, last.get("elements") or [None] * len(locators)) if el is None]
+            raise TimeoutException(f"Elements not visible: {missing}")
+
+        if self.cache_elements:
+            if self._doc_token != result["token"]:
+                self.invalidate_cache()
+                self._doc_token = result["token"]
+            self._element_cache.update(zip(locators, result["elements"]))
+        return result["elements"]
 
+    @StepProfiler.timed("click", lambda self, locator, *a, **k: str(locator))
     @allure.step("Clicking on: {locator}")
     def click(self, locator):
         self.find(locator).click()
@@ -26,6 +211,7 @@ class BasePage:
         # --- LOGGING ---
         self.logger.info(f"CLICKED: {locator}")
 
+    @StepProfiler.timed("send_text", lambda self, locator, *a, **k: str(locator))
     @allure.step("Typing text: {text}")
     def send_text(self, locator, text):
         element = self.find(locator)
@@ -38,16 +224,132 @@ class BasePage:
         log_text = "*****" if "password" in str(locator).lower() else text
         self.logger.info(f"TYPED: '{log_text}' -> {locator}")
 
+    # --- WAIT TOOLKIT ---
+    # Every wait returns as soon as its condition holds; the real duration is recorded
+    # (WaitRecorder -> "Wait Timings" attachment per test, totals per run).
+
+    def _record_wait(self, name, started, ok, detail=""):
+        duration_ms = (time.perf_counter() - started) * 1000
+        WaitRecorder.for_driver(self.driver).record(name, duration_ms, ok, detail)
+        self.logger.debug(f"WAIT {name} ({detail}): {duration_ms:.0f}ms {'ok' if ok else 'timeout'}")
+
+    @contextmanager
+    def _no_implicit_wait(self):
+        """Absence checks and probes must not block on the driver's implicit wait."""
+        self.driver.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            self.driver.implicitly_wait(Config.TIMEOUT)
+
+    def _run_async_wait(self, name, script, quiet_ms, timeout):
+        quiet_ms = Config.WAIT_QUIET_MS if quiet_ms is None else quiet_ms
+        timeout = Config.TIMEOUT if timeout is None else timeout
+        started = time.perf_counter()
+        try:
+            ok = bool(self.driver.execute_async_script(script, quiet_ms, int(timeout * 1000)))
+        except WebDriverException as e:
+            self.logger.warning(f"WAIT {name} could not run: {e}")
+            ok = False
+        self._record_wait(name, started, ok, f"quiet={quiet_ms}ms")
+        return ok
+
+    @StepProfiler.timed("wait", lambda self, locator, *a, **k: str(locator))
+    def probe(self, locator, timeout=None):
+        """
+        Short look for an OPTIONAL element (cookie banner, promo pop-up).
+        Returns the visible element or None after WAIT_PROBE_TIMEOUT, never raises.
+        """
+        timeout = Config.WAIT_PROBE_TIMEOUT if timeout is None else timeout
+        started = time.perf_counter()
+        element = None
+        with self._no_implicit_wait():
+            try:
+                element = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                    EC.visibility_of_element_located(locator)
+                )
+            except TimeoutException:
+                pass
+        self._record_wait("probe", started, element is not None, str(locator))
+        return element
+
+    @StepProfiler.timed("wait", lambda self, locator, *a, **k: str(locator))
+    def wait_until_gone(self, locator, timeout=None):
+        """Element absent or accepted (removed / hidden), e.g. a banner after its button was clicked."""
+        timeout = Config.TIMEOUT if timeout is None else timeout
+        started = time.perf_counter()
+        ok = True
+        with self._no_implicit_wait():
+            try:
+                WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                    EC.invisibility_of_element_located(locator)
+                )
+            except TimeoutException:
+                ok = False
+        self._record_wait("gone", started, ok, str(locator))
+        return ok
+
+    @StepProfiler.timed("wait")
+    def wait_for_animations(self, locator=None, timeout=None):
+        """Finite CSS/Web animations (of the element subtree, or the whole document) have ended."""
+        timeout = Config.TIMEOUT if timeout is None else timeout
+        started = time.perf_counter()
+        ok = True
+        try:
+            element = self.find(locator) if locator else None
+            WebDriverWait(self.driver, timeout, poll_frequency=0.05).until(
+                lambda d: d.execute_script(_RUNNING_ANIMATIONS_JS, element) == 0
+            )
+        except TimeoutException:
+            ok = False
+        self._record_wait("animations", started, ok, str(locator) if locator else "document")
+        return ok
+
+    @StepProfiler.timed("wait")
+    def wait_for_dom_quiet(self, quiet_ms=None, timeout=None):
+        """No DOM mutation for quiet_ms (client-side rendering settled)."""
+        return self._run_async_wait("dom_quiet", _DOM_QUIET_JS, quiet_ms, timeout)
+
+    @StepProfiler.timed("wait")
+    def wait_for_network_idle(self, quiet_ms=None, timeout=None):
+        """Document loaded, no fetch/XHR in flight, no new resources for quiet_ms."""
+        return self._run_async_wait("network_idle", _NETWORK_IDLE_JS, quiet_ms, timeout)
+
+    def wait_for_page_ready(self, timeout=None):
+        """Navigation settled: network idle, then running animations finished."""
+        network_ok = self.wait_for_network_idle(timeout=timeout)
+        animations_ok = self.wait_for_animations(timeout=timeout)
+        return network_ok and animations_ok
+
+    @StepProfiler.timed("send_text", lambda self, fields, *a, **k: f"{len(fields)} fields")
+    def fill_form(self, fields):
+        """
+        Sets several inputs in ONE scripted call (still firing input/change events):
+            self.fill_form({USERNAME_INPUT: "user", PASSWORD_INPUT: "secret"})
+        Lookup (find_many) + fill + screenshot instead of find/clear/send_keys per field.
+        """
+        items = list(fields.items())
+        # Password masking in the report and logs
+        masked = [(loc, "*****" if "password" in str(loc).lower() else text) for loc, text in items]
+
+        with allure.step(f"Filling form: {', '.join(f'{loc[1]}={text}' for loc, text in masked)}"):
+            elements = self.find_many([loc for loc, _ in items])
+            self.driver.execute_script(_FILL_FORM_JS, elements, [str(text) for _, text in items])
+            self.take_screenshot(f"Form Filled ({len(items)} fields)")
+
+        for locator, log_text in masked:
+            self.logger.info(f"TYPED: '{log_text}' -> {locator}")
+
     def get_url(self):
         url = self.driver.current_url
         self.logger.info(f"URL RETRIEVED: {url}")
         return url
 
     # --- HELPER METHOD ---
+    @StepProfiler.timed("screenshot", lambda self, name, *a, **k: name)
     def take_screenshot(self, name):
-        """Centralized function that attaches a screenshot to the report"""
-        allure.attach(
-            self.driver.get_screenshot_as_png(),
-            name=name,
-            attachment_type=AttachmentType.PNG
-        )
\ No newline at end of file
+        """
+        Centralized function that attaches a screenshot to the report.
+        What actually happens is decided by SCREENSHOT_MODE (always / on_failure / sampled / off).
+        """
+        ScreenshotPolicy.for_driver(self.driver).capture(name)
\ No newline at end of file
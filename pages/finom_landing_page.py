@@ -1,5 +1,4 @@
 import allure
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -20,19 +19,20 @@ class FinomLandingPage(BasePage):
 
     @allure.step("Handle cookie pop-up")
     def handle_cookies(self):
-        try:
-            # Click if cookie button appears, otherwise continue after 10 seconds (prevent test failure)
-            WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located(FinomLandingLocators.COOKIE_ACCEPT_BUTTON)
-            ).click()
-            time.sleep(0.5)
-            self.logger.info("Cookie banner accepted.")
-            self.take_screenshot("Cookie Accepted")
-            print("Cookie banner closed.")
-        except Exception:
+        # Short probe (WAIT_PROBE_TIMEOUT) instead of a 10s wait when the banner never shows up
+        accept_button = self.probe(FinomLandingLocators.COOKIE_ACCEPT_BUTTON)
+        if accept_button is None:
             self.logger.info("Cookie banner did not appear.")
             self.take_screenshot("Cookie Not Visible")
             print("Cookie banner did not appear, continuing.")
+            return
+
+        accept_button.click()
+        # Continue as soon as the banner is gone (no fixed sleep)
+        self.wait_until_gone(FinomLandingLocators.COOKIE_ACCEPT_BUTTON)
+        self.logger.info("Cookie banner accepted.")
+        self.take_screenshot("Cookie Accepted")
+        print("Cookie banner closed.")
 
     @allure.step("Select country: {country_name}")
     def select_country(self, country_name: str):
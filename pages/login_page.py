@@ -21,10 +21,10 @@ class LoginPage(BasePage):
 
     @allure.step("Performing login operation")
     def login(self, username, password):
-        # Since send_text and click methods trigger the logger inside BasePage,
+        # Since fill_form and click methods trigger the logger inside BasePage,
         # there is no need to write extra logs here.
-        self.send_text(self.USERNAME_INPUT, username)
-        self.send_text(self.PASSWORD_INPUT, password)
+        # Both fields in one lookup + one scripted fill instead of find/clear/send_keys each
+        self.fill_form({self.USERNAME_INPUT: username, self.PASSWORD_INPUT: password})
         self.click(self.LOGIN_BTN)
 
     def get_error_message(self):
@@ -1,9 +1,11 @@
 # seed.py:
 
+import sys
 from arango import ArangoClient
 from config import Config
+from utilities.data_seeder import DataSeeder
 
-def seed_database():
+def seed_database(force=False):
     # 1. Bağlantı
     client = ArangoClient(hosts=Config.ARANGO_URL)
     sys_db = client.db('_system', username=Config.ARANGO_USER, password=Config.ARANGO_PASS)
@@ -15,29 +17,11 @@ def seed_database():
     # Hedef DB'ye bağlan
     db = client.db(Config.ARANGO_DB, username=Config.ARANGO_USER, password=Config.ARANGO_PASS)
 
-    # Collection oluştur (Tablo karşılığı)
-    col_name = "error_codes"
-    if db.has_collection(col_name):
-        db.delete_collection(col_name) # Temiz başlangıç
-    
-    error_col = db.create_collection(col_name)
-
-    # Verileri Ekle
-    data = [
-        {
-            "code": "LOCKED",
-            "message_en": "Epic sadface: Sorry, this user has been locked out.",
-            "message_tr": "Üzgünüz, bu kullanıcı kilitlendi."
-        },
-        {
-            "code": "INVALID",
-            "message_en": "Epic sadface: Username and password do not match any user in this service",
-            "message_tr": "Kullanıcı adı veya şifre hatalı."
-        }
-    ]
-    
-    error_col.insert_many(data)
-    print(f"✅ Başarılı: {len(data)} adet hata kodu ArangoDB '{Config.ARANGO_DB}' veritabanına eklendi.")
+    # 2. Veri seti: seed_data/error_codes.json (import_bulk ile toplu yükleme)
+    # İçerik hash'i daha önce yüklenenle aynıysa collection'a dokunulmaz.
+    loaded = DataSeeder.seed_arango_collection(db, "error_codes", "error_codes.json", force=force)
+    if loaded:
+        print(f"✅ Başarılı: {loaded} adet hata kodu ArangoDB '{Config.ARANGO_DB}' veritabanına eklendi.")
 
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    seed_database(force="--force" in sys.argv)
@@ -1,7 +1,17 @@
+import argparse
 import psycopg2
 from config import Config
+from utilities.data_seeder import DataSeeder
 
-def seed_postgres():
+USERS_DDL = """
+    CREATE TABLE users (
+        id SERIAL PRIMARY KEY,
+        username VARCHAR(50) NOT NULL,
+        role VARCHAR(20) NOT NULL
+    );
+"""
+
+def seed_postgres(dataset="users.csv", force=False):
     print("🌱 PostgreSQL Tohumlanıyor...")
     
     # 1. Config'den DSN al (Zero Trust yapısını kullanıyoruz)
@@ -18,24 +28,12 @@ def seed_postgres():
         # Veya docker exec ile çalıştıracağız. Şimdilik kodun sağlamlığına güvenelim.
         
         conn = psycopg2.connect(dsn.replace("postgres_container", "localhost")) 
-        cursor = conn.cursor()
-
-        # 2. Temizlik ve Tablo Oluşturma
-        cursor.execute("DROP TABLE IF EXISTS users;")
-        cursor.execute("""
-            CREATE TABLE users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) NOT NULL,
-                role VARCHAR(20) NOT NULL
-            );
-        """)
 
-        # 3. Veri Ekleme
-        cursor.execute("INSERT INTO users (username, role) VALUES (%s, %s)", ("onur_admin", "admin"))
-        cursor.execute("INSERT INTO users (username, role) VALUES (%s, %s)", ("test_user", "guest"))
-        
-        conn.commit()
-        print("✅ Başarılı: 'users' tablosu oluşturuldu ve 2 kullanıcı eklendi.")
+        # 2. Veri seti: seed_data/<dataset> (CSV -> COPY, JSON -> execute_values)
+        # İçerik + şema hash'i değişmediyse tablo yeniden oluşturulmaz.
+        loaded = DataSeeder.seed_postgres_table(conn, "users", USERS_DDL, dataset, force=force)
+        if loaded:
+            print(f"✅ Başarılı: 'users' tablosu oluşturuldu ve {loaded} kullanıcı eklendi.")
         
         conn.close()
 
@@ -44,4 +42,11 @@ def seed_postgres():
         print("İpucu: Eğer localden çalıştırıyorsan .env dosyasındaki HOST'u geçici olarak 'localhost' yapman gerekebilir.")
 
 if __name__ == "__main__":
-    seed_postgres()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="PostgreSQL seed")
+    parser.add_argument("--dataset", default="users.csv", help="seed_data/ altındaki CSV veya JSON dosyası")
+    parser.add_argument("--users", type=int, help="Yük testleri için N kullanıcılık sentetik veri seti üret (ör. 100000)")
+    parser.add_argument("--force", action="store_true", help="Hash aynı olsa bile yeniden yükle")
+    args = parser.parse_args()
+
+    dataset = DataSeeder.generate_users_csv(args.users) if args.users else args.dataset
+    seed_postgres(dataset=dataset, force=args.force)
@@ -107,6 +107,9 @@ def build_arm_native_recorder(target_image_name):
     print("   🧹 Temporary files cleaned.")
 
 def main():
+    # Imported here, after load_dotenv(): CAPACITY_* settings are read at import time
+    from utilities.capacity_planner import CapacityPlanner, CapacitySampler
+
     # 0. Docker Health Check
     if not is_docker_running():
         print("❌ CRITICAL ERROR: Docker is not running! Please start Docker Desktop.")
@@ -125,7 +128,6 @@ def main():
         print("✅ Detection: ARM Architecture (Apple Silicon)")
         browsers_json = "browsers_arm.json"
         video_image = "selenoid/video-recorder:arm-native"
-        auto_worker_count = "4"
         
         if not check_image_exists(video_image):
             build_arm_native_recorder(video_image)
@@ -148,7 +150,6 @@ def main():
         print("✅ Detection: Intel/AMD Architecture")
         browsers_json = "browsers_intel.json"
         video_image = "selenoid/video-recorder:latest-release"
-        auto_worker_count = "2"
         
         print("   📦 Checking Intel Browser Images...")
 
@@ -168,8 +169,26 @@ def main():
         print(f"❌ ERROR: Architecture not recognized ({arch}).")
         sys.exit(1)
 
-    # --- 2. EXECUTION ---
+    # --- 2. CAPACITY PLAN ---
+    # Worker count and Selenoid -limit are derived together from cores, free memory and
+    # the per-session footprint (history of previous runs / probe / defaults).
+    planner = CapacityPlanner(os.path.join("config", browsers_json), video_image)
+    plan = planner.plan()
+    auto_worker_count = str(plan["workers"])
+    print(
+        f"📐 Capacity: {plan['cores']} cores | {plan['available_mb']}MB free | "
+        f"session ~{plan['session_mb']}MB / {plan['session_cpu']} CPU ({plan['footprint_source']}) | "
+        f"bound by {plan['bound_by']}"
+        + (f" | history {plan['history_adjustment']:+d}" if plan["history_adjustment"] else "")
+    )
+
+    # --- 3. EXECUTION ---
     final_worker_count = os.getenv("WORKER_COUNT", auto_worker_count)
+    if final_worker_count != auto_worker_count:
+        # Manual worker count: keep Selenoid's limit in step with it
+        plan["workers"] = int(final_worker_count)
+        plan["selenoid_limit"] = plan["workers"] * max(1, planner.pool_size)
+    selenoid_limit = os.getenv("SELENOID_LIMIT", str(plan["selenoid_limit"]))
     
     # --- CLEANUP POLICY ---
     is_ci = os.getenv("CI", "false").lower() == "true"
@@ -187,11 +206,16 @@ def main():
             print(f"   ⚠️ MANUAL SETTING: Worker count set to {final_worker_count}.")
         else:
             print(f"   ⚡ Auto Worker: {final_worker_count}")
+        print(f"   🚦 Selenoid Limit : {selenoid_limit}")
         
         env = os.environ.copy()
         env["BROWSERS_JSON"] = browsers_json
         env["VIDEO_RECORDER_IMAGE"] = video_image
         env["WORKER_COUNT"] = final_worker_count
+        env["SELENOID_LIMIT"] = selenoid_limit
+
+        # Utilization during the run -> history for the next plan
+        sampler = CapacitySampler(plan["cores"], plan["available_mb"])
         
         exit_code = 1 # Default error code
         user_aborted = False # Track user interruption
@@ -207,6 +231,7 @@ def main():
             subprocess.run(force_clean_cmd, shell=True) # nosec
             
             print("🎬 Starting Containers...")
+            sampler.start()
             result = subprocess.run(
                 ["docker-compose", "up", "--build", "--exit-code-from", "pytest-tests"], 
                 env=env
@@ -226,6 +251,15 @@ def main():
             print(f"❌ Error: {e}")
             exit_code = 1
         finally:
+            sampler.stop()
+            if sampler.samples:
+                run_summary = sampler.summary(plan)
+                CapacityPlanner.append_history(run_summary)
+                print(
+                    f"📈 Utilization: CPU avg {run_summary['avg_cpu_ratio']:.0%} / peak {run_summary['peak_cpu_ratio']:.0%} | "
+                    f"memory peak {run_summary['peak_mem_ratio']:.0%} -> {CapacityPlanner.HISTORY_FILE}"
+                )
+
             # --- CLEANUP LOGIC ---
             should_cleanup = True # Default
 
@@ -1,14 +1,23 @@
 import pytest
 import allure
 import logging
+import os
 import uuid
+import time
 from config import Config
 from utilities.db_client import DBClient
 from utilities.sql_client import SQLClient 
+from utilities.db_isolation import DBIsolation
+from utilities.data_seeder import DataSeeder
 from utilities.driver_factory import DriverFactory
 from utilities.video_manager import VideoManager
-from utilities.ai_debugger import AIDebugger
-from utilities.report_helper import ReportHelper
+from utilities.ai_analysis_queue import AIAnalysisQueue
+from utilities.screenshot_policy import ScreenshotPolicy
+from utilities.wait_recorder import WaitRecorder
+from utilities.step_profiler import StepProfiler
+from utilities.api_client import APIClient
+from utilities.figma_client import FigmaClient
+from utilities.allure_results import AllureResults
 
 logger = logging.getLogger("Conftest")
 logging.getLogger("selenium").setLevel(logging.WARNING)
@@ -25,9 +34,22 @@ def db_client():
     yield client
     client.close()
 
+def _seed_sql_template(conn):
+    from seed_postgres import USERS_DDL
+    DataSeeder.seed_postgres_table(conn, "users", USERS_DDL, "users.csv")
+
 @pytest.fixture(scope="session")
 def sql_client():
-    client = SQLClient()
+    isolated = DBIsolation.is_enabled()
+    dsn = None
+    if isolated:
+        # SQL_ISOLATION=template: this worker gets its own clone of the seeded template DB
+        try:
+            dsn = DBIsolation.prepare_worker_db(_seed_sql_template)
+        except Exception as e:
+            pytest.skip(f"⚠️ Unable to prepare isolated PostgreSQL database! SQL-dependent tests are skipped. ({e})")
+
+    client = SQLClient(dsn=dsn)
     
     # SHIELD: If no connection, skip the test (SKIP)
     if not client.is_connected():
@@ -35,6 +57,27 @@ def sql_client():
         
     yield client
     client.close()
+    if isolated:
+        DBIsolation.drop_worker_db()
+
+@pytest.fixture(scope="function")
+def sql_db(sql_client):
+    """
+    sql_client for tests that mutate data: with SQL_ISOLATION=template every change
+    is rolled back at teardown, so these tests can run fully in parallel.
+    """
+    if not DBIsolation.is_enabled():
+        yield sql_client
+        return
+
+    started = time.perf_counter()
+    with sql_client.isolated():
+        setup_ms = (time.perf_counter() - started) * 1000
+        try:
+            yield sql_client
+        finally:
+            rollback_started = time.perf_counter()
+    DBIsolation.record_test(setup_ms, (time.perf_counter() - rollback_started) * 1000)
 
 @pytest.fixture(scope="function")
 def driver(request):
@@ -47,7 +90,9 @@ def driver(request):
     driver_instance = None
     
     try:
-        driver_instance = DriverFactory.get_driver(Config, execution_id)
+        # Leases a warm session from the worker pool (falls back to a fresh one on a miss)
+        driver_instance = DriverFactory.acquire_driver(Config, execution_id)
+        execution_id = driver_instance.execution_id
         driver_instance.implicitly_wait(Config.TIMEOUT)
         yield driver_instance
     except Exception as e:
@@ -55,10 +100,17 @@ def driver(request):
         yield None
 
     if driver_instance:
+        teardown_step = StepProfiler.begin("driver fixture teardown", "teardown")
         is_failed = False
         node = request.node
         if getattr(node, 'rep_call', None) and node.rep_call.failed:
             is_failed = True
+
+        # Flush buffered frames on failure + report taken vs flushed
+        ScreenshotPolicy.for_driver(driver_instance).finish(is_failed)
+        WaitRecorder.for_driver(driver_instance).finish()
+
+        if is_failed:
             try:
                 allure.attach(driver_instance.get_screenshot_as_png(), name="Error_Screenshot", attachment_type=allure.attachment_type.PNG)
             except Exception:
@@ -80,7 +132,9 @@ def driver(request):
         except Exception as e:
             logger.error(f"Teardown Error: {e}")
 
-        driver_instance.quit()
+        # Back to the pool (reset) or quit (recorded / worn-out / broken session)
+        DriverFactory.release_driver(driver_instance, Config)
+        StepProfiler.end(teardown_step)
 
         if video_name:
             mode = Config.RECORD_VIDEO.lower()
@@ -95,9 +149,45 @@ def driver(request):
             action = "keep" if should_keep else "delete"
             VideoManager.log_decision(node_id, test_name, session_id, container_id, video_name, action)
 
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "time_budget(seconds, mode='warn'): warn or fail when setup + call exceed the budget"
+    )
+    # Post-run attachments (AI analyses, step timings) go where allure-pytest writes: --alluredir
+    AllureResults.configure(getattr(config.option, "allure_report_dir", None))
+    # Master (or single process): drop the profile parts of the previous run before workers start
+    if not hasattr(config, 'workerinput'):
+        StepProfiler.reset_run()
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    # '-n auto' (pytest.ini) follows the capacity plan of start_tests.py when it is set
+    worker_count = os.getenv("WORKER_COUNT")
+    return int(worker_count) if worker_count and worker_count.isdigit() else None
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    StepProfiler.start_test(item)
+
+def pytest_runtest_logfinish(nodeid, location):
+    StepProfiler.finish_test()
+    APIClient.remove_spooled_bodies()
+
 def pytest_sessionfinish(session, exitstatus):
+    # Every worker owns its own pool
+    DriverFactory.shutdown_pool()
+    # Every worker drains its own AI queue (its result files are already written)
+    AIAnalysisQueue.drain_and_attach()
+    APIClient.close_session()
+    FigmaClient.report_cache_stats()
+    FigmaClient.close_session()
+    DBIsolation.log_summary()
+    WaitRecorder.log_run_summary()
+    StepProfiler.flush()
+
     if hasattr(session.config, 'workerinput'):
         return
+    StepProfiler.merge_run()
     VideoManager.post_process_cleanup()
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -107,25 +197,13 @@ def pytest_runtest_makereport(item, call):
     setattr(item, "rep_" + rep.when, rep)
 
     # --- DEBUGGER INTEGRATION ---
+    # Queued, not awaited: LLM latency must not block the worker.
+    # Results are attached to the report in pytest_sessionfinish.
     if rep.when == "call" and rep.failed:
         long_repr = str(rep.longrepr)
         error_extract = long_repr[-1500:] if len(long_repr) > 1500 else long_repr
-        
-        # 1. Get Analysis (Logic Layer)
-        ai_analysis_md = AIDebugger.analyze_error(error_extract)
-        
-        if ai_analysis_md is None:
-            return 
-
-        # 2. Convert to HTML
-        styled_html = ReportHelper.convert_to_html(
-            ai_analysis_md, 
-            model_name=AIDebugger.CURRENT_MODEL_NAME
-        )
-        
-        # 3. Report
-        allure.attach(
-            styled_html, 
-            name="🤖 AI Analysis Report", 
-            attachment_type=allure.attachment_type.HTML
-        )
\ No newline at end of file
+        AIAnalysisQueue.submit(item.nodeid, error_extract)
+
+    # Time budget (setup + call): warning or failure depending on the mode
+    if rep.when == "call":
+        StepProfiler.apply_budget(item, rep)
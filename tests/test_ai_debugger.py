@@ -0,0 +1,66 @@
+import pytest
+import allure
+from utilities.ai_debugger import AIDebugger
+
+TRACEBACK = """
+self = <tests.test_login.TestLogin object at {addr}>
+driver = <selenium.webdriver.remote.webdriver.WebDriver (session="{session}")>
+
+    def test_login[{params}](self, driver):
+>       assert page.error_text() == "Epic sadface: Username is required"
+E       AssertionError: assert 'Welcome' == 'Epic sadface: Username is required'
+
+tests/test_login.py:{line}: AssertionError
+  File "/root/package/pages/login_page.py", line {inner_line}, in error_text
+Screenshot saved: {tmp}/failure.png
+{ts} [INFO] Wait 'page_ready' finished in {took}
+"""
+
+def render(**overrides):
+    values = {
+        "addr": "0x7f3a2c1b9d90",
+        "session": "4f1c2a9e8b7d6c5e4f3a2b1c0d9e8f7a",
+        "params": "standard_user-secret_sauce",
+        "line": "42",
+        "inner_line": "17",
+        "tmp": "/tmp/pytest-of-root/pytest-12/test_login0", # nosec
+        "ts": "2026-10-18 09:15:02.123",
+        "took": "1.84s",
+    }
+    values.update(overrides)
+    return TRACEBACK.format(**values)
+
+@allure.feature("AI Debugger")
+class TestFailureSignature:
+
+    @allure.story("Volatile details do not change the signature")
+    @pytest.mark.parametrize("overrides", [
+        {"addr": "0x7f00deadbeef"},
+        {"session": "0a1b2c3d4e5f60718293a4b5c6d7e8f9"},
+        {"params": "problem_user-secret_sauce"},
+        {"line": "57", "inner_line": "23"},
+        {"tmp": "/tmp/pytest-of-ci/pytest-3/test_login1"}, # nosec
+        {"ts": "2026-10-19 23:59:59.999"},
+        {"took": "312ms"},
+    ])
+    def test_volatile_details_are_ignored(self, overrides):
+        assert AIDebugger.failure_signature(render(**overrides)) == AIDebugger.failure_signature(render())
+
+    @allure.story("All volatile details at once")
+    def test_two_runs_of_the_same_failure_match(self):
+        other_run = render(
+            addr="0x55d1e0c0ffee", session="ffeeddccbbaa99887766554433221100", params="performance_glitch_user-x",
+            line="44", inner_line="18", tmp="/tmp/pytest-of-agent/pytest-99/test_login2", # nosec
+            ts="2027-01-01 00:00:00", took="0.2s",
+        )
+        assert AIDebugger.failure_signature(other_run) == AIDebugger.failure_signature(render())
+
+    @allure.story("A different assertion is a different failure")
+    def test_different_assertion_messages_differ(self):
+        other = render().replace("assert 'Welcome'", "assert 'Locked out'")
+        assert AIDebugger.failure_signature(other) != AIDebugger.failure_signature(render())
+
+    @allure.story("A different exception is a different failure")
+    def test_different_exception_type_differs(self):
+        other = render().replace("AssertionError", "TimeoutException")
+        assert AIDebugger.failure_signature(other) != AIDebugger.failure_signature(render())
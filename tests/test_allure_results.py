@@ -0,0 +1,58 @@
+import pytest
+import allure
+from utilities.allure_results import AllureResults
+
+def entry(name, stop, path):
+    return (name, stop, path)
+
+@allure.feature("Allure Results")
+class TestAllureResults:
+
+    @allure.story("pytest nodeid -> Allure fullName")
+    @pytest.mark.parametrize("node_id, full_name", [
+        ("tests/test_login.py::test_login", "tests.test_login#test_login"),
+        ("tests/test_login.py::TestLogin::test_x", "tests.test_login.TestLogin#test_x"),
+        ("tests/test_login.py::TestLogin::test_x[p1-p2]", "tests.test_login.TestLogin#test_x"),
+        ("tests/test_api.py::TestAPI::test_get[https://x/y::z]", "tests.test_api.TestAPI#test_get"),
+        ("tests/ui/test_cart.py::TestCart::test_add[1]", "tests.ui.test_cart.TestCart#test_add"),
+        ("test_root.py::test_a", "test_root#test_a"),
+    ])
+    def test_node_id_to_full_name(self, node_id, full_name):
+        assert AllureResults.node_id_to_full_name(node_id) == full_name
+
+    @allure.story("Same test name in two modules never crosses over")
+    def test_lookup_keeps_modules_apart(self):
+        index = {
+            "tests.test_login.TestLogin#test_x": [entry("test_x", 1, "login.json")],
+            "tests.test_cart.TestLogin#test_x": [entry("test_x", 2, "cart.json")],
+        }
+        assert AllureResults.lookup(index, "tests/test_login.py::TestLogin::test_x") == "login.json"
+        assert AllureResults.lookup(index, "tests/test_cart.py::TestLogin::test_x") == "cart.json"
+        assert AllureResults.lookup(index, "tests/test_other.py::TestLogin::test_x") is None
+
+    @allure.story("Parametrized tests match on the exact name")
+    def test_lookup_parametrized(self):
+        index = {"tests.test_login.TestLogin#test_x": [
+            entry("test_x[a]", 1, "a.json"),
+            entry("test_x[b]", 2, "b.json"),
+        ]}
+        assert AllureResults.lookup(index, "tests/test_login.py::TestLogin::test_x[a]") == "a.json"
+        assert AllureResults.lookup(index, "tests/test_login.py::TestLogin::test_x[b]") == "b.json"
+        assert AllureResults.lookup(index, "tests/test_login.py::TestLogin::test_x[c]") is None
+
+    @allure.story("Params containing '::' keep their full name")
+    def test_lookup_params_with_separator(self):
+        index = {"tests.test_api.TestAPI#test_get": [entry("test_get[https://x/y::z]", 1, "get.json")]}
+        assert AllureResults.lookup(index, "tests/test_api.py::TestAPI::test_get[https://x/y::z]") == "get.json"
+
+    @allure.story("Reruns: the latest result wins")
+    def test_lookup_latest_rerun(self):
+        index = {"tests.test_login#test_a": [entry("test_a", 5, "old.json"), entry("test_a", 9, "new.json")]}
+        assert AllureResults.lookup(index, "tests/test_login.py::test_a") == "new.json"
+
+    @allure.story("Renamed (@allure.title) results match only when unambiguous")
+    def test_lookup_title_fallback(self):
+        single = {"tests.test_login#test_a": [entry("Login works", 1, "titled.json")]}
+        several = {"tests.test_login#test_a": [entry("Title A", 1, "a.json"), entry("Title B", 2, "b.json")]}
+        assert AllureResults.lookup(single, "tests/test_login.py::test_a") == "titled.json"
+        assert AllureResults.lookup(several, "tests/test_login.py::test_a") is None
@@ -1,8 +1,9 @@
 # tests/test_api.py:
 
+import asyncio
 import pytest
 import allure
-from utilities.api_client import APIClient
+from utilities.api_client import APIClient, AsyncAPIClient
 
 # Using JSONPlaceholder instead of Reqres as it is more stable
 API_BASE_URL = "https://jsonplaceholder.typicode.com"
@@ -11,7 +12,7 @@ API_BASE_URL = "https://jsonplaceholder.typicode.com"
 class TestAPI:
 
     def setup_method(self):
-        # Initialize Client before each test
+        # Initialize Client before each test (cheap: the pooled HTTP session is shared per worker)
         self.client = APIClient(API_BASE_URL)
 
     @allure.story("Fetch User List (GET)")
@@ -58,4 +59,21 @@ class TestAPI:
             assert json_response["body"] == body
             assert json_response["userId"] == userId
             assert "id" in json_response
-            print(f"\n[API SUCCESS] Post created ID: {json_response['id']}")
\ No newline at end of file
+            print(f"\n[API SUCCESS] Post created ID: {json_response['id']}")
+
+    @allure.story("Fetch Posts Concurrently (Async GET)")
+    def test_get_posts_concurrently(self):
+        pytest.importorskip("httpx")
+        post_ids = range(1, 11)
+
+        async def fetch_all():
+            async with AsyncAPIClient(API_BASE_URL) as client:
+                return await client.gather(*(client.get(f"/posts/{post_id}") for post_id in post_ids))
+
+        with allure.step(f"Sending {len(post_ids)} GET /posts/{{id}} requests concurrently"):
+            responses = asyncio.run(fetch_all())
+
+        with allure.step("Verifying every response"):
+            assert all(r.status_code == 200 for r in responses)
+            assert [r.json()["id"] for r in responses] == list(post_ids), "Responses are out of order!"
+            print(f"\n[API SUCCESS] {len(responses)} posts fetched concurrently")
@@ -0,0 +1,66 @@
+import json
+import threading
+import pytest
+import allure
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utilities.api_benchmark import APIBenchmark
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """Offline stand-in for the JSONPlaceholder endpoints used by the API suite."""
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.startswith("/posts/"):
+            post_id = int(self.path.rsplit("/", 1)[-1])
+            self._send_json(200, {"id": post_id, "userId": 1, "title": f"Post {post_id}", "body": "stub"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self._send_json(201, {**payload, "id": 101})
+
+    def log_message(self, format, *args):
+        pass # Keep the console clean under load
+
+@pytest.fixture(scope="module")
+def stub_api():
+    # Port 0: the OS picks a free port (safe with parallel xdist workers)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@allure.feature("API Performance Gates")
+class TestAPIBenchmark:
+
+    @allure.story("GET latency under concurrency")
+    def test_get_post_latency(self, stub_api):
+        benchmark = APIBenchmark(
+            stub_api, name="get_post", method="GET", endpoint="/posts/{i}",
+            concurrency=8, request_count=400, ramp_up_s=0.5
+        )
+        result = benchmark.run()
+        APIBenchmark.assert_thresholds(result, p99_ms=500, max_error_rate=0.0)
+
+    @allure.story("POST throughput for a fixed duration")
+    def test_create_post_throughput(self, stub_api):
+        benchmark = APIBenchmark(
+            stub_api, name="create_post", method="POST", endpoint="/posts",
+            payload_template={"title": "Load Test {i}", "body": "Benchmark", "userId": 1},
+            concurrency=4, duration_s=2
+        )
+        result = benchmark.run()
+        APIBenchmark.assert_thresholds(result, p90_ms=300, max_error_rate=0.0, min_throughput_rps=20)
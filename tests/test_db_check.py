@@ -4,17 +4,17 @@ import allure
 class TestInfrastructure:
 
     @allure.story("PostgreSQL Connection and Data Check")
-    def test_postgresql_connection(self, sql_client):
+    def test_postgresql_connection(self, sql_db):
         """
         This test:
-        1. Connects to DB using sql_client fixture.
+        1. Connects to DB using sql_db fixture (isolated per worker when SQL_ISOLATION=template).
         2. Queries the 'users' table.
         3. Verifies the existence of the 'onur_admin' user.
         """
         
         with allure.step("Executing SELECT query on database"):
-            # sql_client is a powerful object coming from conftest.py utilizing Config
-            rows = sql_client.execute_query("SELECT username, role FROM users WHERE username = 'onur_admin'")
+            # sql_db is the sql_client coming from conftest.py, rolled back after the test
+            rows = sql_db.execute_query("SELECT username, role FROM users WHERE username = 'onur_admin'")
         
         with allure.step("Verifying results"):
             assert rows is not None, "Database connection failed or query did not run!"
@@ -0,0 +1,198 @@
+import threading
+import time
+import pytest
+import allure
+import psycopg2
+from psycopg2 import sql
+from psycopg2.pool import PoolError
+from config import Config
+from utilities import sql_client as sql_client_module
+from utilities.sql_client import SQLClient
+
+class FakeCursor:
+    """Records every statement on its connection; 'FAIL' in a query raises like PostgreSQL would."""
+    rowcount = 0
+
+    def __init__(self, conn, name=None):
+        self.conn = conn
+        self.name = name
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.log.append(query)
+        if "FAIL" in str(query):
+            raise psycopg2.ProgrammingError("syntax error")
+
+    def fetchall(self):
+        return list(self.conn.rows)
+
+    def copy_expert(self, statement, buffer):
+        self.conn.log.append(statement)
+        self.conn.copied = buffer.read()
+
+    def __iter__(self):
+        return iter(self.conn.rows)
+
+    def close(self):
+        self.conn.log.append("CLOSE CURSOR")
+
+class FakeConnection:
+    closed = 0
+    rows = () # result set returned by fetchall() / cursor iteration
+
+    def __init__(self):
+        self.log = []
+        self.cursors = []
+
+    def cursor(self, name=None):
+        cursor = FakeCursor(self, name)
+        self.cursors.append(cursor)
+        return cursor
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+class FakePool:
+    """Same contract as ThreadedConnectionPool: getconn() raises once maxconn are leased."""
+
+    def __init__(self, maxconn):
+        self.maxconn = maxconn
+        self.leased = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.connections = []
+
+    def getconn(self):
+        with self.lock:
+            if self.leased >= self.maxconn:
+                raise PoolError("connection pool exhausted")
+            self.leased += 1
+            self.peak = max(self.peak, self.leased)
+            conn = FakeConnection()
+            self.connections.append(conn)
+        return conn
+
+    def putconn(self, conn, close=False):
+        with self.lock:
+            self.leased -= 1
+
+@pytest.fixture
+def offline_client(monkeypatch):
+    """SQLClient wired to an in-memory pool: no PostgreSQL needed (and no health-check pings)."""
+    monkeypatch.setattr(Config, "SQL_HEALTH_CHECK_INTERVAL", float("inf"))
+    client = SQLClient(dsn="postgresql://offline")
+    client.pool = FakePool(Config.SQL_POOL_MAX)
+    return client
+
+@allure.feature("SQL Client")
+class TestSQLClient:
+
+    @allure.story("execute_many routes 'VALUES %s' to execute_values")
+    @pytest.mark.parametrize("query, expected", [
+        ("INSERT INTO users (username, role) VALUES %s", "values"),
+        ("insert into users (username, role) values %s", "values"),
+        ("INSERT INTO users (username, role)\n    VALUES   %s ON CONFLICT DO NOTHING", "values"),
+        ("INSERT INTO users (username, role) VALUES (%s, %s)", "batch"),
+        ("UPDATE users SET role = %s WHERE username = %s", "batch"),
+    ])
+    def test_execute_many_routing(self, offline_client, monkeypatch, query, expected):
+        calls = []
+        monkeypatch.setattr(sql_client_module.psycopg2.extras, "execute_values",
+                            lambda cursor, q, rows, page_size: calls.append("values"))
+        monkeypatch.setattr(sql_client_module.psycopg2.extras, "execute_batch",
+                            lambda cursor, q, rows, page_size: calls.append("batch"))
+
+        offline_client.execute_many(query, [("onur", "admin"), ("test", "user")])
+
+        assert calls == [expected]
+
+    @allure.story("More threads than SQL_POOL_MAX wait instead of failing")
+    def test_threads_beyond_pool_size_wait(self, offline_client):
+        errors = []
+
+        def work():
+            try:
+                with offline_client._connection():
+                    time.sleep(0.05)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(Config.SQL_POOL_MAX * 3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert offline_client.pool.peak <= Config.SQL_POOL_MAX
+
+    @allure.story("A failing nested transaction rolls back to its savepoint only")
+    def test_nested_transaction_rolls_back_to_savepoint(self, offline_client):
+        with offline_client.transaction():
+            offline_client.execute_query("INSERT INTO users VALUES ('a')")
+            with pytest.raises(ValueError), offline_client.transaction():
+                offline_client.execute_query("INSERT INTO users VALUES ('b')")
+                raise ValueError("step failed")
+            offline_client.execute_query("INSERT INTO users VALUES ('c')")
+
+        conn, = offline_client.pool.connections
+        assert conn.log == [
+            "INSERT INTO users VALUES ('a')",
+            "SAVEPOINT sqlclient_tx_1",
+            "INSERT INTO users VALUES ('b')",
+            "ROLLBACK TO SAVEPOINT sqlclient_tx_1",
+            "INSERT INTO users VALUES ('c')",
+            "COMMIT",
+        ]
+
+    @allure.story("isolated() never commits; a failing statement does not abort the scope")
+    def test_isolated_scope_rolls_everything_back(self, offline_client):
+        with offline_client.isolated():
+            assert offline_client.execute_query("DELETE FROM users") == 0
+            assert offline_client.execute_query("FAIL") is None
+            assert offline_client.execute_query("UPDATE users SET role = 'x'") == 0
+
+        conn, = offline_client.pool.connections
+        assert "COMMIT" not in conn.log
+        assert conn.log == [
+            "SAVEPOINT sqlclient_stmt", "DELETE FROM users", "RELEASE SAVEPOINT sqlclient_stmt",
+            "SAVEPOINT sqlclient_stmt", "FAIL", "ROLLBACK TO SAVEPOINT sqlclient_stmt",
+            "SAVEPOINT sqlclient_stmt", "UPDATE users SET role = 'x'", "RELEASE SAVEPOINT sqlclient_stmt",
+            "ROLLBACK",
+        ]
+        assert offline_client.pool.leased == 0
+
+    @allure.story("stream_query reads through a named server-side cursor")
+    def test_stream_query_uses_named_cursor(self, offline_client, monkeypatch):
+        rows = [(i, f"user_{i}") for i in range(5)]
+        monkeypatch.setattr(FakeConnection, "rows", rows)
+
+        streamed = list(offline_client.stream_query("SELECT id, username FROM users", batch_size=2))
+
+        conn, = offline_client.pool.connections
+        cursor, = conn.cursors
+        assert streamed == rows
+        assert cursor.name.startswith("stream_")
+        assert cursor.itersize == 2
+        assert conn.log == ["SELECT id, username FROM users", "CLOSE CURSOR", "COMMIT"]
+        assert offline_client.pool.leased == 0
+
+    @allure.story("copy_from composes identifiers instead of interpolating them")
+    def test_copy_from_uses_identifiers(self, offline_client):
+        count = offline_client.copy_from("users", [("onur", "admin"), ("test", "user")], ["username", "role"])
+
+        conn, = offline_client.pool.connections
+        statement = conn.log[0]
+        assert count == 2
+        assert isinstance(statement, sql.Composed)
+        assert sql.Identifier("users") in statement.seq
+        assert conn.copied == "onur,admin\r\ntest,user\r\n"
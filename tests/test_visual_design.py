@@ -3,11 +3,12 @@ import allure
 import threading
 import http.server
 import socketserver
-import time
 import os
 from utilities.figma_client import FigmaClient
 from utilities.ai_auditor import AIAuditor
 from utilities.report_helper import ReportHelper
+from utilities.full_page_capture import FullPageCapture
+from pages.base_page import BasePage
 
 # Config
 PORT = 8000
@@ -23,39 +24,10 @@ def get_base_url():
 
 def take_full_page_screenshot(driver):
     """
-    Sayfayı tam ekran çeker ve SONRA PENCEREYİ ESKİ HALİNE GETİRİR.
-    (Bu sayede test bitiminde InvalidSession hatası oluşmaz)
+    Sayfayı tam ekran çeker. Pencere boyutu değişmez (Chromium: CDP, diğerleri: kaydır & birleştir),
+    sabit bekleme yerine render'ın durulması beklenir.
     """
-    # 1. Mevcut boyutu sakla (Yedekle)
-    original_size = driver.get_window_size()
-    
-    # 2. Toplam Yüksekliği Hesapla
-    total_width = driver.execute_script("return document.body.offsetWidth")
-    total_height = driver.execute_script("""
-        return Math.max(
-            document.body.scrollHeight, 
-            document.body.offsetHeight, 
-            document.documentElement.clientHeight, 
-            document.documentElement.scrollHeight, 
-            document.documentElement.offsetHeight
-        );
-    """)
-
-    # 3. Footer için Güvenlik Payı (+150px)
-    safe_height = total_height + 150
-
-    # 4. Pencereyi Büyüt
-    driver.set_window_size(total_width, safe_height)
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(1.5)  # Render bekle
-    
-    # 5. Screenshot Al
-    png_data = driver.get_screenshot_as_png()
-    
-    # 6. PENCEREYİ ESKİ HALİNE GETİR (Kritik Düzeltme) 🚑
-    driver.set_window_size(original_size['width'], original_size['height'])
-    
-    return png_data
+    return FullPageCapture.capture(driver)
 
 @pytest.fixture(scope="module")
 def local_server():
@@ -83,7 +55,8 @@ def test_figma_vs_live_site(driver, local_server):
     
     with allure.step(f"Navigating to: {unique_url}"):
         driver.get(unique_url)
-        time.sleep(2)
+        # Sabit 2 sn yerine: ağ boşta + animasyonlar bitti
+        BasePage(driver).wait_for_page_ready()
     
     # 1. Full Page Live Screenshot
     live_png_bytes = take_full_page_screenshot(driver)
@@ -92,7 +65,9 @@ def test_figma_vs_live_site(driver, local_server):
     # 2. Figma Screenshot
     figma = FigmaClient()
     try:
-        # Cache=True kullanıyoruz ki manuel dosyan varsa API'ye gitmesin
+        # Cache=True: aynı Figma dosya sürümünün render'ı zaten varsa yeniden indirilmez.
+        # Manuel dosya (temp/figma_cache/{FILE_KEY}_{NODE}.png) yalnızca sürüm alınamadığında
+        # (token yok / offline) kullanılır; sürüm bilinince sürümlü cache geçerlidir.
         figma_png_bytes = figma.get_node_image(FILE_KEY, NODE_ID, use_cache=True)
         allure.attach(figma_png_bytes, name="Figma Baseline (Original Design)", attachment_type=allure.attachment_type.PNG)
     except Exception as e:
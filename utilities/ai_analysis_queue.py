@@ -0,0 +1,156 @@
+import os
+import time
+import queue
+import logging
+import threading
+from typing import ClassVar
+from concurrent.futures import Future, wait
+from utilities.ai_debugger import AIDebugger
+from utilities.report_helper import ReportHelper
+from utilities.allure_results import AllureResults
+
+class AIAnalysisQueue:
+    """
+    [OFF THE HOT PATH]
+    Failure analysis is queued here instead of blocking 'pytest_runtest_makereport'.
+    1. Bounded: at most AI_QUEUE_SIZE analyses are queued or running at a time per worker;
+       failures arriving while it is full are skipped.
+    2. Concurrency: AI_QUEUE_WORKERS threads; per-provider caps live in AIDebugger.
+       Identical failure signatures share ONE in-flight request.
+    3. Deadline: at session finish the queue is drained for at most AI_ANALYSIS_DEADLINE seconds.
+       The threads are daemons, so LLM calls still in flight when the deadline passes are
+       abandoned instead of being joined at interpreter exit.
+    4. Reporting: finished analyses are attached to the Allure result files after the run.
+    One queue per process, i.e. one per xdist worker.
+    """
+
+    MAX_PENDING = int(os.getenv("AI_QUEUE_SIZE", "50"))
+    MAX_WORKERS = int(os.getenv("AI_QUEUE_WORKERS", "4"))
+    DEADLINE = int(os.getenv("AI_ANALYSIS_DEADLINE", "300"))
+
+    _queue = None
+    _threads: ClassVar[list] = []
+    _futures: ClassVar[dict] = {}   # future -> [node_id, ...] (several nodes when signatures match)
+    _inflight: ClassVar[dict] = {}  # failure signature -> future
+    _skipped = 0
+    _lock = threading.Lock()
+    logger = logging.getLogger("AIAnalysisQueue")
+
+    @staticmethod
+    def submit(node_id, error_extract):
+        """Queues one failure. Returns immediately; False if AI is off or the queue is full."""
+        if not AIDebugger.is_enabled():
+            return False
+
+        signature = AIDebugger.failure_signature(error_extract)
+
+        with AIAnalysisQueue._lock:
+            # Same failure already queued in this run: share its single request
+            shared = AIAnalysisQueue._inflight.get(signature)
+            if shared is not None:
+                AIAnalysisQueue._futures[shared].append(node_id)
+                AIAnalysisQueue.logger.info(f"♻️ AI analysis shared (signature {signature[:12]}): {node_id}")
+                return True
+
+            pending = sum(1 for future in AIAnalysisQueue._futures if not future.done())
+            if pending >= AIAnalysisQueue.MAX_PENDING:
+                AIAnalysisQueue._skipped += 1
+                AIAnalysisQueue.logger.warning(f"⚠️ AI queue full ({AIAnalysisQueue.MAX_PENDING}). Skipped: {node_id}")
+                return False
+
+            future = Future()
+            AIAnalysisQueue._start_worker_if_needed()
+            AIAnalysisQueue._queue.put((future, error_extract))
+            AIAnalysisQueue._futures[future] = [node_id]
+            AIAnalysisQueue._inflight[signature] = future
+        AIAnalysisQueue.logger.info(f"🤖 AI analysis queued: {node_id}")
+        return True
+
+    @staticmethod
+    def _start_worker_if_needed():
+        """Called under _lock: one more daemon thread per submit until MAX_WORKERS run."""
+        if AIAnalysisQueue._queue is None:
+            AIAnalysisQueue._queue = queue.Queue()
+        if len(AIAnalysisQueue._threads) < AIAnalysisQueue.MAX_WORKERS:
+            thread = threading.Thread(
+                target=AIAnalysisQueue._work,
+                args=(AIAnalysisQueue._queue,),
+                name=f"ai-analysis_{len(AIAnalysisQueue._threads)}",
+                daemon=True
+            )
+            thread.start()
+            AIAnalysisQueue._threads.append(thread)
+
+    @staticmethod
+    def _work(jobs):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            future, error_extract = job
+            if not future.set_running_or_notify_cancel():
+                continue # Cancelled after the deadline
+            try:
+                future.set_result(AIDebugger.analyze_error(error_extract))
+            except Exception as e:
+                future.set_exception(e)
+
+    @staticmethod
+    def drain_and_attach():
+        """
+        Waits (bounded by DEADLINE) for queued analyses, cancels what is left,
+        then attaches the results to the Allure report in one batch.
+        """
+        with AIAnalysisQueue._lock:
+            jobs, threads = AIAnalysisQueue._queue, AIAnalysisQueue._threads
+            futures = dict(AIAnalysisQueue._futures)
+            AIAnalysisQueue._queue = None
+            AIAnalysisQueue._threads = []
+            AIAnalysisQueue._futures = {}
+            AIAnalysisQueue._inflight = {}
+
+        if jobs is None:
+            return
+
+        start = time.time()
+        AIAnalysisQueue.logger.info(f"⏳ Waiting for {len(futures)} AI analysis(es) (Deadline: {AIAnalysisQueue.DEADLINE}s)")
+        done, not_done = wait(futures, timeout=AIAnalysisQueue.DEADLINE)
+        # Queued jobs are cancelled; running ones are left to their daemon threads (not joined)
+        for future in not_done:
+            future.cancel()
+        for _ in threads:
+            jobs.put(None)
+
+        if not AllureResults.is_active():
+            AIAnalysisQueue.logger.info(f"AI analyses not attached (allure inactive): {len(done)}")
+            return
+
+        items = []
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                AIAnalysisQueue.logger.warning(f"AI analysis failed ({futures[future][0]}): {e}")
+                continue
+            if result is None:
+                continue
+
+            # The model name travels with its own analysis (threads run concurrently)
+            ai_analysis_md, model_name = result
+            first_node, *shared_nodes = futures[future]
+            styled_html = ReportHelper.convert_to_html(ai_analysis_md, model_name=model_name)
+            source = AllureResults.write_attachment(styled_html, "html")
+            items.append((first_node, {"name": "🤖 AI Analysis Report", "source": source, "type": "text/html"}))
+
+            if shared_nodes:
+                shared_md = f"> ♻️ **Shared analysis:** same failure signature as `{first_node}`\n\n{ai_analysis_md}"
+                shared_html = ReportHelper.convert_to_html(shared_md, model_name=model_name)
+                shared_source = AllureResults.write_attachment(shared_html, "html")
+                for node_id in shared_nodes:
+                    items.append((node_id, {"name": "🤖 AI Analysis Report", "source": shared_source, "type": "text/html"}))
+
+        attached = AllureResults.inject_attachments(items)
+        AIAnalysisQueue.logger.info(
+            f"✅ AI analyses attached: {attached} | Timed out: {len(not_done)} | "
+            f"Skipped (queue full): {AIAnalysisQueue._skipped} | Drain: {time.time() - start:.1f}s"
+        )
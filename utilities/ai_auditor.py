@@ -3,113 +3,207 @@ import json
 import io
 import base64
 import math
+import time
+import hashlib
+import resource
 from PIL import Image
 
 # Gemini
-from google import genai
-from google.genai.types import GenerateContentConfig
+from google.genai.types import GenerateContentConfig, Part
 
-# Optional Imports
-try:
-    import ollama
-except ImportError:
-    ollama = None
-
-try:
-    from groq import Groq
-except ImportError:
-    Groq = None
+from utilities.ai_providers import AIProviderRegistry
+from utilities.visual_diff import VisualDiff
+from utilities.disk_cache import DiskCache
 
 class AIAuditor:
     def __init__(self):
         self.provider = os.getenv("AI_PROVIDER", "gemini").lower()
-        self.api_key = os.getenv(f"{self.provider.upper()}_API_KEY") 
 
         # --- PROVIDER INIT ---
+        # Client worker başına bir kez oluşturulur (AIProviderRegistry), testler arasında paylaşılır.
         if self.provider == "gemini":
             self.model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
-            self.client = genai.Client(api_key=self.api_key)
             
         elif self.provider == "ollama":
             self.model_name = os.getenv("OLLAMA_MODEL", "llama3.2-vision")
-            self.client = None
             
         elif self.provider == "groq":
-            if Groq is None:
-                raise Exception("🚨 'groq' kütüphanesi eksik! `pip install groq` çalıştırın.")
             self.model_name = os.getenv("GROQ_MODEL", "llama-3.2-90b-vision-preview")
-            self.client = Groq(api_key=self.api_key)
-
-    def _resize_to_match_width(self, img_source, img_target):
-        if img_target.width == img_source.width:
-            return img_target
-        aspect_ratio = img_target.height / img_target.width
-        new_height = int(img_source.width * aspect_ratio)
-        return img_target.resize((img_source.width, new_height), Image.Resampling.LANCZOS)
-
-    def _ensure_safe_pixel_count(self, img):
-        """Groq ve Gemini için Pixel Güvenlik Kontrolü (Max ~25MP)"""
-        MAX_PIXELS = 25_000_000 
-        current_pixels = img.width * img.height
-        
-        if current_pixels > MAX_PIXELS:
-            scale_factor = math.sqrt(MAX_PIXELS / current_pixels)
-            new_width = int(img.width * scale_factor)
-            new_height = int(img.height * scale_factor)
-            print(f"📉 Görsel Küçültülüyor ({current_pixels/1_000_000:.1f}MP -> {new_width}x{new_height})")
-            return img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        return img
 
-    def _convert_to_jpeg(self, img):
-        """Optimization: PNG -> JPEG (Quality 85)"""
-        if img.mode in ("RGBA", "P"):
+        self.client = None
+        if self.provider in ["gemini", "ollama", "groq"]:
+            self.client = AIProviderRegistry.get_client(self.provider)
+
+    MAX_PIXELS = 25_000_000 # Groq ve Gemini için piksel sınırı (~25MP)
+    JPEG_QUALITY = 85
+
+    # Sonuç cache'i: prompt veya pipeline değişirse PROMPT_VERSION artırılmalı (eski kayıtlar geçersiz olur)
+    PROMPT_VERSION = "v4"
+    CACHE_DIR = "temp/visual_audit_cache"
+    CACHE_MAX_MB = int(os.getenv("VISUAL_CACHE_MAX_MB", "50"))
+    _cache = None
+
+    @classmethod
+    def _get_cache(cls):
+        if cls._cache is None:
+            cls._cache = DiskCache(cls.CACHE_DIR, max_bytes=cls.CACHE_MAX_MB * 1024 * 1024)
+        return cls._cache
+
+    def _cache_key(self, figma_bytes, live_bytes):
+        """İçerik adresli anahtar: iki görselin hash'i + sağlayıcı + model + prompt sürümü."""
+        digest = hashlib.sha256()
+        for part in [
+            hashlib.sha256(figma_bytes).hexdigest(),
+            hashlib.sha256(live_bytes).hexdigest(),
+            self.provider,
+            getattr(self, "model_name", ""),
+            self.PROMPT_VERSION,
+        ]:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"|")
+        return digest.hexdigest()
+
+    def _plan_target_size(self, size, match_width=None):
+        """
+        Hedef boyutu TEK SEFERDE hesaplar (genişlik eşitleme + piksel güvenliği birlikte).
+        Böylece görsel yalnızca bir kez yeniden boyutlandırılır.
+        """
+        width, height = size
+        if match_width and match_width != width:
+            height = int(match_width * height / width)
+            width = match_width
+
+        current_pixels = width * height
+        if current_pixels > self.MAX_PIXELS:
+            scale_factor = math.sqrt(self.MAX_PIXELS / current_pixels)
+            width, height = int(width * scale_factor), int(height * scale_factor)
+        return width, height
+
+    def _decode(self, img_bytes, prefix, stats):
+        t0 = time.perf_counter()
+        img = Image.open(io.BytesIO(img_bytes))
+        if img.mode != "RGB":
             img = img.convert("RGB")
+        img.load()
+        stats.setdefault(prefix, {})["decode_ms"] = (time.perf_counter() - t0) * 1000
+        return img
+
+    def _prepare_payload(self, img, prefix, stats, match_width=None):
+        """
+        Planlı pipeline: (tek) resize -> (tek) JPEG encode.
+        Dönen byte'lar AI'ya gönderilen verinin BİREBİR aynısıdır.
+        """
+        t1 = time.perf_counter()
+        source_size = img.size
+        target_size = self._plan_target_size(source_size, match_width)
+
+        if target_size != img.size:
+            print(f"📉 Görsel Küçültülüyor ({source_size[0]}x{source_size[1]} -> {target_size[0]}x{target_size[1]})")
+            # reducing_gap: büyük oranlı küçültmelerde önce hızlı 'reduce', sonra LANCZOS
+            img = img.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        t2 = time.perf_counter()
+
         buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=85)
-        buffer.seek(0)
-        return Image.open(buffer)
+        img.save(buffer, format="JPEG", quality=self.JPEG_QUALITY)
+        payload = buffer.getvalue()
+        t3 = time.perf_counter()
+
+        # Ham piksel tamponu (RGB = 3 byte/piksel) + kaynak
+        peak_bytes = source_size[0] * source_size[1] * 3 + target_size[0] * target_size[1] * 3
+        stats.setdefault(prefix, {}).update({
+            "resize_ms": (t2 - t1) * 1000,
+            "encode_ms": (t3 - t2) * 1000,
+            "peak_mb": peak_bytes / 1024 / 1024,
+            "payload_kb": len(payload) / 1024,
+        })
 
-    def _save_debug_image(self, img, prefix):
+        if os.getenv("AI_DEBUG_PAYLOADS", "false").lower() == "true":
+            self._save_debug_payload(payload, prefix)
+
+        return payload, target_size
+
+    def _save_debug_payload(self, payload, prefix):
         """
-        🔍 DEBUG: AI'ya giden son görseli diske kaydeder.
+        🔍 DEBUG (opt-in: AI_DEBUG_PAYLOADS=true): AI'ya giden byte'ları olduğu gibi diske yazar.
         """
         debug_dir = "debug_payloads"
         os.makedirs(debug_dir, exist_ok=True)
         
         filename = f"{debug_dir}/{prefix}_final_payload.jpg"
-        img.save(filename, quality=95)
+        with open(filename, "wb") as f:
+            f.write(payload)
         print(f"💾 Debug Görseli Kaydedildi: {filename}")
 
-    def _image_to_base64(self, img):
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG")
-        return base64.b64encode(buf.getvalue()).decode('utf-8')
+    def _report_pipeline_stats(self, stats):
+        for prefix, s in stats.items():
+            print(
+                f"⏱️ [{prefix}] decode: {s['decode_ms']:.0f}ms | resize: {s['resize_ms']:.0f}ms | "
+                f"encode: {s['encode_ms']:.0f}ms | peak: ~{s['peak_mb']:.0f}MB | payload: {s['payload_kb']:.0f}KB"
+            )
+        try:
+            # Süreç bazlı tepe RSS (Linux: KB)
+            print(f"📈 Süreç tepe belleği (RSS): {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}MB")
+        except Exception:
+            pass
 
-    def _pil_to_bytes(self, img):
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG")
-        return buf.getvalue()
+    def _normalize_errors(self, data):
+        """Sağlayıcıdan dönen JSON'u her zaman hata listesine çevirir."""
+        if isinstance(data, dict):
+            if "errors" in data: return data["errors"]
+            if "discrepancies" in data: return data["discrepancies"]
+            return [data]
+        return data or []
 
     def analyze_with_coordinates(self, figma_bytes, live_bytes):
-        # 1. Yükleme
-        img_figma = Image.open(io.BytesIO(figma_bytes))
-        img_live = Image.open(io.BytesIO(live_bytes))
-        
-        # 2. İşleme Zinciri (Pipeline)
-        # A. Genişlik Eşitle
-        img_live = self._resize_to_match_width(img_figma, img_live)
+        # Aynı girdiler daha önce analiz edildiyse API'ye hiç gitme
+        cache_key = self._cache_key(figma_bytes, live_bytes)
+        cached = self._get_cache().get(cache_key)
+        if cached is not None:
+            print(f"📦 Görsel denetim sonucu cache'den yüklendi ({len(cached)} hata)")
+            return cached
+
+        stats = {}
+        img_figma = self._decode(figma_bytes, "figma", stats)
+        img_live = self._decode(live_bytes, "live_site", stats)
 
-        # B. Piksel Güvenliği (Groq Crash Önleyici)
-        img_figma = self._ensure_safe_pixel_count(img_figma)
-        img_live = self._ensure_safe_pixel_count(img_live)
+        # 0. Yerel Ön Filtre: onaylı baseline (yoksa Figma) ile karşılaştır
+        t0 = time.perf_counter()
+        baseline_key = VisualDiff.baseline_key(figma_bytes)
+        reference = VisualDiff.load_baseline(baseline_key)
+        diff = VisualDiff.compare(img_figma if reference is None else reference, img_live)
+        print(f"🔎 Ön filtre: {(time.perf_counter() - t0) * 1000:.0f}ms | pHash mesafesi: {diff['distance']}")
 
-        # C. JPEG Optimizasyonu (Hızlandırıcı)
-        img_figma_opt = self._convert_to_jpeg(img_figma)
-        img_live_opt = self._convert_to_jpeg(img_live)
+        if diff["match"]:
+            print("✅ Görseller tolerans içinde aynı. AI çağrısı atlandı.")
+            return []
 
-        self._save_debug_image(img_figma_opt, "figma")
-        self._save_debug_image(img_live_opt, "live_site")
+        # Bantlar modele giden çiftten (Figma vs canlı) hesaplanır; baseline ile bulunan bantlar
+        # Figma'yı kırpmak için kullanılamaz (yerleşimler orantılı olmayabilir)
+        regions = diff["regions"] if reference is None else VisualDiff.compare(img_figma, img_live)["regions"]
+        if regions:
+            print(f"✂️ Yalnızca değişen {len(regions)} bant gönderiliyor: {[(round(s, 3), round(e, 3)) for s, e in regions]}")
+            img_figma = VisualDiff.stack_bands(img_figma, regions)
+            img_live = VisualDiff.stack_bands(img_live, regions)
 
+        # 1. İşleme Zinciri (Pipeline): her görsel tek resize + tek encode
+        figma_jpeg, figma_size = self._prepare_payload(img_figma, "figma", stats)
+        live_jpeg, _ = self._prepare_payload(img_live, "live_site", stats, match_width=figma_size[0])
+        self._report_pipeline_stats(stats)
+
+        # 2. AI Analizi (bant modunda koordinatlar tam sayfaya geri eşlenir)
+        errors = self._normalize_errors(self._ask_model(figma_jpeg, live_jpeg, band_mode=bool(regions)))
+        if regions:
+            errors = VisualDiff.map_errors(errors, regions)
+
+        # 3. Hatasız sonuç -> bu canlı görüntü yeni onaylı baseline
+        # (buraya yalnızca gerçek bir model yanıtıyla gelinir; hata/desteklenmeyen sağlayıcı istisna fırlatır)
+        if not errors:
+            VisualDiff.save_baseline(baseline_key, live_bytes)
+
+        self._get_cache().set(cache_key, errors)
+        return errors
+
+    def _ask_model(self, figma_jpeg, live_jpeg, band_mode=False):
         # Prompt
         system_prompt = """
         You are a Senior UX Engineer. Compare the 'Figma Design' vs 'Live Site'.
@@ -132,15 +226,20 @@ class AIAuditor:
         
         If no differences, return: { "errors": [] }
         """
+        if band_mode:
+            system_prompt += (
+                "\nNOTE: Both images contain ONLY the changed horizontal bands of the page, stacked vertically. "
+                "Give y_start / y_end relative to the images you see."
+            )
 
         # --- GROQ ---
         if self.provider == "groq":
             print(f"⚡ GROQ ({self.model_name}) Analiz Yapıyor...")
             try:
-                f_b64 = self._image_to_base64(img_figma_opt)
-                l_b64 = self._image_to_base64(img_live_opt)
+                f_b64 = base64.b64encode(figma_jpeg).decode('utf-8')
+                l_b64 = base64.b64encode(live_jpeg).decode('utf-8')
                 
-                completion = self.client.chat.completions.create(
+                completion = AIProviderRegistry.call("groq", lambda client: client.chat.completions.create(
                     model=self.model_name,
                     messages=[
                         {
@@ -160,16 +259,10 @@ class AIAuditor:
                     ],
                     temperature=0.0,
                     response_format={"type": "json_object"}
-                )
+                ))
                 
                 content = completion.choices[0].message.content
-                data = json.loads(content)
-                
-                if isinstance(data, dict):
-                    if "errors" in data: return data["errors"]
-                    if "discrepancies" in data: return data["discrepancies"]
-                    return [data]
-                return data
+                return json.loads(content)
 
             except Exception as e:
                 print(f"❌ GROQ Error: {e}")
@@ -178,11 +271,15 @@ class AIAuditor:
         # --- GEMINI ---
         elif self.provider == "gemini":
             try:
-                response = self.client.models.generate_content(
+                response = AIProviderRegistry.call("gemini", lambda client: client.models.generate_content(
                     model=self.model_name,
-                    contents=[system_prompt, img_figma_opt, img_live_opt],
+                    contents=[
+                        system_prompt,
+                        Part.from_bytes(data=figma_jpeg, mime_type="image/jpeg"),
+                        Part.from_bytes(data=live_jpeg, mime_type="image/jpeg")
+                    ],
                     config=GenerateContentConfig(response_mime_type="application/json", temperature=0.0)
-                )
+                ))
                 return json.loads(response.text)
             except Exception as e:
                 if "429" in str(e) or "ResourceExhausted" in str(e):
@@ -191,22 +288,22 @@ class AIAuditor:
 
         # --- OLLAMA ---
         elif self.provider == "ollama":
-            if ollama is None: raise Exception("🚨 Ollama kütüphanesi yok.")
             print(f"🦙 OLLAMA ({self.model_name}) Çalışıyor...")
             try:
-                response = ollama.chat(
+                response = AIProviderRegistry.call("ollama", lambda client: client.chat(
                     model=self.model_name,
                     messages=[{
                         'role': 'user', 
                         'content': system_prompt, 
-                        'images': [self._pil_to_bytes(img_figma_opt), self._pil_to_bytes(img_live_opt)]
+                        'images': [figma_jpeg, live_jpeg]
                     }],
                     format='json',
                     options={'temperature': 0.0}
-                )
+                ))
                 return json.loads(response['message']['content'])
             except Exception as e:
-                raise e
+                print(f"❌ OLLAMA Error: {e}")
+                raise
 
-        else:
-            return []
\ No newline at end of file
+        # Denetlenmeyen sonuç "hata yok" sayılmamalı: baseline ve cache'e asla yazılmaz
+        raise ValueError(f"❌ Görsel denetim bu sağlayıcıyı desteklemiyor: AI_PROVIDER={self.provider} (gemini, groq, ollama)")
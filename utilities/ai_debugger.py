@@ -1,6 +1,11 @@
 # utilities/ai_debugger.py
 
 import os
+import re
+import hashlib
+from typing import ClassVar
+from utilities.disk_cache import DiskCache
+from utilities.ai_providers import AIProviderRegistry
 
 # Make dependencies optional
 try:
@@ -18,14 +23,79 @@ class AIDebugger:
     DEFAULT_PROVIDER = "gemini"
     DEFAULT_GEMINI_MODEL = "gemini-3-flash-preview"
     DEFAULT_OPENAI_MODEL = "gpt-4o"
-    
-    # Dynamic variable for Report Title
-    CURRENT_MODEL_NAME = "AI Analysis"
+
+    # Failure-signature cache (survives across runs)
+    CACHE_DIR = "temp/ai_cache"
+    CACHE_TTL_HOURS = int(os.getenv("AI_CACHE_TTL_HOURS", "72"))
+    CACHE_MAX_MB = int(os.getenv("AI_CACHE_MAX_MB", "20"))
+    _cache = None
+
+    # Volatile parts of a traceback that must not change the signature
+    _SIGNATURE_RULES: ClassVar[list] = [
+        (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<UUID>"),
+        (re.compile(r"0x[0-9a-fA-F]+"), "<ADDR>"),
+        (re.compile(r"\b[0-9a-fA-F]{16,}\b"), "<ID>"),
+        (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?"), "<TS>"),
+        (re.compile(r"\b\d{2}:\d{2}:\d{2}(\.\d+)?\b"), "<TS>"),
+        (re.compile(r"(test_\w+)\[[^\]\n]*\]"), r"\1[<PARAMS>]"),
+        (re.compile(r"(?:/private)?(?:/tmp|/var/folders)/[^\s'\":]+"), "<TMP>"),
+        (re.compile(r"(\.py):\d+"), r"\1:<LINE>"),
+        (re.compile(r"\bline \d+"), "line <LINE>"),
+        (re.compile(r"\b\d+(\.\d+)?\s?(ms|s)\b"), "<DUR>"),
+        (re.compile(r"\d+\.\d+"), "<NUM>"),
+        (re.compile(r"\s+"), " "),
+    ]
+
+    @staticmethod
+    def failure_signature(error_message):
+        """
+        Stable hash of a failure: addresses, UUIDs, timestamps, session ids, params,
+        temp paths, line numbers and durations stripped.
+        """
+        normalized = error_message
+        for pattern, replacement in AIDebugger._SIGNATURE_RULES:
+            normalized = pattern.sub(replacement, normalized)
+        return hashlib.sha256(normalized.strip().encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _get_cache():
+        if AIDebugger._cache is None:
+            AIDebugger._cache = DiskCache(
+                AIDebugger.CACHE_DIR,
+                ttl_seconds=AIDebugger.CACHE_TTL_HOURS * 3600,
+                max_bytes=AIDebugger.CACHE_MAX_MB * 1024 * 1024
+            )
+        return AIDebugger._cache
+
+    @staticmethod
+    def _model_names(provider):
+        """Models that produce the answer: part of the cache key, so a model change is a cache miss."""
+        gemini = os.getenv("GEMINI_MODEL", AIDebugger.DEFAULT_GEMINI_MODEL)
+        openai_model = os.getenv("OPENAI_MODEL", AIDebugger.DEFAULT_OPENAI_MODEL)
+        return {"gemini": gemini, "openai": openai_model, "all": f"{gemini}+{openai_model}"}.get(provider, "")
+
+    @staticmethod
+    def _report_title(provider):
+        """Model name shown in the report; derived per analysis, never shared between threads."""
+        if provider == "all":
+            return "Gemini vs ChatGPT"
+        if provider == "gemini":
+            return f"Google {AIDebugger._model_names(provider)}"
+        if provider == "openai":
+            return f"OpenAI {AIDebugger._model_names(provider)}"
+        return "AI Analysis"
+
+    @staticmethod
+    def is_enabled():
+        provider = os.getenv("AI_PROVIDER", AIDebugger.DEFAULT_PROVIDER).lower()
+        return provider not in ["off", "none", "false", "0"]
 
     @staticmethod
     def analyze_error(error_message):
         """
         Analyzes based on AI_PROVIDER value (gemini, openai, all, off).
+        Identical failure signatures reuse the cached analysis instead of a new API call.
+        Returns (markdown, model_name), or None when AI is off.
         """
         provider = os.getenv("AI_PROVIDER", AIDebugger.DEFAULT_PROVIDER).lower()
 
@@ -33,6 +103,26 @@ class AIDebugger:
         if provider in ["off", "none", "false", "0"]:
             return None  # Do nothing, return None.
 
+        signature = AIDebugger.failure_signature(error_message)
+        model_hash = hashlib.sha256(AIDebugger._model_names(provider).encode("utf-8")).hexdigest()[:12]
+        cache_key = f"{provider}_{model_hash}_{signature}"
+        cached = AIDebugger._get_cache().get(cache_key)
+        if cached:
+            return (
+                f"> ♻️ **Cached analysis reused** (signature `{signature[:12]}`)\n\n"
+                f"{cached['analysis']}"
+            ), cached["model"]
+
+        model_name = AIDebugger._report_title(provider)
+        analysis, ok = AIDebugger._run_providers(provider, error_message)
+        # Provider errors (missing key, API error...) are reported but never cached
+        if ok and analysis:
+            AIDebugger._get_cache().set(cache_key, {"model": model_name, "analysis": analysis})
+        return analysis, model_name
+
+    @staticmethod
+    def _run_providers(provider, error_message):
+        """Returns (markdown, ok): ok is False if any provider call failed."""
         # COMMON PROMPTS
         system_prompt = (
             "You are a Senior QA Automation Engineer. "
@@ -46,16 +136,15 @@ class AIDebugger:
 
         # --- SCENARIO 2: USE BOTH (ALL) ---
         if provider == "all":
-            AIDebugger.CURRENT_MODEL_NAME = "Gemini vs ChatGPT"
-            gemini_res = AIDebugger._analyze_with_gemini(user_prompt)
-            openai_res = AIDebugger._analyze_with_openai(system_prompt, user_prompt)
+            gemini_res, gemini_ok = AIDebugger._analyze_with_gemini(user_prompt)
+            openai_res, openai_ok = AIDebugger._analyze_with_openai(system_prompt, user_prompt)
             
             # Combine two answers one after another
             return (
                 f"### 🔵 Google Gemini Analysis\n{gemini_res}\n\n"
                 f"---\n\n"
                 f"### 🟢 ChatGPT Analysis\n{openai_res}"
-            )
+            ), gemini_ok and openai_ok
 
         # --- SCENARIO 3: SINGLE SELECTION ---
         elif provider == "openai":
@@ -65,48 +154,52 @@ class AIDebugger:
             return AIDebugger._analyze_with_gemini(user_prompt)
             
         else:
-            return f"⚠️ Unknown AI Provider: {provider}"
+            return f"⚠️ Unknown AI Provider: {provider}", False
 
     @staticmethod
     def _analyze_with_gemini(prompt):
+        """Returns (text, ok)."""
         if not genai:
-            return "❌ 'google-genai' library missing!"
+            return "❌ 'google-genai' library missing!", False
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
-            return "⚠️ GEMINI_API_KEY missing!"
+            return "⚠️ GEMINI_API_KEY missing!", False
 
         try:
             model = os.getenv("GEMINI_MODEL", AIDebugger.DEFAULT_GEMINI_MODEL)
-            if AIDebugger.CURRENT_MODEL_NAME != "Gemini vs ChatGPT":
-                AIDebugger.CURRENT_MODEL_NAME = f"Google {model}"
-            
-            client = genai.Client(api_key=api_key)
-            response = client.models.generate_content(model=model, contents=prompt)
-            return response.text
+
+            # Shared client (pooled connections, retry on 429/5xx, concurrency cap)
+            response = AIProviderRegistry.call(
+                "gemini",
+                lambda client: client.models.generate_content(model=model, contents=prompt)
+            )
+            return response.text, bool(response.text)
         except Exception as e:
-            return f"❌ Gemini Error: {str(e)}"
+            return f"❌ Gemini Error: {str(e)}", False
 
     @staticmethod
     def _analyze_with_openai(system_prompt, user_prompt):
+        """Returns (text, ok)."""
         if not openai:
-            return "❌ 'openai' library missing!"
+            return "❌ 'openai' library missing!", False
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
-            return "⚠️ OPENAI_API_KEY missing!"
+            return "⚠️ OPENAI_API_KEY missing!", False
 
         try:
             model = os.getenv("OPENAI_MODEL", AIDebugger.DEFAULT_OPENAI_MODEL)
-            if AIDebugger.CURRENT_MODEL_NAME != "Gemini vs ChatGPT":
-                AIDebugger.CURRENT_MODEL_NAME = f"OpenAI {model}"
-            
-            client = openai.OpenAI(api_key=api_key)
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
+
+            response = AIProviderRegistry.call(
+                "openai",
+                lambda client: client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ]
+                )
             )
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
+            return content, bool(content)
         except Exception as e:
-            return f"❌ OpenAI Error: {str(e)}"
\ No newline at end of file
+            return f"❌ OpenAI Error: {str(e)}", False
\ No newline at end of file
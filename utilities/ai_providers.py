@@ -0,0 +1,127 @@
+import os
+import time
+import random
+import logging
+import threading
+from typing import ClassVar
+
+# Make dependencies optional
+try:
+    from google import genai
+    from google.genai import types as genai_types
+except ImportError:
+    genai = None
+    genai_types = None
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    from groq import Groq
+except ImportError:
+    Groq = None
+
+try:
+    import ollama
+except ImportError:
+    ollama = None
+
+class AIProviderRegistry:
+    """
+    [ONE CLIENT PER PROVIDER PER WORKER]
+    Provider SDK clients are created lazily on first use and then reused, so only the
+    first call pays the TLS/connection setup; later calls go over the SDK's pooled connections.
+    - Timeouts: AI_TIMEOUT (seconds).
+    - Retries: AI_MAX_RETRIES with exponential backoff (AI_BACKOFF_BASE) on 429 / 5xx only.
+    - Concurrency: AI_<PROVIDER>_CONCURRENCY parallel calls per provider.
+    xdist workers are separate processes, so class-level state == one registry per worker.
+    """
+
+    TIMEOUT = float(os.getenv("AI_TIMEOUT", "60"))
+    MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "3"))
+    BACKOFF_BASE = float(os.getenv("AI_BACKOFF_BASE", "1.0"))
+    DEFAULT_CONCURRENCY = 2
+
+    _clients: ClassVar[dict] = {}
+    _slots: ClassVar[dict] = {}
+    _lock = threading.Lock()
+    logger = logging.getLogger("AIProviderRegistry")
+
+    @staticmethod
+    def get_client(provider):
+        """Returns the shared client of the provider, creating it on first use."""
+        provider = provider.lower()
+        with AIProviderRegistry._lock:
+            if provider not in AIProviderRegistry._clients:
+                AIProviderRegistry._clients[provider] = AIProviderRegistry._create_client(provider)
+                AIProviderRegistry.logger.info(f"🔌 AI client created: {provider}")
+            return AIProviderRegistry._clients[provider]
+
+    @staticmethod
+    def _create_client(provider):
+        api_key = os.getenv(f"{provider.upper()}_API_KEY")
+        timeout = AIProviderRegistry.TIMEOUT
+
+        # SDK-internal retries are disabled; retrying is done uniformly in call().
+        if provider == "gemini":
+            if genai is None:
+                raise ImportError("❌ 'google-genai' library missing!")
+            return genai.Client(api_key=api_key, http_options=genai_types.HttpOptions(timeout=int(timeout * 1000)))
+
+        elif provider == "openai":
+            if openai is None:
+                raise ImportError("❌ 'openai' library missing!")
+            return openai.OpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+
+        elif provider == "groq":
+            if Groq is None:
+                raise ImportError("🚨 'groq' kütüphanesi eksik! `pip install groq` çalıştırın.")
+            return Groq(api_key=api_key, timeout=timeout, max_retries=0)
+
+        elif provider == "ollama":
+            if ollama is None:
+                raise ImportError("🚨 Ollama kütüphanesi yok.")
+            return ollama.Client(host=os.getenv("OLLAMA_HOST"), timeout=timeout)
+
+        raise ValueError(f"⚠️ Unknown AI Provider: {provider}")
+
+    @staticmethod
+    def _get_slot(provider):
+        with AIProviderRegistry._lock:
+            if provider not in AIProviderRegistry._slots:
+                limit = int(os.getenv(f"AI_{provider.upper()}_CONCURRENCY", AIProviderRegistry.DEFAULT_CONCURRENCY))
+                AIProviderRegistry._slots[provider] = threading.BoundedSemaphore(max(1, limit))
+            return AIProviderRegistry._slots[provider]
+
+    @staticmethod
+    def _is_retryable(error):
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+        text = str(error)
+        return "429" in text or "ResourceExhausted" in text or "503" in text or "502" in text
+
+    @staticmethod
+    def call(provider, request_fn):
+        """
+        Runs request_fn(client) within the provider's concurrency cap.
+        429 / 5xx errors are retried with exponential backoff + jitter; everything else is raised.
+        """
+        provider = provider.lower()
+        client = AIProviderRegistry.get_client(provider)
+
+        for attempt in range(AIProviderRegistry.MAX_RETRIES + 1):
+            try:
+                with AIProviderRegistry._get_slot(provider):
+                    return request_fn(client)
+            except Exception as e:
+                if attempt >= AIProviderRegistry.MAX_RETRIES or not AIProviderRegistry._is_retryable(e):
+                    raise
+                wait_time = AIProviderRegistry.BACKOFF_BASE * (2 ** attempt) + random.uniform(0, 0.5) # nosec
+                AIProviderRegistry.logger.warning(
+                    f"⚠️ {provider} busy ({e.__class__.__name__}). Retrying in {wait_time:.1f}s "
+                    f"(Attempt {attempt + 1}/{AIProviderRegistry.MAX_RETRIES})"
+                )
+                time.sleep(wait_time)
@@ -0,0 +1,127 @@
+import os
+import json
+import glob
+import uuid
+import logging
+
+class AllureResults:
+    """
+    [POST-RUN REPORT EDITING]
+    Helpers for attaching files to already written '*-result.json' files
+    (videos, AI analyses, ...) after the tests themselves have finished.
+    - ONE pass builds a fullName index; every result file is parsed once.
+    - Matching is exact (fullName + test name), no substring guesses.
+    - Each affected result file is rewritten at most once per batch.
+    """
+
+    RESULTS_DIR = os.getenv("ALLURE_RESULTS_DIR", "/app/allure-results")
+    logger = logging.getLogger("AllureResults")
+
+    @staticmethod
+    def configure(results_dir):
+        """pytest_configure: follow '--alluredir'. None = allure is inactive for this run."""
+        AllureResults.RESULTS_DIR = os.path.abspath(results_dir) if results_dir else None
+
+    @staticmethod
+    def is_active():
+        """True when result files can be edited (allure on and its directory exists)."""
+        return bool(AllureResults.RESULTS_DIR) and os.path.isdir(AllureResults.RESULTS_DIR)
+
+    @staticmethod
+    def node_id_to_full_name(node_id):
+        """
+        Rebuilds Allure's 'fullName' from a pytest nodeid (same rule allure-pytest uses).
+        tests/test_login.py::TestLogin::test_x[p1-p2] -> tests.test_login.TestLogin#test_x
+        """
+        parts = node_id.split("[", 1)[0].split("::") # params may contain '::' themselves
+        package = parts[0].rsplit(".", 1)[0].replace("/", ".")
+        class_name = f".{parts[-2]}" if len(parts) > 2 else ""
+        return f"{package}{class_name}#{parts[-1]}"
+
+    @staticmethod
+    def _item_name(node_id):
+        """Test name as Allure stores it: function name + '[params]'."""
+        return node_id[node_id.split("[", 1)[0].rfind("::") + 2:]
+
+    @staticmethod
+    def build_index():
+        """ONE pass over the results directory: fullName -> [(name, stop, path)]."""
+        index = {}
+        json_files = glob.glob(os.path.join(AllureResults.RESULTS_DIR, "*-result.json"))
+        for json_file in json_files:
+            try:
+                with open(json_file, "r") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                AllureResults.logger.warning(f"⚠️ Unreadable Allure result skipped ({os.path.basename(json_file)}): {e}")
+                continue
+            full_name = data.get("fullName")
+            if full_name:
+                index.setdefault(full_name, []).append((data.get("name", ""), data.get("stop", 0), json_file))
+        return index
+
+    @staticmethod
+    def lookup(index, node_id):
+        """
+        Exact keyed matching:
+        1. fullName + test name (parametrized tests differ only by '[params]' in the name).
+        2. fullName alone, only if it is unambiguous (e.g. @allure.title replaced the name).
+        Reruns produce several results for one test; the latest ('stop') wins.
+        """
+        candidates = index.get(AllureResults.node_id_to_full_name(node_id), [])
+        item_name = AllureResults._item_name(node_id)
+        exact = [c for c in candidates if c[0] == item_name]
+        if not exact and len({c[0] for c in candidates}) == 1:
+            exact = candidates
+        if not exact:
+            return None
+        return max(exact, key=lambda c: c[1])[2]
+
+    @staticmethod
+    def write_attachment(content, extension):
+        """Writes an attachment file next to the results and returns its 'source' name."""
+        source = f"{uuid.uuid4()}-attachment.{extension}"
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with open(os.path.join(AllureResults.RESULTS_DIR, source), mode) as f:
+            f.write(content)
+        return source
+
+    @staticmethod
+    def inject_attachments(items):
+        """
+        items: [(node_id, {"name": ..., "source": ..., "type": ...}), ...]
+        Returns the number of attachments placed into result files.
+        """
+        if not items or not AllureResults.is_active():
+            return 0
+
+        index = AllureResults.build_index()
+        attachments_by_file = {}
+        for node_id, attachment in items:
+            json_file = AllureResults.lookup(index, node_id)
+            if json_file:
+                attachments_by_file.setdefault(json_file, []).append(attachment)
+            else:
+                AllureResults.logger.warning(f"⚠️ No Allure result found for: {node_id}")
+
+        injected = 0
+        for json_file, new_attachments in attachments_by_file.items():
+            try:
+                with open(json_file, "r+") as f:
+                    data = json.load(f)
+                    target_step = data.get("afters", [])[-1] if data.get("afters") else data
+                    attachments = target_step.setdefault("attachments", [])
+                    existing = {a.get("source") for a in attachments}
+
+                    for attachment in new_attachments:
+                        if attachment["source"] not in existing:
+                            attachments.append(attachment)
+                            existing.add(attachment["source"])
+                        injected += 1
+
+                    f.seek(0)
+                    json.dump(data, f, indent=4)
+                    f.truncate()
+            except Exception as e:
+                AllureResults.logger.warning(f"Attachment Injection Error ({os.path.basename(json_file)}): {e}")
+        return injected
@@ -0,0 +1,182 @@
+import os
+import json
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import allure
+from allure_commons.types import AttachmentType
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utilities.api_client import APIClient
+
+class APIBenchmark:
+    """
+    [LOAD & LATENCY GATE] Drives an APIClient scenario with N concurrent workers.
+    - Scenario: method, endpoint and payload template ('{i}' = request index).
+    - Stop condition: request_count and/or duration_s (whichever comes first).
+    - Ramp: workers start evenly spread over ramp_up_s seconds.
+    - Report: p50/p90/p99/max latency, throughput, error rate
+      -> Allure attachments + machine-readable JSON (BENCHMARK_RESULTS_DIR).
+    - Thresholds: assert_thresholds() fails the test when a limit is exceeded.
+    Per-request Allure attachments are disabled for the load itself (attach_mode='off').
+    The load runs on its own session without retries: a 429/5xx counts as an error instead of
+    being retried away, and backoff never ends up in the latency. Per-request logs go to DEBUG.
+    """
+
+    RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", "logs/benchmarks")
+
+    def __init__(self, base_url, name, method, endpoint, payload_template=None,
+                 concurrency=4, request_count=None, duration_s=None, ramp_up_s=0):
+        if request_count is None and duration_s is None:
+            raise ValueError("❌ Benchmark needs a request_count or a duration_s.")
+        self.session = self._create_session(concurrency)
+        self.client = APIClient(base_url, attach_mode="off", session=self.session, log_level=logging.DEBUG)
+        self.name = name
+        self.method = method.upper()
+        self.endpoint = endpoint
+        self.payload_template = payload_template
+        self.concurrency = concurrency
+        self.request_count = request_count
+        self.duration_s = duration_s
+        self.ramp_up_s = ramp_up_s
+        self.logger = logging.getLogger("APIBenchmark")
+
+    @staticmethod
+    def _create_session(concurrency):
+        adapter = HTTPAdapter(
+            pool_connections=concurrency,
+            pool_maxsize=concurrency,
+            max_retries=Retry(total=0, raise_on_status=False)
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @staticmethod
+    def _render(template, i):
+        """Fills '{i}' placeholders in strings of a (nested) payload template."""
+        if isinstance(template, str):
+            return template.replace("{i}", str(i))
+        if isinstance(template, dict):
+            return {k: APIBenchmark._render(v, i) for k, v in template.items()}
+        if isinstance(template, list):
+            return [APIBenchmark._render(v, i) for v in template]
+        return template
+
+    def _send(self, i):
+        endpoint = self._render(self.endpoint, i)
+        if self.method == "GET":
+            return self.client.get(endpoint)
+        if self.method == "POST":
+            return self.client.post(endpoint, self._render(self.payload_template, i))
+        raise ValueError(f"❌ Unsupported benchmark method: {self.method}")
+
+    @staticmethod
+    def _percentile(sorted_values, pct):
+        """Nearest-rank percentile."""
+        if not sorted_values:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def run(self):
+        samples = [] # (latency_ms, ok)
+        counter = [0]
+        lock = threading.Lock()
+        start = time.perf_counter()
+        deadline = start + self.duration_s if self.duration_s else None
+
+        def next_index():
+            with lock:
+                i = counter[0]
+                counter[0] += 1
+            if self.request_count is not None and i >= self.request_count:
+                return None
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            return i
+
+        def worker(worker_idx):
+            if self.ramp_up_s:
+                time.sleep(self.ramp_up_s * worker_idx / self.concurrency)
+            while (i := next_index()) is not None:
+                t0 = time.perf_counter()
+                try:
+                    ok = self._send(i).status_code < 400
+                except Exception as e:
+                    self.logger.debug(f"Request #{i} failed: {e}")
+                    ok = False
+                samples.append(((time.perf_counter() - t0) * 1000, ok))
+
+        self.logger.info(f"🏁 Benchmark '{self.name}': {self.method} {self.endpoint} x{self.concurrency} workers")
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bench") as executor:
+                list(executor.map(worker, range(self.concurrency)))
+        finally:
+            self.session.close()
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        result = {
+            "name": self.name,
+            "method": self.method,
+            "endpoint": self.endpoint,
+            "concurrency": self.concurrency,
+            "ramp_up_s": self.ramp_up_s,
+            "duration_s": round(elapsed, 3),
+            "requests": len(samples),
+            "errors": errors,
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+            "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": round(self._percentile(latencies, 50), 2),
+                "p90": round(self._percentile(latencies, 90), 2),
+                "p99": round(self._percentile(latencies, 99), 2),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+            },
+        }
+        self._report(result)
+        return result
+
+    def _report(self, result):
+        lat = result["latency_ms"]
+        summary = (
+            f"Requests: {result['requests']} | Errors: {result['errors']} ({result['error_rate']:.2%}) | "
+            f"Throughput: {result['throughput_rps']} req/s\n"
+            f"Latency (ms) -> p50: {lat['p50']} | p90: {lat['p90']} | p99: {lat['p99']} | max: {lat['max']}"
+        )
+        self.logger.info(f"📊 {summary}")
+
+        payload = json.dumps(result, indent=4)
+        allure.attach(summary, name=f"Benchmark Summary - {self.name}", attachment_type=AttachmentType.TEXT)
+        allure.attach(payload, name=f"Benchmark Result - {self.name}", attachment_type=AttachmentType.JSON)
+
+        os.makedirs(self.RESULTS_DIR, exist_ok=True)
+        worker = os.getenv("PYTEST_XDIST_WORKER", "master")
+        with open(os.path.join(self.RESULTS_DIR, f"{self.name}_{worker}.json"), "w") as f:
+            f.write(payload)
+
+    @staticmethod
+    def assert_thresholds(result, p50_ms=None, p90_ms=None, p99_ms=None, max_ms=None,
+                          max_error_rate=None, min_throughput_rps=None):
+        """Fails (AssertionError) with every violated limit listed."""
+        lat = result["latency_ms"]
+        checks = [
+            ("p50", lat["p50"], p50_ms, "ms", "<="),
+            ("p90", lat["p90"], p90_ms, "ms", "<="),
+            ("p99", lat["p99"], p99_ms, "ms", "<="),
+            ("max", lat["max"], max_ms, "ms", "<="),
+            ("error_rate", result["error_rate"], max_error_rate, "", "<="),
+            ("throughput", result["throughput_rps"], min_throughput_rps, " req/s", ">="),
+        ]
+        violations = [
+            f"{name}: {actual}{unit} (limit {op} {limit}{unit})"
+            for name, actual, limit, unit, op in checks
+            if limit is not None and (actual > limit if op == "<=" else actual < limit)
+        ]
+        assert not violations, f"Benchmark '{result['name']}' thresholds exceeded: " + "; ".join(violations)
@@ -1,84 +1,309 @@
 # utilities/api_client.py:
 
+import os
+import time
+import asyncio
+import tempfile
+import threading
 import requests
 import logging
 import json
 import allure
+from typing import ClassVar
 from allure_commons.types import AttachmentType
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+
+# Async mode is optional
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 class APIClient:
-    def __init__(self, base_url):
+    # One pooled keep-alive session per process (== per xdist worker), shared by all clients.
+    _session = None
+    _session_lock = threading.Lock()
+    # Spooled streamed bodies, removed after the test (remove_spooled_bodies)
+    _spooled: ClassVar[list] = []
+    _spooled_lock = threading.Lock()
+
+    def __init__(self, base_url, attach_mode=None, session=None, log_level=logging.INFO):
         self.base_url = base_url
         self.logger = logging.getLogger("APIClient")
+        # Per-client session override (e.g. benchmarks: no retries); None = shared session
+        self.session = session
+        # Level of the per-request console lines (DEBUG keeps load runs quiet)
+        self.log_level = log_level
+        self.timeout = Config.API_TIMEOUT
+        # Per-client override of API_ATTACH_MODE (e.g. 'off' for load runs)
+        self.attach_mode = (attach_mode or Config.API_ATTACH_MODE).lower()
+        # Total time spent building report attachments (kept apart from request latency)
+        self.format_time_ms = 0.0
+        # Total time spent reading streamed bodies to disk (network, not formatting)
+        self.download_time_ms = 0.0
         self.headers = {
             "Content-Type": "application/json",
             "Accept": "application/json",
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         }
 
-    def get(self, endpoint):
+    @staticmethod
+    def get_session():
+        """
+        Lazily creates the shared session:
+        - Connection pool: API_POOL_SIZE keep-alive connections per host.
+        - Retry policy: see retry_policy().
+        """
+        with APIClient._session_lock:
+            if APIClient._session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=Config.API_POOL_SIZE,
+                    pool_maxsize=Config.API_POOL_SIZE,
+                    max_retries=APIClient.retry_policy()
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                APIClient._session = session
+            return APIClient._session
+
+    @staticmethod
+    def retry_policy():
+        """
+        API_MAX_RETRIES with API_BACKOFF_FACTOR on connection errors only - the same policy as
+        the async transport. Requests that reached the server (read errors, 429, 5xx) are not
+        retried: POST/PATCH would be sent twice and a flaky 5xx would be hidden by a later 200.
+        """
+        return Retry(
+            total=Config.API_MAX_RETRIES,
+            connect=Config.API_MAX_RETRIES,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=Config.API_BACKOFF_FACTOR,
+            raise_on_status=False
+        )
+
+    @staticmethod
+    def close_session():
+        with APIClient._session_lock:
+            if APIClient._session is not None:
+                APIClient._session.close()
+                APIClient._session = None
+        APIClient.remove_spooled_bodies()
+
+    def get(self, endpoint, stream=False):
+        """stream=True: the body is spooled to 'response.body_file' instead of memory."""
         url = f"{self.base_url}{endpoint}"
-        self.logger.info(f"GET {url}")
+        self.logger.log(self.log_level, f"GET {url}")
         
-        response = requests.get(url, headers=self.headers)
+        response = (self.session or self.get_session()).get(url, headers=self.headers, timeout=self.timeout, stream=stream)
         
-        self._log_and_attach(url, "GET", response)
+        self._log_and_attach(url, "GET", response, streamed=stream)
         return response
 
     def post(self, endpoint, payload):
         url = f"{self.base_url}{endpoint}"
-        self.logger.info(f"POST {url}")
+        self.logger.log(self.log_level, f"POST {url}")
         
-        response = requests.post(url, json=payload, headers=self.headers)
+        response = (self.session or self.get_session()).post(url, json=payload, headers=self.headers, timeout=self.timeout)
         
         self._log_and_attach(url, "POST", response, payload)
         return response
 
-    def _log_and_attach(self, url, method, response, payload=None):
+    def _attach_mode(self, response):
         """
-        Karate-like detailed logging and Allure reporting
+        API_ATTACH_MODE:
+        - smart (default): full details for failed responses (>= 400), byte-capped preview otherwise.
+        - full           : full details for every response (previous behaviour).
+        - off            : console log only.
+        Can be overridden per client with APIClient(base_url, attach_mode=...).
         """
-        # 1. REQUEST DETAILS (INCLUDING HEADERS)
-        # requests library stores sent headers in response.request.headers
-        req_headers = dict(response.request.headers)
-        
-        req_details = f"URL: {url}\nMethod: {method}\n"
-        req_details += f"\n--- REQUEST HEADERS ---\n{json.dumps(req_headers, indent=4)}"
-        
-        if payload:
-            req_details += f"\n\n--- REQUEST BODY ---\n{json.dumps(payload, indent=4, ensure_ascii=False)}"
-
-        # Add Request to Allure
-        allure.attach(
-            req_details, 
-            name=f"Request ({method})", 
-            attachment_type=AttachmentType.TEXT
-        )
+        mode = self.attach_mode
+        if mode == "smart":
+            return "full" if response.status_code >= 400 else "preview"
+        return mode
 
-        # 2. RESPONSE DETAILS (INCLUDING TIMING & HEADERS)
-        res_headers = dict(response.headers)
+    def _preview(self, data):
+        """First API_ATTACH_PREVIEW_BYTES of a body; never parsed or pretty-printed."""
+        cap = Config.API_ATTACH_PREVIEW_BYTES
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        text = data[:cap].decode("utf-8", errors="replace")
+        if len(data) > cap:
+            text += f"\n... [truncated: {cap} of {len(data)} bytes shown]"
+        return text
+
+    def _spool_body(self, response):
+        """
+        Streamed response: body goes chunk by chunk straight to a file (no in-memory copy).
+        The file stays available to the test as 'response.body_file' and is deleted
+        when the test finishes (remove_spooled_bodies).
+        """
+        content_type = response.headers.get("Content-Type", "")
+        suffix = ".json" if "json" in content_type else ".txt"
+        head = b""
+        with tempfile.NamedTemporaryFile(prefix="api_body_", suffix=suffix, delete=False) as f:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if len(head) < Config.API_ATTACH_PREVIEW_BYTES:
+                    head += chunk[:Config.API_ATTACH_PREVIEW_BYTES - len(head)]
+                f.write(chunk)
+            response.body_file = f.name
+        with APIClient._spooled_lock:
+            APIClient._spooled.append(response.body_file)
+        return head, os.path.getsize(response.body_file)
+
+    @staticmethod
+    def remove_spooled_bodies():
+        """Deletes the temp files of streamed bodies (called after every test and at session end)."""
+        with APIClient._spooled_lock:
+            paths, APIClient._spooled = APIClient._spooled, []
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _log_and_attach(self, url, method, response, payload=None, streamed=False):
+        """
+        Karate-like detailed logging and Allure reporting.
+        Attachment size/detail follows API_ATTACH_MODE; formatting time is measured
+        separately from the request latency.
+        """
         latency = response.elapsed.total_seconds() * 1000 # in ms
-        
-        res_details = f"Status Code: {response.status_code}\n"
-        res_details += f"Time: {latency:.0f}ms\n"
-        res_details += f"\n--- RESPONSE HEADERS ---\n{json.dumps(res_headers, indent=4)}"
-        
-        # Format Body
-        try:
-            res_body_str = json.dumps(response.json(), indent=4, ensure_ascii=False)
-            attach_type = AttachmentType.JSON
-        except Exception:
-            res_body_str = response.text
+        mode = self._attach_mode(response)
+
+        download_ms = 0.0
+        if streamed:
+            # Reading the body is network time: measured apart from formatting
+            download_start = time.perf_counter()
+            head, body_size = self._spool_body(response)
+            download_ms = (time.perf_counter() - download_start) * 1000
+            self.download_time_ms += download_ms
+
+        format_start = time.perf_counter()
+
+        if mode != "off":
+            # 1. REQUEST DETAILS (INCLUDING HEADERS)
+            # requests library stores sent headers in response.request.headers
+            req_headers = dict(response.request.headers)
+            res_headers = dict(response.headers)
+            full = mode == "full"
+
+            req_details = f"URL: {url}\nMethod: {method}\n"
+            req_details += f"\n--- REQUEST HEADERS ---\n{json.dumps(req_headers, indent=4 if full else None)}"
+
+            if payload:
+                if full:
+                    req_body = json.dumps(payload, indent=4, ensure_ascii=False)
+                else:
+                    req_body = self._preview(json.dumps(payload, ensure_ascii=False))
+                req_details += f"\n\n--- REQUEST BODY ---\n{req_body}"
+
+            # Add Request to Allure
+            allure.attach(
+                req_details, 
+                name=f"Request ({method})", 
+                attachment_type=AttachmentType.TEXT
+            )
+
+            # 2. RESPONSE DETAILS (INCLUDING TIMING & HEADERS)
+            res_details = f"Status Code: {response.status_code}\n"
+            res_details += f"Time: {latency:.0f}ms\n"
+            res_details += f"\n--- RESPONSE HEADERS ---\n{json.dumps(res_headers, indent=4 if full else None)}"
+
+            # Format Body
             attach_type = AttachmentType.TEXT
+            if streamed:
+                res_body_str = self._preview(head)
+                if body_size > len(head):
+                    res_body_str += f"\n... [streamed: {body_size} bytes total]"
+            elif full:
+                try:
+                    res_body_str = json.dumps(json.loads(response.content), indent=4, ensure_ascii=False)
+                    attach_type = AttachmentType.JSON
+                except Exception:
+                    res_body_str = response.text
+            else:
+                res_body_str = self._preview(response.content)
 
-        res_details += f"\n\n--- RESPONSE BODY ---\n{res_body_str}"
+            res_details += f"\n\n--- RESPONSE BODY ---\n{res_body_str}"
 
-        # Add Response to Allure
-        allure.attach(
-            res_details, 
-            name=f"Response ({response.status_code}) - {latency:.0f}ms", 
-            attachment_type=attach_type
-        )
+            # Add Response to Allure
+            allure.attach(
+                res_details, 
+                name=f"Response ({response.status_code}) - {latency:.0f}ms", 
+                attachment_type=attach_type
+            )
+
+            # Full streamed body: attached from disk, never loaded into memory
+            if streamed and full:
+                allure.attach.file(
+                    response.body_file,
+                    name=f"Response Body ({response.status_code})",
+                    attachment_type=AttachmentType.JSON if response.body_file.endswith(".json") else AttachmentType.TEXT
+                )
+
+        format_ms = (time.perf_counter() - format_start) * 1000
+        self.format_time_ms += format_ms
         
         # Log short summary to console
-        self.logger.info(f"Response: {response.status_code} ({latency:.0f}ms)")
\ No newline at end of file
+        download = f" | Body download: {download_ms:.1f}ms" if streamed else ""
+        self.logger.log(self.log_level, f"Response: {response.status_code} ({latency:.0f}ms){download} | Report formatting: {format_ms:.1f}ms")
+
+class AsyncAPIClient(APIClient):
+    """
+    Async variant for firing many requests concurrently (httpx.AsyncClient).
+    Logging and Allure attachments are identical to the sync client (streaming is sync-only).
+
+    Usage:
+        async with AsyncAPIClient(API_BASE_URL) as client:
+            responses = await client.gather(*(client.get(f"/posts/{i}") for i in range(1, 101)))
+    """
+
+    def __init__(self, base_url, attach_mode=None, log_level=logging.INFO):
+        if httpx is None:
+            raise ImportError("❌ 'httpx' library missing! Async API mode needs: pip install httpx")
+        super().__init__(base_url, attach_mode, log_level=log_level)
+        self.logger = logging.getLogger("AsyncAPIClient")
+        self.client = None
+
+    async def __aenter__(self):
+        # The async pool is bound to the running event loop, so it lives per 'async with' block.
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=Config.API_POOL_SIZE, max_keepalive_connections=Config.API_POOL_SIZE),
+            # Same policy as the sync session: connection errors only
+            transport=httpx.AsyncHTTPTransport(retries=Config.API_MAX_RETRIES)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+        self.client = None
+
+    async def get(self, endpoint):
+        url = f"{self.base_url}{endpoint}"
+        self.logger.log(self.log_level, f"GET {url}")
+
+        response = await self.client.get(url)
+
+        self._log_and_attach(url, "GET", response)
+        return response
+
+    async def post(self, endpoint, payload):
+        url = f"{self.base_url}{endpoint}"
+        self.logger.log(self.log_level, f"POST {url}")
+
+        response = await self.client.post(url, json=payload)
+
+        self._log_and_attach(url, "POST", response, payload)
+        return response
+
+    @staticmethod
+    async def gather(*requests_):
+        """Runs request coroutines concurrently; results keep the input order."""
+        return await asyncio.gather(*requests_)
@@ -0,0 +1,304 @@
+import os
+import json
+import time
+import platform
+import threading
+import subprocess
+
+class CapacityPlanner:
+    """
+    [ADAPTIVE WORKER SIZING] (runs on the host, stdlib only)
+    One plan for BOTH knobs, so they never disagree:
+    - pytest workers (-n)   = how many browser sessions the machine can really carry
+    - Selenoid -limit       = workers * sessions a worker may hold (DRIVER_POOL_SIZE)
+    Inputs: cores + available memory (host and Docker VM, the smaller wins) and the
+    footprint of one session (browser image from browsers_*.json + video recorder).
+    The footprint comes from the utilization history of previous runs (CapacitySampler);
+    without history it is probed once per image (CAPACITY_PROBE=true) or taken from defaults.
+    The history also corrects the next plan: sustained CPU/memory pressure -> fewer workers,
+    plenty of headroom -> one more (never above what the resources allow).
+    """
+
+    HISTORY_FILE = os.getenv("CAPACITY_HISTORY_FILE", "logs/capacity/history.json")
+    HISTORY_KEEP = 20
+    # Conservative defaults per session while nothing was measured yet
+    DEFAULT_BROWSER_MB = int(os.getenv("CAPACITY_BROWSER_MB", "1024"))
+    DEFAULT_BROWSER_CPU = float(os.getenv("CAPACITY_BROWSER_CPU", "1.0"))
+    DEFAULT_RECORDER_MB = int(os.getenv("CAPACITY_RECORDER_MB", "150"))
+    DEFAULT_RECORDER_CPU = float(os.getenv("CAPACITY_RECORDER_CPU", "0.5"))
+    WORKER_MB = int(os.getenv("CAPACITY_WORKER_MB", "200"))        # one pytest-xdist process
+    RESERVED_MB = int(os.getenv("CAPACITY_RESERVED_MB", "1024"))   # Selenoid, UI, runner, OS
+    MEMORY_HEADROOM = float(os.getenv("CAPACITY_MEMORY_HEADROOM", "0.8"))
+    CPU_OVERSUBSCRIBE = float(os.getenv("CAPACITY_CPU_OVERSUBSCRIBE", "1.0"))
+    MAX_WORKERS = int(os.getenv("CAPACITY_MAX_WORKERS", "16"))
+    PROBE = os.getenv("CAPACITY_PROBE", "false").lower() == "true"
+    PROBE_SETTLE_SECONDS = 8
+
+    def __init__(self, browsers_json_path, video_image, browser=None, record_video=None, pool_size=None):
+        self.browsers_json_path = browsers_json_path
+        self.video_image = video_image
+        self.browser = (browser or os.getenv("BROWSER", "chrome")).lower()
+        self.record_video = (record_video or os.getenv("RECORD_VIDEO", "on_failure")).lower() != "false"
+        self.pool_size = int(pool_size if pool_size is not None else os.getenv("DRIVER_POOL_SIZE", "1"))
+
+    # =========================================================================
+    # MEASUREMENTS
+    # =========================================================================
+    @staticmethod
+    def _run(cmd):
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            return result.stdout.strip() if result.returncode == 0 else ""
+        except (OSError, subprocess.TimeoutExpired):
+            return ""
+
+    @staticmethod
+    def host_resources():
+        """{"cores", "available_mb"}: host and Docker engine (Desktop VM) limits combined."""
+        cores = os.cpu_count() or 1
+        available_mb = CapacityPlanner._host_available_mb()
+
+        docker = CapacityPlanner._run(["docker", "info", "--format", "{{.NCPU}} {{.MemTotal}}"]).split()
+        if len(docker) == 2 and docker[0].isdigit() and docker[1].isdigit():
+            cores = min(cores, int(docker[0]))
+            docker_mb = int(docker[1]) // (1024 * 1024)
+            available_mb = min(available_mb, docker_mb) if available_mb else docker_mb
+        return {"cores": cores, "available_mb": available_mb or 4096}
+
+    @staticmethod
+    def _host_available_mb():
+        system = platform.system()
+        try:
+            if system == "Linux":
+                with open("/proc/meminfo") as f:
+                    for line in f:
+                        if line.startswith("MemAvailable:"):
+                            return int(line.split()[1]) // 1024
+            elif system == "Darwin":
+                return CapacityPlanner._darwin_available_mb()
+        except (OSError, ValueError):
+            pass
+        return None
+
+    @staticmethod
+    def _darwin_available_mb():
+        """
+        macOS: 'memory_pressure -Q' free percentage x hw.memsize (what the kernel's pressure
+        logic considers free). Inactive pages are NOT counted as free: on Apple Silicon they are
+        largely compressed/file-backed and reclaiming them is what raises memory pressure.
+        Fallback when memory_pressure is unavailable: free + speculative pages from vm_stat.
+        """
+        total_bytes = int(CapacityPlanner._run(["sysctl", "-n", "hw.memsize"]) or 0)
+        pressure = CapacityPlanner._run(["memory_pressure", "-Q"])
+        for line in pressure.splitlines():
+            if "free percentage" in line and total_bytes:
+                percent = int(line.rsplit(":", 1)[1].strip().rstrip("%"))
+                return total_bytes * percent // 100 // (1024 * 1024)
+
+        page_size = int(CapacityPlanner._run(["sysctl", "-n", "hw.pagesize"]) or 4096)
+        free_pages = 0
+        for line in CapacityPlanner._run(["vm_stat"]).splitlines():
+            if line.startswith(("Pages free", "Pages speculative")):
+                free_pages += int(line.split(":")[1].strip().rstrip("."))
+        return free_pages * page_size // (1024 * 1024) or None
+
+    def browser_images(self):
+        """Images of the selected browser in browsers_*.json (default version first)."""
+        try:
+            with open(self.browsers_json_path) as f:
+                browsers = json.load(f)
+        except (OSError, ValueError):
+            return []
+        entry = browsers.get(self.browser) or next(iter(browsers.values()), {})
+        versions = entry.get("versions", {})
+        default = versions.get(entry.get("default"), {})
+        images = [default.get("image")] + [v.get("image") for v in versions.values()]
+        return [img for img in dict.fromkeys(images) if img]
+
+    @staticmethod
+    def _parse_mem_mb(value):
+        """docker stats MemUsage ('512.3MiB / 7.6GiB') -> MB of the first part."""
+        amount = value.split("/")[0].strip()
+        units = {"KIB": 1 / 1024, "KB": 1 / 1024, "MIB": 1, "MB": 1, "GIB": 1024, "GB": 1024, "B": 1 / 1024 / 1024}
+        for unit, factor in units.items():
+            if amount.upper().endswith(unit):
+                try:
+                    return float(amount[: -len(unit)]) * factor
+                except ValueError:
+                    return 0.0
+        return 0.0
+
+    @staticmethod
+    def probe_image(image):
+        """Starts the image once, reads its footprint, removes it. {"mb", "cpu"} or None."""
+        container_id = CapacityPlanner._run(["docker", "run", "-d", "--rm", image])
+        if not container_id:
+            return None
+        try:
+            time.sleep(CapacityPlanner.PROBE_SETTLE_SECONDS)
+            line = CapacityPlanner._run([
+                "docker", "stats", "--no-stream", "--format", "{{.MemUsage}};{{.CPUPerc}}", container_id
+            ])
+            if ";" not in line:
+                return None
+            mem, cpu = line.split(";", 1)
+            # Idle container: a running session needs noticeably more -> x2 safety factor
+            return {"mb": CapacityPlanner._parse_mem_mb(mem) * 2, "cpu": max(float(cpu.strip("% ") or 0) / 100 * 2, 0.5)}
+        finally:
+            CapacityPlanner._run(["docker", "rm", "-f", container_id])
+
+    # =========================================================================
+    # HISTORY
+    # =========================================================================
+    @staticmethod
+    def load_history():
+        try:
+            with open(CapacityPlanner.HISTORY_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    @staticmethod
+    def append_history(entry):
+        history = CapacityPlanner.load_history()[-(CapacityPlanner.HISTORY_KEEP - 1):] + [entry]
+        os.makedirs(os.path.dirname(CapacityPlanner.HISTORY_FILE) or ".", exist_ok=True)
+        tmp_path = f"{CapacityPlanner.HISTORY_FILE}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(history, f, indent=2)
+        os.replace(tmp_path, CapacityPlanner.HISTORY_FILE)
+
+    def _footprint(self, image, default_mb, default_cpu, history):
+        """Per-container peak of recent runs -> probe -> default. Returns (mb, cpu, source)."""
+        peaks = [run["images"][image] for run in history[-3:] if image in run.get("images", {})]
+        if peaks:
+            return max(p["peak_mb"] for p in peaks), max(p["peak_cpu"] for p in peaks), "history"
+        if self.PROBE:
+            measured = self.probe_image(image)
+            if measured:
+                return measured["mb"], measured["cpu"], "probe"
+        return default_mb, default_cpu, "default"
+
+    # =========================================================================
+    # PLAN
+    # =========================================================================
+    def plan(self):
+        resources = self.host_resources()
+        history = self.load_history()
+
+        images = self.browser_images()
+        browser_image = images[0] if images else None
+        if browser_image:
+            session_mb, session_cpu, source = self._footprint(
+                browser_image, self.DEFAULT_BROWSER_MB, self.DEFAULT_BROWSER_CPU, history
+            )
+        else:
+            session_mb, session_cpu, source = self.DEFAULT_BROWSER_MB, self.DEFAULT_BROWSER_CPU, "default"
+
+        if self.record_video and self.video_image:
+            rec_mb, rec_cpu, _ = self._footprint(
+                self.video_image, self.DEFAULT_RECORDER_MB, self.DEFAULT_RECORDER_CPU, history
+            )
+            session_mb += rec_mb
+            session_cpu += rec_cpu
+
+        usable_mb = resources["available_mb"] * self.MEMORY_HEADROOM - self.RESERVED_MB
+        by_memory = int(usable_mb // (session_mb + self.WORKER_MB))
+        by_cpu = int(resources["cores"] * self.CPU_OVERSUBSCRIBE // max(session_cpu, 0.1))
+        workers = max(1, min(by_memory, by_cpu, self.MAX_WORKERS))
+
+        # Feedback from the last run of the same shape
+        adjustment = 0
+        last = history[-1] if history else None
+        if last and last.get("workers") and last.get("samples"):
+            if last.get("peak_cpu_ratio", 0) > 0.9 or last.get("peak_mem_ratio", 0) > 0.9:
+                adjustment = -1
+            elif last.get("avg_cpu_ratio", 1) < 0.5 and last.get("peak_mem_ratio", 1) < 0.7:
+                adjustment = 1
+            workers = max(1, min(last["workers"] + adjustment, workers))
+
+        return {
+            "workers": workers,
+            "selenoid_limit": workers * max(1, self.pool_size),
+            "cores": resources["cores"],
+            "available_mb": resources["available_mb"],
+            "session_mb": round(session_mb),
+            "session_cpu": round(session_cpu, 2),
+            "footprint_source": source,
+            "bound_by": "memory" if by_memory <= by_cpu else "cpu",
+            "history_adjustment": adjustment,
+        }
+
+
+class CapacitySampler:
+    """
+    Samples 'docker stats' every CAPACITY_SAMPLE_INTERVAL seconds during the run:
+    total CPU/memory ratio and the peak per image. summary() feeds the next plan.
+    """
+
+    INTERVAL = float(os.getenv("CAPACITY_SAMPLE_INTERVAL", "5"))
+
+    def __init__(self, cores, available_mb):
+        self.cores = cores
+        self.available_mb = available_mb
+        self.samples = []
+        self.images = {}   # image -> {"peak_mb", "peak_cpu"}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="capacity-sampler", daemon=True)
+        self.started = None
+
+    def start(self):
+        self.started = time.time()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=self.INTERVAL + 30)
+
+    def _loop(self):
+        while not self._stop.wait(self.INTERVAL):
+            self.sample()
+
+    def sample(self):
+        images = {}
+        for line in CapacityPlanner._run(["docker", "ps", "--format", "{{.ID}} {{.Image}}"]).splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                images[parts[0][:12]] = parts[1]
+
+        stats = CapacityPlanner._run(["docker", "stats", "--no-stream", "--format", "{{.ID}};{{.CPUPerc}};{{.MemUsage}}"])
+        total_cpu = total_mb = 0.0
+        for line in stats.splitlines():
+            try:
+                container_id, cpu, mem = line.split(";")
+                cpu_cores = float(cpu.strip("% ")) / 100
+            except ValueError:
+                continue
+            mem_mb = CapacityPlanner._parse_mem_mb(mem)
+            total_cpu += cpu_cores
+            total_mb += mem_mb
+
+            image = images.get(container_id[:12])
+            if image:
+                peak = self.images.setdefault(image, {"peak_mb": 0.0, "peak_cpu": 0.0})
+                peak["peak_mb"] = max(peak["peak_mb"], round(mem_mb, 1))
+                peak["peak_cpu"] = max(peak["peak_cpu"], round(cpu_cores, 2))
+
+        if stats:
+            self.samples.append((total_cpu / max(self.cores, 1), total_mb / max(self.available_mb, 1)))
+
+    def summary(self, plan):
+        cpu = [s[0] for s in self.samples]
+        mem = [s[1] for s in self.samples]
+        return {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_s": round(time.time() - (self.started or time.time()), 1),
+            "workers": plan["workers"],
+            "selenoid_limit": plan["selenoid_limit"],
+            "samples": len(self.samples),
+            "avg_cpu_ratio": round(sum(cpu) / len(cpu), 3) if cpu else 0.0,
+            "peak_cpu_ratio": round(max(cpu), 3) if cpu else 0.0,
+            "peak_mem_ratio": round(max(mem), 3) if mem else 0.0,
+            "images": self.images,
+        }
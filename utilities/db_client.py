@@ -1,33 +1,31 @@
 from arango import ArangoClient
 from config import Config
 import logging
+import threading
 
 class DBClient:
     def __init__(self):
         self.client = None
         self.db = None
         self.logger = logging.getLogger("DBClient")
+        # Session-wide cache: {lang: {code: message}} (error codes never change during a run)
+        self._error_cache = {}
+        self._cache_lock = threading.Lock()
         
         # --- DEBUG LOGS ---
         print(f"\n[DEBUG] Initializing DBClient... Target: {Config.ARANGO_URL}")
 
     def _connect(self):
         """
-        SMART CONNECTION MANAGER (State-Based Logic):
-        1. Is there an existing connection? If yes, 'Ping' it (Zombie Check).
-        2. If ping fails or no connection exists, establish a 'Fresh Connection'.
+        SMART CONNECTION MANAGER (Lazy Liveness):
+        1. Is there an existing connection? Use it as is (no ping before every query).
+        2. If not, establish a 'Fresh Connection' (handshake once).
+        Liveness is verified lazily: a failed query resets the connection and retries once.
         """
-        # --- STEP 1: ZOMBIE CHECK (Check existing connection) ---
         if self.db is not None:
-            try:
-                self.db.properties() # Ping
-                return # Connection is healthy, exit.
-            except Exception:
-                print("[DEBUG] ⚠️ Existing connection is dead (Zombie), reconnecting...")
-                self.db = None
-                self.client = None # Reset
+            return
 
-        # --- STEP 2: FRESH CONNECT (Connect from scratch) ---
+        # --- FRESH CONNECT (Connect from scratch) ---
         try:
             self.logger.info(f"Attempting DB connection: {Config.ARANGO_URL}")
             # Create Client object from scratch
@@ -52,6 +50,16 @@ class DBClient:
             self.db = None
             self.client = None
 
+    def _reset_connection(self):
+        print("[DEBUG] ⚠️ Query failed on existing connection (Zombie?), reconnecting...")
+        if self.client:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+        self.db = None
+        self.client = None
+
     def is_connected(self):
         """
         Check method for fixture usage.
@@ -59,26 +67,67 @@ class DBClient:
         self._connect()
         return self.db is not None
 
+    def _execute(self, aql, bind_vars):
+        """Runs AQL; on failure reconnects ONCE and retries (lazy liveness check)."""
+        for attempt in range(2):
+            self._connect()
+            if self.db is None:
+                raise ConnectionError("DB Error: Connection Failed")
+            try:
+                return list(self.db.aql.execute(aql, bind_vars=bind_vars))
+            except Exception as e:
+                self.logger.error(f"AQL query error: {e}")
+                # If error occurred, reset connection and try again with a fresh one
+                self._reset_connection()
+                if attempt == 1:
+                    raise
+
+    def get_error_messages(self, codes, lang="message_en"):
+        """
+        Bulk lookup with a session-wide cache: codes not cached yet are fetched in ONE AQL query.
+        Returns {code: message}; unknown codes map to 'Unknown Error Code'.
+        """
+        codes = list(dict.fromkeys(codes))
+        with self._cache_lock:
+            cache = self._error_cache.setdefault(lang, {})
+            missing = [code for code in codes if code not in cache]
+
+        if missing:
+            aql = "FOR doc IN error_codes FILTER doc.code IN @codes RETURN { code: doc.code, message: doc[@lang] }"
+            try:
+                rows = self._execute(aql, {"codes": missing, "lang": lang})
+            except ConnectionError as e:
+                return {code: str(e) for code in codes}
+            except Exception:
+                return {code: "DB Query Error" for code in codes}
+
+            found = {row["code"]: row["message"] for row in rows}
+            with self._cache_lock:
+                for code in missing:
+                    # Unknown codes are cached too (None) so they are not queried again
+                    cache[code] = found.get(code)
+
+        return {code: cache[code] if cache[code] is not None else "Unknown Error Code" for code in codes}
+
     def get_error_message(self, error_code, lang="message_en"):
-        # Connection guarantee (Refreshes if Zombie)
-        self._connect()
+        return self.get_error_messages([error_code], lang)[error_code]
 
-        if self.db is None:
-            return "DB Error: Connection Failed"
+    def preload_error_messages(self, lang="message_en"):
+        """Loads the whole 'error_codes' catalog of a language in one query."""
+        aql = "FOR doc IN error_codes RETURN { code: doc.code, message: doc[@lang] }"
+        rows = self._execute(aql, {"lang": lang})
+        with self._cache_lock:
+            self._error_cache.setdefault(lang, {}).update({row["code"]: row["message"] for row in rows})
+        self.logger.info(f"Error catalog preloaded: {len(rows)} codes ({lang})")
 
-        aql = f"FOR doc IN error_codes FILTER doc.code == @code RETURN doc.{lang}"
-        bind_vars = {'code': error_code}
-        
-        try:
-            cursor = self.db.aql.execute(aql, bind_vars=bind_vars)
-            result = [doc for doc in cursor]
-            return result[0] if result else "Unknown Error Code"
-        except Exception as e:
-            self.logger.error(f"AQL query error: {e}")
-            # If error occurred, reset connection for next time
-            self.db = None 
-            return "DB Query Error"
+    def invalidate_cache(self, lang=None):
+        """Explicit invalidation (e.g. after re-seeding): one language or everything."""
+        with self._cache_lock:
+            if lang is None:
+                self._error_cache.clear()
+            else:
+                self._error_cache.pop(lang, None)
 
     def close(self):
         if self.client:
-            self.client.close()
\ No newline at end of file
+            self.client.close()
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import uuid
+import fcntl
+import logging
+import statistics
+import psycopg2
+from typing import ClassVar
+from psycopg2 import sql
+from contextlib import contextmanager
+from config import Config
+
+class DBIsolation:
+    """
+    [PER-WORKER POSTGRESQL ISOLATION] (SQL_ISOLATION=template)
+    1. Template: a seeded '<POSTGRESQL_DB>_template' database, built ONCE per run
+       (first worker to arrive builds it under a file lock, the others reuse it).
+    2. Worker DB: every xdist worker clones its own database with
+       'CREATE DATABASE ... TEMPLATE ...' (file copy, no reseeding).
+    3. Test: SQLClient.isolated() wraps each test in a transaction rolled back at teardown.
+    Setup costs (template build, clone, per-test begin/rollback) are recorded and summarized.
+    """
+
+    STATE_DIR = "temp/db_isolation"
+    _run_uid = None
+    _timings: ClassVar[dict] = {"template_ms": None, "clone_ms": None, "test_setup_ms": [], "test_teardown_ms": []}
+    logger = logging.getLogger("DBIsolation")
+
+    @staticmethod
+    def is_enabled():
+        return Config.SQL_ISOLATION == "template" and Config().POSTGRES_DSN is not None
+
+    @staticmethod
+    def template_name():
+        return Config.SQL_TEMPLATE_DB or f"{Config._PG_DB}_template"
+
+    @staticmethod
+    def worker_db_name():
+        worker_id = os.getenv("PYTEST_XDIST_WORKER", "main")
+        return f"{DBIsolation.template_name()}_{worker_id}"
+
+    @staticmethod
+    def run_uid():
+        """Shared by all xdist workers of the same run (set by xdist); per process otherwise."""
+        if DBIsolation._run_uid is None:
+            DBIsolation._run_uid = os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+        return DBIsolation._run_uid
+
+    @staticmethod
+    @contextmanager
+    def _locked():
+        os.makedirs(DBIsolation.STATE_DIR, exist_ok=True)
+        with open(os.path.join(DBIsolation.STATE_DIR, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    @contextmanager
+    def _admin_connection():
+        """CREATE/DROP DATABASE cannot run inside a transaction -> autocommit on the main DB."""
+        conn = psycopg2.connect(Config().POSTGRES_DSN)
+        conn.autocommit = True
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _recreate_database(cursor, name, template=None):
+        # Leftover sessions (crashed run) would block DROP / TEMPLATE
+        cursor.execute(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = %s AND pid <> pg_backend_pid()",
+            (name,)
+        )
+        cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(name)))
+        if template:
+            cursor.execute(sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(sql.Identifier(name), sql.Identifier(template)))
+        else:
+            cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+
+    @staticmethod
+    def _build_template(seed_fn):
+        template = DBIsolation.template_name()
+        started = time.perf_counter()
+        with DBIsolation._admin_connection() as admin, admin.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (template,))
+            if cursor.fetchone() is None:
+                DBIsolation._recreate_database(cursor, template)
+
+        # Seeding is itself idempotent: an unchanged dataset is not reloaded
+        conn = psycopg2.connect(Config().postgres_dsn_for(template))
+        try:
+            seed_fn(conn)
+        finally:
+            conn.close()
+
+        elapsed = (time.perf_counter() - started) * 1000
+        DBIsolation.logger.info(f"🧱 Template DB '{template}' ready in {elapsed:.0f}ms")
+        return elapsed
+
+    @staticmethod
+    def prepare_worker_db(seed_fn):
+        """
+        Returns the DSN of this worker's private database.
+        'seed_fn(conn)' loads the fixtures into the template (called at most once per run).
+        """
+        marker_path = os.path.join(DBIsolation.STATE_DIR, "template.json")
+        template = DBIsolation.template_name()
+        worker_db = DBIsolation.worker_db_name()
+
+        with DBIsolation._locked():
+            try:
+                with open(marker_path, "r") as f:
+                    marker = json.load(f)
+            except (FileNotFoundError, ValueError):
+                marker = {}
+
+            if marker.get("run_uid") != DBIsolation.run_uid() or marker.get("template") != template:
+                DBIsolation._timings["template_ms"] = DBIsolation._build_template(seed_fn)
+                tmp_path = f"{marker_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"run_uid": DBIsolation.run_uid(), "template": template}, f)
+                os.replace(tmp_path, marker_path)
+
+            # Cloning is serialized too: TEMPLATE fails while another session is connected to the source
+            started = time.perf_counter()
+            with DBIsolation._admin_connection() as admin, admin.cursor() as cursor:
+                DBIsolation._recreate_database(cursor, worker_db, template=template)
+            DBIsolation._timings["clone_ms"] = (time.perf_counter() - started) * 1000
+
+        DBIsolation.logger.info(f"🗄️ Worker DB '{worker_db}' cloned in {DBIsolation._timings['clone_ms']:.0f}ms")
+        return Config().postgres_dsn_for(worker_db)
+
+    @staticmethod
+    def drop_worker_db():
+        worker_db = DBIsolation.worker_db_name()
+        try:
+            with DBIsolation._admin_connection() as admin, admin.cursor() as cursor:
+                cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(worker_db)))
+        except Exception as e:
+            DBIsolation.logger.warning(f"⚠️ Worker DB '{worker_db}' could not be dropped: {e}")
+
+    @staticmethod
+    def record_test(setup_ms, teardown_ms):
+        DBIsolation._timings["test_setup_ms"].append(setup_ms)
+        DBIsolation._timings["test_teardown_ms"].append(teardown_ms)
+
+    @staticmethod
+    def summary():
+        timings = DBIsolation._timings
+        setups, teardowns = timings["test_setup_ms"], timings["test_teardown_ms"]
+        return {
+            "worker": os.getenv("PYTEST_XDIST_WORKER", "main"),
+            "template_ms": timings["template_ms"],
+            "clone_ms": timings["clone_ms"],
+            "tests": len(setups),
+            "setup_avg_ms": statistics.mean(setups) if setups else 0.0,
+            "setup_max_ms": max(setups, default=0.0),
+            "teardown_avg_ms": statistics.mean(teardowns) if teardowns else 0.0,
+            "teardown_max_ms": max(teardowns, default=0.0),
+        }
+
+    @staticmethod
+    def log_summary():
+        s = DBIsolation.summary()
+        if not s["tests"] and s["clone_ms"] is None:
+            return
+        template = f"{s['template_ms']:.0f}ms" if s["template_ms"] is not None else "reused"
+        clone = f"{s['clone_ms']:.0f}ms" if s["clone_ms"] is not None else "-"
+        DBIsolation.logger.info(
+            f"📊 DB isolation [{s['worker']}] template: {template} | clone: {clone} | "
+            f"{s['tests']} tests, setup avg {s['setup_avg_ms']:.1f}ms (max {s['setup_max_ms']:.1f}ms), "
+            f"rollback avg {s['teardown_avg_ms']:.1f}ms (max {s['teardown_max_ms']:.1f}ms)"
+        )
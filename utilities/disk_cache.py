@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import fcntl
+import hashlib
+import logging
+import threading
+import argparse
+from contextlib import contextmanager
+
+class DiskCache:
+    """
+    [PERSISTENT KEY/VALUE STORE]
+    Small JSON-per-key cache that survives across runs.
+    - Atomic writes (tmp file + os.replace) and a directory lock file (fcntl):
+      safe for concurrent xdist workers.
+    - TTL: expired entries are treated as misses and removed on read.
+    - Size bound: least recently used entries (mtime, refreshed on hit) are evicted
+      once the directory grows beyond max_bytes.
+    - Binary entries (get_bytes / set_bytes) carry a sha256 of their content;
+      a truncated or corrupted file is dropped instead of being returned.
+    """
+
+    ENTRY_SUFFIXES = (".json", ".bin")
+
+    def __init__(self, directory, ttl_seconds=None, max_bytes=None):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger("DiskCache")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key, suffix=".json"):
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    @contextmanager
+    def _locked(self, shared=False):
+        """Readers share the lock; writers/eviction take it exclusively."""
+        with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with self._locked(shared=True), open(path, "r") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if self.ttl_seconds and time.time() - entry.get("created", 0) > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path) # LRU: a hit refreshes the entry
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key, value):
+        self._write(self._path(key), json.dumps({"created": time.time(), "value": value}, ensure_ascii=False).encode("utf-8"))
+
+    def get_bytes(self, key):
+        """Binary entry (e.g. an image). Layout: 32-byte sha256 digest + content."""
+        path = self._path(key, ".bin")
+        try:
+            with self._locked(shared=True), open(path, "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            return None
+
+        digest, content = blob[:32], blob[32:]
+        if len(digest) < 32 or hashlib.sha256(content).digest() != digest:
+            self.logger.warning(f"Cache entry failed validation, dropped: {os.path.basename(path)}")
+            with self._locked():
+                self._remove(path)
+            return None
+
+        try:
+            os.utime(path) # LRU: a hit refreshes the entry
+        except OSError:
+            pass
+        return content
+
+    def set_bytes(self, key, content):
+        self._write(self._path(key, ".bin"), hashlib.sha256(content).digest() + content)
+
+    def _write(self, path, payload):
+        """Atomic: readers see either the old or the new file, never a partial one."""
+        # Unique per process AND thread: concurrent writers of one key never share a temp file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            with self._locked():
+                os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Cache Write Error: {e}")
+            self._remove(tmp_path)
+            return
+        self.evict()
+
+    def entries(self):
+        """[(last_used, size, path), ...] sorted from least to most recently used."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.ENTRY_SUFFIXES):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self, max_bytes=None):
+        """Removes the least recently used entries until the cache is under max_bytes."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return 0
+
+        removed = 0
+        with self._locked():
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                removed += 1
+        return removed
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "size_mb": round(sum(size for _, size, _ in entries) / 1024 / 1024, 2),
+            "oldest_use": time.ctime(entries[0][0]) if entries else None,
+            "newest_use": time.ctime(entries[-1][0]) if entries else None,
+        }
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    """
+    Inspect / prune a cache directory:
+        python -m utilities.disk_cache temp/visual_audit_cache stats
+        python -m utilities.disk_cache temp/visual_audit_cache list
+        python -m utilities.disk_cache temp/visual_audit_cache prune --max-mb 10
+        python -m utilities.disk_cache temp/ai_cache clear
+    """
+    parser = argparse.ArgumentParser(description="Inspect and prune persistent caches.")
+    parser.add_argument("directory", help="Cache directory (e.g. temp/visual_audit_cache, temp/ai_cache)")
+    parser.add_argument("command", choices=["stats", "list", "prune", "clear"])
+    parser.add_argument("--max-mb", type=float, help="Target size for 'prune' (MB, required)")
+    args = parser.parse_args(argv)
+    # A bare 'prune' must never wipe the cache; 'clear' is the explicit way to do that
+    if args.command == "prune" and args.max_mb is None:
+        parser.error("'prune' requires --max-mb")
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ Cache directory not found: {args.directory}")
+        return 1
+
+    cache = DiskCache(args.directory)
+    if args.command == "stats":
+        print(json.dumps(cache.stats(), indent=4))
+    elif args.command == "list":
+        for last_used, size, path in cache.entries():
+            print(f"{time.ctime(last_used)}  {size / 1024:8.1f}KB  {os.path.basename(path)}")
+    elif args.command == "prune":
+        removed = cache.evict(max_bytes=int(args.max_mb * 1024 * 1024))
+        print(f"🧹 Pruned {removed} entries. Now: {cache.stats()['size_mb']}MB")
+    elif args.command == "clear":
+        removed = cache.evict(max_bytes=0)
+        print(f"🧹 Cleared {removed} entries.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
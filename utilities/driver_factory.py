@@ -1,17 +1,29 @@
 import logging
-from typing import Any
+import os
+import threading
+from typing import Any, ClassVar
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from appium import webdriver as appium_driver
 from appium.options.android import UiAutomator2Options
+from utilities.step_profiler import StepProfiler
 
 # Logger Definition
 logger = logging.getLogger("DriverFactory")
 
 class DriverFactory:
+    # --- SESSION POOL STATE ---
+    # xdist workers are separate processes, so class-level state == one pool per worker.
+    _pool: ClassVar[dict] = {}
+    _pool_lock = threading.Lock()
+    _pool_stats: ClassVar[dict] = {"hits": 0, "misses": 0, "recycled": 0}
+    _video_warned = False
+
     @staticmethod
+    @StepProfiler.timed("driver_start", lambda config, *a, **k: getattr(config, "BROWSER", ""))
     def get_driver(config: Any, execution_id: str) -> WebDriver:
         """
         Creates a WebDriver instance based on the provided configuration (Local, Remote, or Mobile).
@@ -194,4 +206,193 @@ class DriverFactory:
             
         except Exception as e:
             logger.error(f"❌ Android Driver failed to start: {e}")
-            raise e
\ No newline at end of file
+            raise e
+
+    # =========================================================================
+    # BÖLÜM 3: SESSION POOL (Warm sessions per xdist worker)
+    # =========================================================================
+    @staticmethod
+    def _pool_key(config: Any) -> tuple:
+        """Sessions are only interchangeable when all of these match."""
+        return (
+            getattr(config, "PLATFORM_NAME", "web").lower(),
+            getattr(config, "BROWSER", "chrome").lower(),
+            bool(getattr(config, "HEADLESS", False)),
+            getattr(config, "RECORD_VIDEO", "on_failure").lower(),
+        )
+
+    @staticmethod
+    @StepProfiler.timed("driver_start")
+    def acquire_driver(config: Any, execution_id: str) -> WebDriver:
+        """
+        Leases a warm session from the worker pool, or creates a new one on a miss.
+        execution_id is only used when a new session has to be created; the leased
+        driver always carries the execution_id it was created with.
+        """
+        if getattr(config, "DRIVER_POOL_SIZE", 0) <= 0:
+            driver = DriverFactory.get_driver(config, execution_id)
+            driver.execution_id = execution_id
+            return driver
+
+        key = DriverFactory._pool_key(config)
+        with DriverFactory._pool_lock:
+            idle = DriverFactory._pool.get(key, [])
+            driver = idle.pop() if idle else None
+
+        # An idle session may have been killed meanwhile (e.g. Selenoid idle timeout): replace it
+        if driver is not None and not DriverFactory._is_alive(driver):
+            logger.info(f"💀 Pooled session is gone, replacing it: {driver.session_id}")
+            DriverFactory._quit_quietly(driver)
+            driver = None
+
+        with DriverFactory._pool_lock:
+            DriverFactory._pool_stats["hits" if driver else "misses"] += 1
+
+        if driver is not None:
+            logger.info(f"♻️ Pool HIT: Session {driver.session_id} (Use #{driver.pool_uses + 1})")
+        else:
+            logger.info(f"🆕 Pool MISS: Creating new session | ExecID: {execution_id}")
+            driver = DriverFactory.get_driver(config, execution_id)
+            driver.execution_id = execution_id
+            driver.pool_uses = 0
+            DriverFactory._remember_initial_state(driver, config)
+
+        driver.pool_uses += 1
+        return driver
+
+    @staticmethod
+    def release_driver(driver: WebDriver, config: Any, discard: bool = False):
+        """
+        Returns a leased session to the pool after resetting its state.
+        The session is quit instead when:
+        - pooling is disabled or the caller asks for it (discard=True),
+        - it records video (Selenoid finalizes the video file only on quit),
+        - it reached DRIVER_POOL_MAX_USES,
+        - the reset hit a protocol error (dead/broken session),
+        - the pool for its key is already full.
+        """
+        pool_size = getattr(config, "DRIVER_POOL_SIZE", 0)
+        max_uses = getattr(config, "DRIVER_POOL_MAX_USES", 25)
+
+        reason = None
+        if pool_size <= 0 or discard:
+            reason = "discarded"
+        elif getattr(driver, "video_name", None):
+            reason = "video recording"
+            DriverFactory._warn_video_once()
+        elif getattr(driver, "pool_uses", 0) >= max_uses:
+            reason = f"max uses ({max_uses}) reached"
+        elif not DriverFactory._reset_session(driver):
+            reason = "protocol error during reset"
+
+        if reason is None:
+            key = DriverFactory._pool_key(config)
+            with DriverFactory._pool_lock:
+                idle = DriverFactory._pool.setdefault(key, [])
+                if len(idle) < pool_size:
+                    idle.append(driver)
+                    return
+            reason = "pool full"
+
+        if pool_size > 0:
+            with DriverFactory._pool_lock:
+                DriverFactory._pool_stats["recycled"] += 1
+            logger.info(f"🗑️ Session recycled ({reason}): {driver.session_id}")
+        DriverFactory._quit_quietly(driver)
+
+    @staticmethod
+    def _is_alive(driver: WebDriver) -> bool:
+        """Cheap round trip on lease; a dead session raises."""
+        try:
+            return driver.window_handles is not None
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _warn_video_once():
+        if not DriverFactory._video_warned:
+            DriverFactory._video_warned = True
+            logger.warning(
+                "⚠️ Driver pool is enabled but sessions record video: they are never pooled. "
+                "Set RECORD_VIDEO=false to get pool hits."
+            )
+
+    @staticmethod
+    def _remember_initial_state(driver: WebDriver, config: Any):
+        """Window size and timeouts of a fresh session, restored by _reset_session."""
+        if getattr(config, "PLATFORM_NAME", "web").lower() != "web":
+            return
+        try:
+            driver.initial_window_rect = driver.get_window_rect()
+            driver.initial_timeouts = driver.timeouts
+        except WebDriverException as e:
+            logger.debug(f"Initial session state not captured: {e.__class__.__name__}")
+
+    @staticmethod
+    def _reset_session(driver: WebDriver) -> bool:
+        """
+        Cleans browser state between tests: extra windows, storage, cookies, current page,
+        window size and timeouts.
+        Returns False if the session is no longer usable.
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            # Storage is origin-bound, so clear it BEFORE leaving the page.
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except WebDriverException:
+                pass # about:blank / data: pages have no storage
+
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+
+            rect = getattr(driver, "initial_window_rect", None)
+            if rect:
+                driver.set_window_rect(rect["x"], rect["y"], rect["width"], rect["height"])
+            timeouts = getattr(driver, "initial_timeouts", None)
+            if timeouts:
+                driver.timeouts = timeouts
+            return True
+        except WebDriverException as e:
+            logger.warning(f"⚠️ Session reset failed: {e.__class__.__name__}")
+            return False
+
+    @staticmethod
+    def _quit_quietly(driver: WebDriver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Quit error (ignored): {e}")
+
+    @staticmethod
+    def pool_stats() -> dict:
+        """Hit/miss metrics of the current worker's pool."""
+        with DriverFactory._pool_lock:
+            stats = dict(DriverFactory._pool_stats)
+            stats["idle"] = sum(len(v) for v in DriverFactory._pool.values())
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / total, 3) if total else 0.0
+        return stats
+
+    @staticmethod
+    def shutdown_pool():
+        """Quits every idle session. Called once per worker at session finish."""
+        with DriverFactory._pool_lock:
+            drivers = [d for idle in DriverFactory._pool.values() for d in idle]
+            DriverFactory._pool.clear()
+
+        for driver in drivers:
+            DriverFactory._quit_quietly(driver)
+
+        stats = DriverFactory.pool_stats()
+        if stats["hits"] or stats["misses"]:
+            worker = os.getenv("PYTEST_XDIST_WORKER", "master")
+            logger.info(
+                f"📊 Driver Pool [{worker}]: Hits: {stats['hits']} | Misses: {stats['misses']} | "
+                f"Recycled: {stats['recycled']} | Hit Ratio: {stats['hit_ratio']:.0%}"
+            )
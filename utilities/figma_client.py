@@ -1,69 +1,277 @@
 import os
 import time
+import hashlib
+import threading
 import requests
+from typing import ClassVar
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from utilities.disk_cache import DiskCache
 
 class FigmaClient:
+    # Tek /images çağrısında gönderilecek en fazla node (URL uzunluğu sınırı için)
+    IDS_PER_REQUEST = int(os.getenv("FIGMA_IDS_PER_REQUEST", "50"))
+    # Render indirmeleri için eşzamanlılık (= bağlantı havuzu boyutu)
+    DOWNLOAD_WORKERS = int(os.getenv("FIGMA_DOWNLOAD_WORKERS", "8"))
+    MAX_RETRIES = 3
+
+    # Render cache: anahtar dosya sürümünü (version) içerir -> Figma'da değişiklik = otomatik yenileme
+    # Sürüm bilinemezse (token yok / offline) eski düz dosya yolu kullanılır: {file_key}_{node}.png
+    CACHE_DIR = "temp/figma_cache"
+    CACHE_MAX_MB = int(os.getenv("FIGMA_CACHE_MAX_MB", "200"))
+    _cache = None
+    _versions: ClassVar[dict] = {}      # file_key -> version (bu süreçte doğrulanmış)
+    _stats: ClassVar[dict] = {"hits": 0, "misses": 0, "version_checks": 0}
+    _stats_lock = threading.Lock()
+
+    # Worker başına tek, keep-alive bağlantılı session
+    _session = None
+    _session_lock = threading.Lock()
+    # 429 geldiğinde tüm batch (bütün thread'ler) bu zamana kadar bekler
+    _rate_limited_until = 0.0
+    _rate_lock = threading.Lock()
+
     def __init__(self):
         self.token = os.getenv("FIGMA_ACCESS_TOKEN")
         self.base_url = "https://api.figma.com/v1"
-        # Cache dosyalarını tutacağımız geçici klasör
-        self.cache_dir = "temp/figma_cache"
-        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def _get_cache(cls):
+        if cls._cache is None:
+            cls._cache = DiskCache(cls.CACHE_DIR, max_bytes=cls.CACHE_MAX_MB * 1024 * 1024)
+        return cls._cache
+
+    @classmethod
+    def _count(cls, name, amount=1):
+        with cls._stats_lock:
+            cls._stats[name] += amount
+
+    @staticmethod
+    def get_session():
+        with FigmaClient._session_lock:
+            if FigmaClient._session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=FigmaClient.DOWNLOAD_WORKERS,
+                    pool_maxsize=FigmaClient.DOWNLOAD_WORKERS
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                FigmaClient._session = session
+            return FigmaClient._session
+
+    @staticmethod
+    def close_session():
+        with FigmaClient._session_lock:
+            if FigmaClient._session is not None:
+                FigmaClient._session.close()
+                FigmaClient._session = None
+
+    @staticmethod
+    def _wait_for_rate_limit():
+        with FigmaClient._rate_lock:
+            remaining = FigmaClient._rate_limited_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    @staticmethod
+    def _backoff(wait_time):
+        """Bekleme süresi batch genelinde paylaşılır: bir isteğin 429'u diğerlerini de yavaşlatır."""
+        with FigmaClient._rate_lock:
+            FigmaClient._rate_limited_until = max(FigmaClient._rate_limited_until, time.monotonic() + wait_time)
+
+    def _get(self, url, params=None, headers=None, timeout=20):
+        """
+        Retry Mechanism: 429'da Retry-After (yoksa artan bekleme) kadar beklenir.
+        Diğer hatalar (401, 404, 500) doğrudan fırlatılır.
+        """
+        for attempt in range(self.MAX_RETRIES):
+            self._wait_for_rate_limit()
+            response = self.get_session().get(url, params=params, headers=headers, timeout=timeout)
+
+            if response.status_code == 429:
+                # Rate Limit! Bekle ve tekrar dene.
+                wait_time = int(response.headers.get("Retry-After", (attempt + 1) * 5))
+                print(f"⚠️ Rate Limit (429)! {wait_time} saniye bekleniyor... (Deneme {attempt+1}/{self.MAX_RETRIES})")
+                self._backoff(wait_time)
+                continue
+
+            response.raise_for_status()
+            return response
+
+        raise Exception(f"Figma API isteği {self.MAX_RETRIES} deneme sonrası başarısız oldu.")
+
+    def get_file_version(self, file_key):
+        """
+        Dosyanın güncel sürümü (version, yoksa lastModified). Çalıştırma başına dosya başına
+        TEK ucuz istek: sonuç süreç içinde ve aynı run'daki xdist worker'ları arasında paylaşılır.
+        """
+        if file_key in FigmaClient._versions:
+            return FigmaClient._versions[file_key]
+
+        run_uid = os.getenv("PYTEST_XDIST_TESTRUNUID")
+        version_key = f"version_{hashlib.sha256(file_key.encode('utf-8')).hexdigest()[:32]}"
+        known = self._get_cache().get(version_key) or {}
+
+        if run_uid and known.get("run_uid") == run_uid:
+            version = known["version"]
+        else:
+            try:
+                self._count("version_checks")
+                data = self._get(
+                    f"{self.base_url}/files/{file_key}",
+                    params={"depth": 1},
+                    headers={"X-Figma-Token": self.token}
+                ).json()
+                version = data.get("version") or data.get("lastModified")
+                version = str(version) if version else None
+                self._get_cache().set(version_key, {"run_uid": run_uid, "version": version})
+            except Exception as e:
+                # Offline / yetki sorunu: son bilinen sürümle devam et (yoksa cache kullanılmaz)
+                version = known.get("version")
+                print(f"⚠️ Figma dosya sürümü alınamadı ({e}). Son bilinen sürüm: {version}")
+
+        FigmaClient._versions[file_key] = version
+        return version
+
+    @staticmethod
+    def _cache_key(file_key, version, node_id, scale, image_format):
+        raw = "|".join([file_key, str(version), node_id.replace("-", ":"), str(scale), image_format])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _legacy_path(cls, file_key, node_id, scale, image_format):
+        """Sürümsüz (eski / elle konmuş) dosya yolu; yalnızca varsayılan png + scale=1 render'ı için."""
+        if image_format != "png" or scale != 1:
+            return None
+        safe_node_id = node_id.replace(":", "_").replace("-", "_")
+        return os.path.join(cls.CACHE_DIR, f"{file_key}_{safe_node_id}.png")
+
+    @classmethod
+    def _read_legacy(cls, path):
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except (TypeError, OSError):
+            return None
+
+    @classmethod
+    def _write_legacy(cls, path, content):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Figma cache dosyası yazılamadı: {e}")
+
+    @classmethod
+    def _drop_legacy(cls, path):
+        """Sürümlü kayıt varken eski düz dosya bayattır: bir daha okunmaz, silinir."""
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+                print(f"🧹 Sürümsüz eski Figma cache dosyası silindi: {path}")
+            except OSError:
+                pass
+
+    @classmethod
+    def cache_stats(cls):
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    @classmethod
+    def report_cache_stats(cls):
+        stats = cls.cache_stats()
+        if not (stats["hits"] or stats["misses"]):
+            return
+        print(
+            f"📦 Figma cache: {stats['hits']} hit / {stats['misses']} miss "
+            f"(oran: {stats['hit_ratio']:.0%}) | sürüm kontrolü: {stats['version_checks']}"
+        )
 
     def get_node_image(self, file_key, node_id, use_cache=True):
         """
         Figma'dan belirli bir Node ID'nin (Frame) anlık görüntüsünü indirir.
         Smart Cache ve Retry mekanizması içerir.
         """
-        # Node ID'yi dosya sistemine uygun hale getir (1:2 -> 1_2)
-        safe_node_id = node_id.replace(":", "_").replace("-", "_")
-        cache_path = os.path.join(self.cache_dir, f"{file_key}_{safe_node_id}.png")
+        return self.get_node_images(file_key, [node_id], use_cache=use_cache)[node_id]
 
-        # 1. STRATEJİ: Caching (Varsa yerel dosyayı kullan)
-        if use_cache and os.path.exists(cache_path):
-            print(f"📦 Figma görseli cache'den yükleniyor: {cache_path}")
-            with open(cache_path, "rb") as f:
-                return f.read()
+    def get_node_images(self, file_key, node_ids, scale=1, format="png", use_cache=True):
+        """
+        Birden fazla Frame'i tek seferde getirir: {node_id: image_bytes}
+        - Cache'de olmayan tüm node'lar TEK /images çağrısında çözülür (virgülle ayrılmış ids).
+        - Render'lar ortak bağlantı havuzu üzerinden paralel indirilir.
+        """
+        results = {}
+        missing = []
+        cache = self._get_cache()
+        version = self.get_file_version(file_key) if use_cache else None
 
-        # API Çağrısı Hazırlığı
+        # 1. STRATEJİ: Caching (aynı dosya sürümünde render edilmiş görsel varsa onu kullan;
+        #    sürüm bilinemiyorsa eski düz dosya yolu)
+        for node_id in node_ids:
+            if node_id in results or node_id in missing:
+                continue
+            legacy_path = self._legacy_path(file_key, node_id, scale, format)
+            if version:
+                content = cache.get_bytes(self._cache_key(file_key, version, node_id, scale, format))
+                if content is not None:
+                    self._drop_legacy(legacy_path)
+            else:
+                content = self._read_legacy(legacy_path) if use_cache else None
+            if content is not None:
+                self._count("hits")
+                results[node_id] = content
+            else:
+                if use_cache:
+                    self._count("misses")
+                missing.append(node_id)
+
+        if results:
+            print(f"📦 {len(results)} Figma görseli cache'den yüklendi (sürüm: {version or 'bilinmiyor, sürümsüz dosya'})")
+
+        if not missing:
+            return results
+
+        # 2. STRATEJİ: Batch Render (N istek yerine tek /images çağrısı)
         headers = {"X-Figma-Token": self.token}
-        formatted_node_id = node_id.replace("-", ":")
         url = f"{self.base_url}/images/{file_key}"
-        params = {"ids": formatted_node_id, "format": "png", "scale": 1}
-
-        # 2. STRATEJİ: Retry Mechanism (Exponential Backoff)
-        max_retries = 3
-        
-        print(f"📡 Figma API'ye bağlanılıyor: {formatted_node_id}")
-        
-        for attempt in range(max_retries):
-            response = requests.get(url, headers=headers, params=params, timeout=20)
-            
-            if response.status_code == 200:
-                # Başarılı! URL'i al ve indir
-                data = response.json()
-                image_url = data["images"].get(formatted_node_id)
-                if not image_url:
-                    raise ValueError("Resim URL'i bulunamadı.")
-                
-                # Resmi indir
-                image_response = requests.get(image_url, timeout=30)
-                content = image_response.content
-                
-                # Gelecek sefer için Cache'e kaydet
-                with open(cache_path, "wb") as f:
-                    f.write(content)
-                
-                return content
-
-            elif response.status_code == 429:
-                # Rate Limit! Bekle ve tekrar dene.
-                wait_time = int(response.headers.get("Retry-After", (attempt + 1) * 5))
-                print(f"⚠️ Rate Limit (429)! {wait_time} saniye bekleniyor... (Deneme {attempt+1}/{max_retries})")
-                time.sleep(wait_time)
-            
-            else:
-                # Diğer hatalar (401, 404, 500)
-                response.raise_for_status()
+        formatted = {node_id: node_id.replace("-", ":") for node_id in missing}
+        image_urls = {}
+
+        api_ids = list(dict.fromkeys(formatted.values()))
+        for i in range(0, len(api_ids), self.IDS_PER_REQUEST):
+            chunk = api_ids[i:i + self.IDS_PER_REQUEST]
+            print(f"📡 Figma API'ye bağlanılıyor: {len(chunk)} node ({', '.join(chunk[:5])}{'...' if len(chunk) > 5 else ''})")
+            params = {"ids": ",".join(chunk), "format": format, "scale": scale}
+            data = self._get(url, params=params, headers=headers).json()
+            image_urls.update(data.get("images") or {})
+
+        not_found = [node_id for node_id in missing if not image_urls.get(formatted[node_id])]
+        if not_found:
+            raise ValueError(f"Resim URL'i bulunamadı: {not_found}")
+
+        # 3. STRATEJİ: Paralel indirme (keep-alive havuz)
+        def download(node_id):
+            content = self._get(image_urls[formatted[node_id]], timeout=30).content
+            # Gelecek sefer için Cache'e kaydet (atomik yazım + içerik hash'i + LRU sınırı)
+            legacy_path = self._legacy_path(file_key, node_id, scale, format)
+            if version:
+                cache.set_bytes(self._cache_key(file_key, version, node_id, scale, format), content)
+                self._drop_legacy(legacy_path)
+            elif use_cache and legacy_path:
+                self._write_legacy(legacy_path, content)
+            return node_id, content
+
+        workers = max(1, min(self.DOWNLOAD_WORKERS, len(missing)))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="figma") as executor:
+            for node_id, content in executor.map(download, missing):
+                results[node_id] = content
+        print(f"⬇️ {len(missing)} Figma render'ı {time.perf_counter() - started:.2f}s içinde indirildi ({workers} paralel).")
 
-        raise Exception(f"Figma API isteği {max_retries} deneme sonrası başarısız oldu.")
\ No newline at end of file
+        return results
@@ -0,0 +1,210 @@
+import io
+import os
+import time
+import base64
+import logging
+from PIL import Image
+
+class FullPageCapture:
+    """
+    [TAM SAYFA EKRAN GÖRÜNTÜSÜ]
+    Pencereyi sayfa boyuna büyütmek yerine:
+    - Chromium: CDP 'Page.captureScreenshot' + captureBeyondViewport (tek çekim, pencere boyutu değişmez).
+    - Diğerleri (Firefox) veya çok uzun sayfalar: görünüm alanı kadar kaydır -> çek -> önceden
+      ayrılmış tek tampona yapıştır (tiled scroll & stitch).
+    - Sabit 'sleep' yok: çekimden önce render'ın durulması (rAF + ağ sessizliği) beklenir.
+    """
+
+    CHROMIUM_BROWSERS = ("chrome", "chromium", "msedge", "microsoftedge")
+    # Remote oturumlarda CDP'ye geçiş uç noktası (ChromeDriver'ın Selenium dışı komutu)
+    REMOTE_CDP_COMMAND = "executeCdpCommand"
+    REMOTE_CDP_ENDPOINT = "/session/$sessionId/goog/cdp/execute"
+    # GPU doku sınırı: bundan uzun sayfalar CDP yerine parça parça çekilir
+    MAX_CDP_HEIGHT = int(os.getenv("FULL_PAGE_MAX_CDP_HEIGHT", "16384"))
+    STABLE_QUIET_MS = int(os.getenv("RENDER_STABLE_QUIET_MS", "300"))
+    STABLE_TIMEOUT_MS = int(os.getenv("RENDER_STABLE_TIMEOUT_MS", "10000"))
+    logger = logging.getLogger("FullPageCapture")
+
+    # Belge hazır + fontlar/görseller yüklü + yeni kaynak isteği yok (QUIET ms boyunca) -> stabil
+    # Görünüm alanı dışındaki loading="lazy" görseller kaydırılana kadar hiç yüklenmez -> beklenmez
+    _RENDER_STABLE_JS = """
+        const done = arguments[arguments.length - 1];
+        const quietMs = arguments[0], timeoutMs = arguments[1];
+        const start = performance.now();
+        let lastCount = -1, lastChange = start;
+        function pending() {
+            if (document.readyState !== 'complete') return true;
+            if (document.fonts && document.fonts.status !== 'loaded') return true;
+            return Array.from(document.images).some(img => {
+                if (img.complete) return false;
+                if (img.loading !== 'lazy') return true;
+                const r = img.getBoundingClientRect();
+                return r.bottom > 0 && r.right > 0 && r.top < window.innerHeight && r.left < window.innerWidth;
+            });
+        }
+        function tick() {
+            requestAnimationFrame(() => requestAnimationFrame(() => {
+                const now = performance.now();
+                const count = performance.getEntriesByType('resource').length;
+                if (count !== lastCount || pending()) { lastCount = count; lastChange = now; }
+                if (now - lastChange >= quietMs) return done(true);
+                if (now - start >= timeoutMs) return done(false);
+                setTimeout(tick, 50);
+            }));
+        }
+        tick();
+    """
+
+    # Kaydırma sonrası iki kare boyanana kadar bekle (lazy içerik / sticky header güncellensin)
+    _NEXT_FRAMES_JS = """
+        const done = arguments[arguments.length - 1];
+        requestAnimationFrame(() => requestAnimationFrame(() => done(window.scrollY)));
+    """
+
+    _PAGE_METRICS_JS = """
+        const d = document.documentElement, b = document.body;
+        return {
+            width: Math.max(d.clientWidth, d.scrollWidth, b ? b.scrollWidth : 0),
+            height: Math.max(d.scrollHeight, d.offsetHeight, d.clientHeight, b ? b.scrollHeight : 0, b ? b.offsetHeight : 0),
+            viewportWidth: window.innerWidth,
+            viewportHeight: window.innerHeight,
+            scrollX: window.scrollX,
+            scrollY: window.scrollY
+        };
+    """
+
+    # İlk parçadan sonra fixed/sticky öğeler her parçada tekrar görünmesin
+    _HIDE_FIXED_JS = """
+        const hidden = [];
+        for (const el of document.querySelectorAll('body *')) {
+            const pos = getComputedStyle(el).position;
+            if (pos === 'fixed' || pos === 'sticky') {
+                hidden.push([el, el.style.visibility]);
+                el.style.visibility = 'hidden';
+            }
+        }
+        window.__fullPageHidden = hidden;
+        return hidden.length;
+    """
+
+    _RESTORE_FIXED_JS = """
+        for (const [el, visibility] of (window.__fullPageHidden || [])) el.style.visibility = visibility;
+        window.__fullPageHidden = [];
+    """
+
+    @staticmethod
+    def wait_until_render_stable(driver, quiet_ms=None, timeout_ms=None):
+        """Render duruldu mu? True: stabil, False: zaman aşımı (yine de devam edilir)."""
+        quiet_ms = FullPageCapture.STABLE_QUIET_MS if quiet_ms is None else quiet_ms
+        timeout_ms = FullPageCapture.STABLE_TIMEOUT_MS if timeout_ms is None else timeout_ms
+        started = time.perf_counter()
+        try:
+            stable = bool(driver.execute_async_script(FullPageCapture._RENDER_STABLE_JS, quiet_ms, timeout_ms))
+        except Exception as e:
+            FullPageCapture.logger.warning(f"⚠️ Render stabilite kontrolü yapılamadı: {e}")
+            stable = False
+        FullPageCapture.logger.info(
+            f"🖼️ Render {'stabil' if stable else 'zaman aşımı'}: {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return stable
+
+    @staticmethod
+    def is_chromium(driver):
+        name = str((getattr(driver, "capabilities", None) or {}).get("browserName", "")).lower()
+        return name in FullPageCapture.CHROMIUM_BROWSERS
+
+    @staticmethod
+    def _execute_cdp(driver, cmd, params=None):
+        """
+        Yerel ChromeDriver: execute_cdp_cmd. Remote (Selenoid): goog/cdp/execute uç noktası,
+        Selenium'un public 'add_command' API'si ile kaydedilir. API yoksa (eski/yeni sürüm farkı)
+        hata fırlatılır -> capture() parça parça çekime düşer.
+        """
+        if hasattr(driver, "execute_cdp_cmd"):
+            return driver.execute_cdp_cmd(cmd, params or {})
+
+        executor = getattr(driver, "command_executor", None)
+        if not hasattr(executor, "add_command"):
+            raise RuntimeError("Remote CDP unsupported: command_executor.add_command not available")
+        if not (hasattr(executor, "get_command") and executor.get_command(FullPageCapture.REMOTE_CDP_COMMAND)):
+            executor.add_command(FullPageCapture.REMOTE_CDP_COMMAND, "POST", FullPageCapture.REMOTE_CDP_ENDPOINT)
+        return driver.execute(FullPageCapture.REMOTE_CDP_COMMAND, {"cmd": cmd, "params": params or {}})["value"]
+
+    @staticmethod
+    def capture(driver):
+        """Tam sayfa PNG byte'ları. Pencere boyutu hiçbir zaman değiştirilmez."""
+        FullPageCapture.wait_until_render_stable(driver)
+        metrics = driver.execute_script(FullPageCapture._PAGE_METRICS_JS)
+
+        started = time.perf_counter()
+        png = None
+        method = "cdp"
+        if FullPageCapture.is_chromium(driver) and metrics["height"] <= FullPageCapture.MAX_CDP_HEIGHT:
+            try:
+                png = FullPageCapture._capture_cdp(driver, metrics)
+            except Exception as e:
+                FullPageCapture.logger.warning(f"⚠️ CDP çekimi başarısız, parça parça çekime geçiliyor: {e}")
+
+        if png is None:
+            method = "stitch"
+            png = FullPageCapture._capture_stitched(driver, metrics)
+
+        FullPageCapture.logger.info(
+            f"📸 Tam sayfa ({method}): {metrics['width']}x{metrics['height']} | "
+            f"{(time.perf_counter() - started) * 1000:.0f}ms | {len(png) / 1024:.0f}KB"
+        )
+        return png
+
+    @staticmethod
+    def _capture_cdp(driver, metrics):
+        layout = FullPageCapture._execute_cdp(driver, "Page.getLayoutMetrics")
+        content = layout.get("cssContentSize") or layout.get("contentSize") or {}
+        width = int(content.get("width", metrics["width"]))
+        height = int(content.get("height", metrics["height"]))
+
+        result = FullPageCapture._execute_cdp(driver, "Page.captureScreenshot", {
+            "format": "png",
+            "captureBeyondViewport": True,
+            "clip": {"x": 0, "y": 0, "width": width, "height": height, "scale": 1},
+        })
+        return base64.b64decode(result["data"])
+
+    @staticmethod
+    def _capture_stitched(driver, metrics):
+        viewport_h = metrics["viewportHeight"]
+        total_h = metrics["height"]
+        original_scroll = (metrics["scrollX"], metrics["scrollY"])
+
+        canvas = None
+        scale = 1.0
+        try:
+            offset = 0
+            tile_index = 0
+            while True:
+                driver.execute_script("window.scrollTo(0, arguments[0]);", offset)
+                actual_y = driver.execute_async_script(FullPageCapture._NEXT_FRAMES_JS)
+                tile = Image.open(io.BytesIO(driver.get_screenshot_as_png()))
+
+                if canvas is None:
+                    # Tek tampon, bir kez ayrılır (HiDPI: ekran görüntüsü / CSS genişliği oranı)
+                    scale = tile.width / metrics["viewportWidth"]
+                    canvas = Image.new("RGB", (tile.width, int(round(total_h * scale))))
+
+                # Son parça: tarayıcı kaydırmayı sayfa sonunda sınırlar -> gerçek scrollY'ye yapıştır
+                top = int(round(actual_y * scale))
+                canvas.paste(tile.convert("RGB"), (0, top))
+
+                if tile_index == 0:
+                    driver.execute_script(FullPageCapture._HIDE_FIXED_JS)
+                tile_index += 1
+
+                if actual_y + viewport_h >= total_h or actual_y < offset:
+                    break
+                offset = actual_y + viewport_h
+        finally:
+            driver.execute_script(FullPageCapture._RESTORE_FIXED_JS)
+            driver.execute_script("window.scrollTo(arguments[0], arguments[1]);", *original_scroll)
+
+        buffer = io.BytesIO()
+        canvas.save(buffer, format="PNG")
+        return buffer.getvalue()
@@ -1,6 +1,8 @@
+import os
 import markdown
 import base64
 import io
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
 class ReportHelper:
@@ -95,47 +97,92 @@ class ReportHelper:
     # ==========================================
     # 2. YENİ YAPI (GÖRSEL RAPOR) - Başlık Hizalaması Düzeltildi
     # ==========================================
+    # Görsel rapor kırpıntıları: format/kalite (HTML'e base64 olarak gömülür)
+    CROP_FORMAT = os.getenv("VISUAL_REPORT_IMAGE_FORMAT", "webp").lower()
+    CROP_QUALITY = int(os.getenv("VISUAL_REPORT_IMAGE_QUALITY", "80"))
+    WEBP_MAX_SIDE = 16383
+    JPEG_MAX_SIDE = 65535
+    CROP_WORKERS = int(os.getenv("VISUAL_REPORT_WORKERS", "4"))
+
+    @staticmethod
+    def _encode_crop(img, box):
+        """
+        Tek bir bölgeyi kırpar ve WebP/JPEG olarak encode eder (thread pool içinde çalışır).
+        WebP en fazla 16383 px, JPEG 65535 px kenar kabul eder; daha uzun kırpıntılar
+        (uzun tam sayfa ekran görüntüleri) sırasıyla JPEG'e, PNG'ye düşer.
+        Döner: (byte'lar, mime)
+        """
+        crop = img.crop(box)
+        if crop.mode not in ("RGB", "L"):
+            crop = crop.convert("RGB")
+        fmt = "WEBP" if ReportHelper.CROP_FORMAT == "webp" else "JPEG"
+        longest = max(crop.size)
+        if fmt == "WEBP" and longest > ReportHelper.WEBP_MAX_SIDE:
+            fmt = "JPEG"
+        if fmt == "JPEG" and longest > ReportHelper.JPEG_MAX_SIDE:
+            fmt = "PNG"
+        buf = io.BytesIO()
+        if fmt == "PNG":
+            crop.save(buf, format=fmt)
+        else:
+            crop.save(buf, format=fmt, quality=ReportHelper.CROP_QUALITY)
+        return buf.getvalue(), f"image/{fmt.lower()}"
+
+    @staticmethod
+    def _crop_src(data, mime):
+        """
+        Kırpıntı HTML'e base64 olarak gömülür. Ayrı dosya olarak yazmak işe yaramaz:
+        'allure generate' sadece result JSON'larının referans ettiği attachment'ları kopyalar
+        ve yeniden adlandırır, HTML içindeki dosya adları rapor üretiminde kırılır.
+        """
+        return f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+
     @staticmethod
     def create_visual_html_report(errors, figma_bytes, live_bytes, model_name):
         """
         JSON hatalarını alır, resimleri kırpar (CROP) ve Görsel HTML Kartları oluşturur.
+        Kırpma + encode işlemleri paralel yapılır; kartlar join ile birleştirilir.
         """
         img_figma = Image.open(io.BytesIO(figma_bytes))
         img_live = Image.open(io.BytesIO(live_bytes))
+        # Thread'ler aynı görseli okuyacağı için decode bir kez, burada yapılır
+        img_figma.load()
+        img_live.load()
         
         f_width, f_height = img_figma.size
         l_width, l_height = img_live.size
 
         # Raporun Gövdesi
-        html_cards = ""
+        html_cards = []
 
         if not errors:
-            html_cards = """
+            html_cards.append("""
             <div style='padding:40px; text-align:center; background:#fff;'>
                 <div style='font-size: 40px; margin-bottom: 10px;'>✅</div>
                 <h3 style='color:#28a745; margin:0;'>Pixel Perfect! No visual issues found.</h3>
                 <p style='color:#6c757d; margin-top:5px;'>The live implementation matches the design specs.</p>
             </div>
-            """
+            """)
         else:
+            # 1. Tüm kırpma işlerini planla
+            jobs = []
             for err in errors:
                 y_start = max(0.0, float(err.get('y_start', 0)) - 0.05)
                 y_end = min(1.0, float(err.get('y_end', 0)) + 0.05)
-                
-                f_crop = img_figma.crop((0, int(f_height * y_start), f_width, int(f_height * y_end)))
-                l_crop = img_live.crop((0, int(l_height * y_start), l_width, int(l_height * y_end)))
+                jobs.append((img_figma, (0, int(f_height * y_start), f_width, int(f_height * y_end))))
+                jobs.append((img_live, (0, int(l_height * y_start), l_width, int(l_height * y_end))))
 
-                def to_b64(img):
-                    buf = io.BytesIO()
-                    img.save(buf, format="PNG")
-                    return base64.b64encode(buf.getvalue()).decode("utf-8")
+            # 2. Paralel kırp + encode (sıra korunur)
+            with ThreadPoolExecutor(max_workers=ReportHelper.CROP_WORKERS) as executor:
+                encoded = list(executor.map(lambda job: ReportHelper._encode_crop(*job), jobs))
+            sources = [ReportHelper._crop_src(data, mime) for data, mime in encoded]
 
-                f_b64 = to_b64(f_crop)
-                l_b64 = to_b64(l_crop)
-                
+            # 3. Kartlar
+            for i, err in enumerate(errors):
+                f_src, l_src = sources[2 * i], sources[2 * i + 1]
                 severity_color = "#dc3545" if err.get('severity') == 'High' else "#ffc107"
 
-                html_cards += f"""
+                html_cards.append(f"""
                 <div class="ai-visual-card">
                     <div class="ai-visual-header">
                         <span class="ai-severity-dot" style="background-color: {severity_color};"></span>
@@ -147,16 +194,18 @@ class ReportHelper:
                         <div class="ai-comparison-row">
                             <div class="ai-img-container">
                                 <span class="ai-label">🎯 Figma Design (Expected)</span>
-                                <img src="data:image/png;base64,{f_b64}" />
+                                <img src="{f_src}" loading="lazy" />
                             </div>
                             <div class="ai-img-container">
                                 <span class="ai-label">💻 Live Site (Actual)</span>
-                                <img src="data:image/png;base64,{l_b64}" />
+                                <img src="{l_src}" loading="lazy" />
                             </div>
                         </div>
                     </div>
                 </div>
-                """
+                """)
+
+        html_cards = "".join(html_cards)
 
         # --- DÜZELTME BURADA YAPILDI ---
         visual_template = f"""
@@ -0,0 +1,85 @@
+import os
+import logging
+from collections import deque
+import allure
+from allure_commons.types import AttachmentType
+
+class ScreenshotPolicy:
+    """
+    [SCREENSHOT POLICY ENGINE] Decides what BasePage.take_screenshot really does.
+    SCREENSHOT_MODE:
+    - always    : capture + attach on every call (default, previous behaviour).
+    - on_failure: keep the last SCREENSHOT_BUFFER_SIZE frames in memory (ring buffer),
+                  attach them only if the test fails.
+    - sampled   : capture + attach every SCREENSHOT_SAMPLE_EVERY-th call.
+    - off       : never capture.
+    Frames are captured synchronously on the test thread: a background capture would race the
+    test's own commands on the same session and could show a later state than its step name.
+    'on_failure' saves the attachment writes, not the capture round trip.
+    One policy lives on each driver session and is reset at the end of every test.
+    "Screenshot Stats" is attached only in the non-default modes (always = one attach per call).
+    """
+
+    MODE = os.getenv("SCREENSHOT_MODE", "always").lower()
+    BUFFER_SIZE = int(os.getenv("SCREENSHOT_BUFFER_SIZE", "5"))
+    SAMPLE_EVERY = max(1, int(os.getenv("SCREENSHOT_SAMPLE_EVERY", "5")))
+
+    logger = logging.getLogger("ScreenshotPolicy")
+
+    def __init__(self, driver, mode=None):
+        self.driver = driver
+        self.mode = (mode or ScreenshotPolicy.MODE).lower()
+        self.frames = deque(maxlen=ScreenshotPolicy.BUFFER_SIZE)
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.calls = 0
+        self.taken = 0
+        self.flushed = 0
+
+    @staticmethod
+    def for_driver(driver):
+        """Returns the policy bound to this driver session (created on first use)."""
+        policy = getattr(driver, "screenshot_policy", None)
+        if policy is None:
+            policy = ScreenshotPolicy(driver)
+            driver.screenshot_policy = policy
+        return policy
+
+    def capture(self, name):
+        self.calls += 1
+
+        if self.mode == "off":
+            return
+        if self.mode == "sampled" and (self.calls - 1) % ScreenshotPolicy.SAMPLE_EVERY != 0:
+            return
+
+        if self.mode == "on_failure":
+            self.frames.append((name, self.driver.get_screenshot_as_png()))
+            self.taken += 1
+            return
+
+        # always / sampled
+        png = self.driver.get_screenshot_as_png()
+        self.taken += 1
+        allure.attach(png, name=name, attachment_type=AttachmentType.PNG)
+        self.flushed += 1
+
+    def flush(self):
+        """Attaches the buffered frames (oldest first)."""
+        while self.frames:
+            name, png = self.frames.popleft()
+            allure.attach(png, name=f"[Buffered] {name}", attachment_type=AttachmentType.PNG)
+            self.flushed += 1
+
+    def finish(self, failed):
+        """Test end: flush on failure, report taken vs flushed, reset for the next lease."""
+        if failed and self.mode == "on_failure":
+            self.flush()
+        self.frames.clear()
+
+        summary = f"Mode: {self.mode} | Calls: {self.calls} | Taken: {self.taken} | Flushed: {self.flushed}"
+        if self.calls and self.mode != "always":
+            allure.attach(summary, name="Screenshot Stats", attachment_type=AttachmentType.TEXT)
+            self.logger.info(f"📸 {summary}")
+        self._reset_counters()
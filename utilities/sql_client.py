@@ -1,37 +1,123 @@
 # utilities/sql_client.py:
 
+import io
+import re
+import csv
+import time
+import uuid
+import threading
 import psycopg2
+import psycopg2.extras
+from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 import logging
+from contextlib import contextmanager
 from config import Config
 
 class SQLClient:
-    def __init__(self):
-        self.connection = None
-        self.cursor = None
+    """
+    Pooled PostgreSQL client, thread-safe within a worker.
+    - Pool: SQL_POOL_MIN..SQL_POOL_MAX connections (lazy). More threads than SQL_POOL_MAX
+      wait for a free connection (up to SQL_POOL_WAIT_TIMEOUT) instead of failing with PoolError.
+    - Health check: no 'SELECT 1' per use; a connection is pinged only after being idle
+      longer than SQL_HEALTH_CHECK_INTERVAL, broken ones are replaced.
+    - Bulk: execute_many (execute_values / execute_batch), copy_from (COPY ... FROM STDIN).
+    - Streaming: stream_query yields rows from a server-side named cursor.
+    - Transactions: opt-in 'with client.transaction():' groups statements into one commit;
+      nested transactions become savepoints.
+    - Isolation: 'with client.isolated():' pins one connection and rolls everything back at exit
+      (per-test isolation on a per-worker database, see DBIsolation).
+    """
+
+    _VALUES_PLACEHOLDER = re.compile(r"VALUES\s+%s", re.IGNORECASE)
+
+    def __init__(self, dsn=None):
+        self.dsn = dsn                    # None -> Config.POSTGRES_DSN
+        self.pool = None
         self.logger = logging.getLogger("SQLClient")
         self.config = Config()
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(Config.SQL_POOL_MAX) # getconn() raises past maxconn
+        self._last_used = {}              # id(conn) -> last release time
+        self._tx = threading.local()      # pinned connection / transaction depth / isolation (per thread)
 
     def connect(self):
-        """Lazy Connection: Connect when needed."""
-        if self.connection:
+        """Lazy Connection: Create the pool when needed."""
+        if self.pool:
             return
 
-        dsn = self.config.POSTGRES_DSN
+        dsn = self.dsn or self.config.POSTGRES_DSN
         if not dsn:
             # Falls here if .env is empty
             self.logger.warning("⚠️ PostgreSQL settings missing. Continuing without Test DB connection.")
             return
 
+        with self._pool_lock:
+            if self.pool:
+                return
+            try:
+                # Security: Do not log the password
+                self.logger.info(f"Attempting SQL Connection: {self.config._PG_HOST}:{self.config._PG_PORT}")
+
+                self.pool = ThreadedConnectionPool(Config.SQL_POOL_MIN, Config.SQL_POOL_MAX, dsn)
+                self.logger.info(f"✅ PostgreSQL Pool Ready (min={Config.SQL_POOL_MIN}, max={Config.SQL_POOL_MAX}).")
+            except Exception as e:
+                self.logger.error(f"❌ SQL Connection Error: {e}")
+                self.pool = None
+
+    def _is_healthy(self, conn):
+        """Cheap checks first; a round trip only for connections idle too long."""
+        if conn.closed:
+            return False
+        idle = time.monotonic() - self._last_used.get(id(conn), 0)
+        if idle < Config.SQL_HEALTH_CHECK_INTERVAL:
+            return True
         try:
-            # Security: Do not log the password
-            self.logger.info(f"Attempting SQL Connection: {self.config._PG_HOST}:{self.config._PG_PORT}")
-            
-            self.connection = psycopg2.connect(dsn)
-            self.cursor = self.connection.cursor()
-            self.logger.info("✅ PostgreSQL Connection Successful.")
-        except Exception as e:
-            self.logger.error(f"❌ SQL Connection Error: {e}")
-            self.connection = None
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def _connection(self):
+        """Leases a healthy connection (or the one of the open transaction)."""
+        tx_conn = getattr(self._tx, "conn", None)
+        if tx_conn is not None:
+            yield tx_conn
+            return
+
+        if not self._slots.acquire(timeout=Config.SQL_POOL_WAIT_TIMEOUT):
+            raise PoolError(f"No free connection within {Config.SQL_POOL_WAIT_TIMEOUT}s (SQL_POOL_MAX={Config.SQL_POOL_MAX})")
+        try:
+            conn = self.pool.getconn()
+            if not self._is_healthy(conn):
+                self.logger.warning("⚠️ Pooled connection is dead, replacing it.")
+                self.pool.putconn(conn, close=True)
+                conn = self.pool.getconn()
+
+            broken = False
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True
+                raise
+            finally:
+                self._last_used[id(conn)] = time.monotonic()
+                self.pool.putconn(conn, close=broken or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    def _in_transaction(self):
+        return getattr(self._tx, "depth", 0) > 0
+
+    def _is_isolated(self):
+        return getattr(self._tx, "isolated", False)
+
+    def _execute_control(self, conn, statement):
+        with conn.cursor() as cursor:
+            cursor.execute(statement)
 
     def is_connected(self):
         """
@@ -39,38 +125,225 @@ class SQLClient:
         """
         self.connect() # Try connecting
         
-        if self.connection is None:
+        if self.pool is None:
             return False
 
         try:
-            # Test connection with the simplest query (Ping)
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
+            # Test connection with the simplest query (Ping) - once, for the fixture
+            with self._connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
             return True
         except Exception:
             return False
 
+    @contextmanager
+    def transaction(self):
+        """
+        Groups statements into ONE commit (rolled back on error):
+            with sql_client.transaction():
+                sql_client.execute_query("INSERT ...")
+                sql_client.execute_query("UPDATE ...")
+        """
+        self.connect()
+        if not self.pool:
+            raise RuntimeError("❌ No PostgreSQL connection for transaction.")
+
+        pinned = getattr(self._tx, "conn", None)
+        if pinned is not None:
+            # Nested (or inside isolated()): a savepoint, so only this block is undone on error
+            depth = getattr(self._tx, "depth", 0)
+            savepoint = f"sqlclient_tx_{depth}"
+            self._execute_control(pinned, f"SAVEPOINT {savepoint}")
+            self._tx.depth = depth + 1
+            try:
+                yield
+                self._execute_control(pinned, f"RELEASE SAVEPOINT {savepoint}")
+            except Exception:
+                self._execute_control(pinned, f"ROLLBACK TO SAVEPOINT {savepoint}")
+                raise
+            finally:
+                self._tx.depth = depth
+            return
+
+        with self._connection() as conn:
+            self._tx.conn = conn
+            self._tx.depth = 1
+            try:
+                yield
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._tx.conn = None
+                self._tx.depth = 0
+
+    @contextmanager
+    def isolated(self):
+        """
+        Rollback-only scope (one test):
+            with sql_client.isolated():
+                sql_client.execute_query("DELETE FROM users")  # visible only inside the scope
+        Nothing is ever committed; the whole scope is rolled back at exit.
+        """
+        self.connect()
+        if not self.pool:
+            raise RuntimeError("❌ No PostgreSQL connection for isolated scope.")
+        if getattr(self._tx, "conn", None) is not None:
+            raise RuntimeError("❌ isolated() cannot be opened inside another transaction.")
+
+        with self._connection() as conn:
+            self._tx.conn = conn
+            self._tx.depth = 0
+            self._tx.isolated = True
+            try:
+                yield self
+            finally:
+                self._tx.conn = None
+                self._tx.isolated = False
+                conn.rollback()
+
+    def _begin(self, conn):
+        """Isolated scope: a standalone statement runs in a savepoint instead of its own commit."""
+        if self._is_isolated() and not self._in_transaction():
+            self._execute_control(conn, "SAVEPOINT sqlclient_stmt")
+
+    def _finish(self, conn, ok):
+        """Autocommit per statement unless a transaction is open."""
+        if self._in_transaction():
+            return
+        if self._is_isolated():
+            # A failing statement must not abort the test's outer transaction
+            self._execute_control(conn, "RELEASE SAVEPOINT sqlclient_stmt" if ok else "ROLLBACK TO SAVEPOINT sqlclient_stmt")
+            return
+        if ok:
+            conn.commit()
+        else:
+            conn.rollback()
+
     def execute_query(self, query, params=None):
         self.connect()
-        if not self.connection:
+        if not self.pool:
             return None
 
         try:
-            self.cursor.execute(query, params)
-            self.connection.commit()
-            
-            if query.strip().upper().startswith("SELECT"):
-                return self.cursor.fetchall()
-            else:
-                return self.cursor.rowcount
+            with self._connection() as conn:
+                self._begin(conn)
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute(query, params)
+                        if query.strip().upper().startswith("SELECT"):
+                            result = cursor.fetchall()
+                        else:
+                            result = cursor.rowcount
+                    self._finish(conn, ok=True)
+                    return result
+                except Exception:
+                    self._finish(conn, ok=False)
+                    raise
         except Exception as e:
             self.logger.error(f"Query Error: {e}")
-            self.connection.rollback()
+            if self._in_transaction():
+                raise
+            return None
+
+    def execute_many(self, query, params_list, page_size=1000):
+        """
+        Bulk statement in pages instead of one round trip per row.
+        'INSERT ... VALUES %s' uses execute_values, anything else execute_batch.
+        Returns the affected row count (None on error).
+        """
+        self.connect()
+        if not self.pool:
+            return None
+
+        try:
+            with self._connection() as conn:
+                self._begin(conn)
+                try:
+                    with conn.cursor() as cursor:
+                        if self._VALUES_PLACEHOLDER.search(query):
+                            psycopg2.extras.execute_values(cursor, query, params_list, page_size=page_size)
+                        else:
+                            psycopg2.extras.execute_batch(cursor, query, params_list, page_size=page_size)
+                        rowcount = cursor.rowcount
+                    self._finish(conn, ok=True)
+                    return rowcount
+                except Exception:
+                    self._finish(conn, ok=False)
+                    raise
+        except Exception as e:
+            self.logger.error(f"Bulk Query Error: {e}")
+            if self._in_transaction():
+                raise
+            return None
+
+    def copy_from(self, table, rows, columns):
+        """
+        Fastest bulk load: COPY table (columns) FROM STDIN (CSV).
+        'rows' can be any iterable of tuples. Returns the number of rows copied.
+        Table and column names are composed with psycopg2.sql.Identifier, never interpolated.
+        """
+        self.connect()
+        if not self.pool:
             return None
 
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        buffer.seek(0)
+
+        statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+            sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+        )
+        try:
+            with self._connection() as conn:
+                self._begin(conn)
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.copy_expert(statement, buffer)
+                    self._finish(conn, ok=True)
+                    return count
+                except Exception:
+                    self._finish(conn, ok=False)
+                    raise
+        except Exception as e:
+            self.logger.error(f"COPY Error: {e}")
+            if self._in_transaction():
+                raise
+            return None
+
+    def stream_query(self, query, params=None, batch_size=1000):
+        """
+        Generator over a large result set via a server-side (named) cursor:
+        only 'batch_size' rows are held in memory at a time.
+        """
+        self.connect()
+        if not self.pool:
+            return
+
+        with self._connection() as conn:
+            self._begin(conn)
+            cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex}")
+            cursor.itersize = batch_size
+            ok = False
+            try:
+                cursor.execute(query, params)
+                for row in cursor:
+                    yield row
+                ok = True
+            finally:
+                if ok:
+                    cursor.close()
+                self._finish(conn, ok=ok)
+
     def close(self):
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
-            self.logger.info("SQL connection closed.")
\ No newline at end of file
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
+            self.logger.info("SQL connection pool closed.")
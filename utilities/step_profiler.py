@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+import pytest
+from typing import ClassVar
+from utilities.allure_results import AllureResults
+
+class StepProfiler:
+    """
+    [STEP PROFILER] Where does a UI test spend its time?
+    - Instrumented calls (BasePage find/click/send_text/take_screenshot/waits,
+      DriverFactory.get_driver, driver fixture teardown) are recorded as a call tree
+      with wall time per step and per category (exclusive time, nested steps not counted twice).
+    - Per test: a flame-style "Step Timings" attachment (injected at session end, like the AI reports).
+    - Per run: PROFILE_RESULTS_DIR/run_profile.json with the slowest steps and category totals
+      (every worker writes its own part, the master merges them).
+    - Budgets: @pytest.mark.time_budget(seconds, mode="warn"|"fail") or TEST_TIME_BUDGET for all tests.
+    One test runs at a time per worker, so the profile of the running test is class-level state;
+    steps from background threads are not part of the tree.
+    """
+
+    ENABLED = os.getenv("STEP_PROFILER", "true").lower() == "true"
+    RESULTS_DIR = os.getenv("PROFILE_RESULTS_DIR", "logs/profiles")
+    TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+    DEFAULT_BUDGET = float(os.getenv("TEST_TIME_BUDGET", "0")) # seconds, 0 = no budget
+    BUDGET_MODE = os.getenv("TEST_BUDGET_MODE", "warn").lower()
+
+    _current = None
+    _finished: ClassVar[list] = []
+    _local = threading.local()
+    logger = logging.getLogger("StepProfiler")
+
+    # =========================================================================
+    # RECORDING
+    # =========================================================================
+    @staticmethod
+    def start_test(item):
+        if not StepProfiler.ENABLED:
+            return
+        marker = item.get_closest_marker("time_budget")
+        budget = marker.args[0] if marker and marker.args else StepProfiler.DEFAULT_BUDGET
+        mode = (marker.kwargs.get("mode") if marker else None) or StepProfiler.BUDGET_MODE
+
+        StepProfiler._current = {
+            "node_id": item.nodeid,
+            "started": time.perf_counter(),
+            "duration_ms": 0.0,
+            "budget_s": float(budget or 0),
+            "budget_mode": mode,
+            "budget_exceeded": False,
+            "children": [],
+        }
+        StepProfiler._local.stack = []
+
+    @staticmethod
+    def begin(name, category):
+        """Opens a step on the test thread; returns a handle for end() (None when not recording)."""
+        profile = StepProfiler._current
+        stack = getattr(StepProfiler._local, "stack", None)
+        if profile is None or stack is None:
+            return None
+
+        node = {"name": name, "category": category, "started": time.perf_counter(), "duration_ms": 0.0, "children": []}
+        (stack[-1]["children"] if stack else profile["children"]).append(node)
+        stack.append(node)
+        return node
+
+    @staticmethod
+    def end(node):
+        if node is None:
+            return
+        node["duration_ms"] = (time.perf_counter() - node["started"]) * 1000
+        stack = getattr(StepProfiler._local, "stack", None)
+        if stack and stack[-1] is node:
+            stack.pop()
+
+    @staticmethod
+    @contextmanager
+    def step(name, category):
+        node = StepProfiler.begin(name, category)
+        try:
+            yield
+        finally:
+            StepProfiler.end(node)
+
+    @staticmethod
+    def timed(category, describe=None):
+        """
+        Decorator: @StepProfiler.timed("find", lambda self, locator, *a, **k: str(locator))
+        Place it ABOVE @allure.step so Allure still sees the original signature.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if StepProfiler._current is None:
+                    return func(*args, **kwargs)
+                name = func.__qualname__
+                if describe:
+                    try:
+                        name = f"{name} {describe(*args, **kwargs)}"
+                    except Exception:
+                        pass
+                with StepProfiler.step(name, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def elapsed_s():
+        profile = StepProfiler._current
+        return time.perf_counter() - profile["started"] if profile else 0.0
+
+    # =========================================================================
+    # BUDGETS
+    # =========================================================================
+    @staticmethod
+    def apply_budget(item, rep):
+        """Called with the 'call' report: setup + call time against the test's budget."""
+        profile = StepProfiler._current
+        if profile is None or not profile["budget_s"]:
+            return
+
+        elapsed = StepProfiler.elapsed_s()
+        if elapsed <= profile["budget_s"]:
+            return
+
+        profile["budget_exceeded"] = True
+        message = f"⏱️ Time budget exceeded: {elapsed:.1f}s > {profile['budget_s']:.1f}s (setup + call)"
+        if profile["budget_mode"] == "fail" and rep.passed:
+            rep.outcome = "failed"
+            rep.longrepr = message
+        else:
+            item.warn(pytest.PytestWarning(message))
+        StepProfiler.logger.warning(f"{message} | {item.nodeid}")
+
+    # =========================================================================
+    # REPORTING
+    # =========================================================================
+    @staticmethod
+    def finish_test():
+        """After teardown: freezes the profile of the test (attached at session end)."""
+        profile = StepProfiler._current
+        if profile is None:
+            return
+        profile["duration_ms"] = (time.perf_counter() - profile["started"]) * 1000
+        StepProfiler._finished.append(profile)
+        StepProfiler._current = None
+        StepProfiler._local.stack = None
+
+    @staticmethod
+    def _walk(nodes, depth=0, path=""):
+        for node in nodes:
+            node_path = f"{path} > {node['name']}" if path else node["name"]
+            self_ms = node["duration_ms"] - sum(child["duration_ms"] for child in node["children"])
+            yield depth, node, node_path, max(self_ms, 0.0)
+            yield from StepProfiler._walk(node["children"], depth + 1, node_path)
+
+    @staticmethod
+    def category_totals(profile):
+        totals = {}
+        for _, node, _, self_ms in StepProfiler._walk(profile["children"]):
+            totals[node["category"]] = totals.get(node["category"], 0.0) + self_ms
+        instrumented = sum(node["duration_ms"] for node in profile["children"])
+        totals["(uninstrumented)"] = max(profile["duration_ms"] - instrumented, 0.0)
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    @staticmethod
+    def render_flame(profile, width=30):
+        """Indented call tree with bars relative to the whole test (flame graph in text form)."""
+        total = profile["duration_ms"] or 1.0
+        lines = [f"{profile['node_id']}  total {total:.0f}ms", ""]
+        for depth, node, _, _ in StepProfiler._walk(profile["children"]):
+            bar = "█" * max(1, int(round(node["duration_ms"] / total * width)))
+            lines.append(
+                f"{node['duration_ms']:8.0f}ms {node['duration_ms'] / total:6.1%}  "
+                f"{bar:<{width}}  {'  ' * depth}[{node['category']}] {node['name']}"
+            )
+        lines += ["", "By category (exclusive time):"]
+        for category, ms in StepProfiler.category_totals(profile).items():
+            lines.append(f"{ms:8.0f}ms {ms / total:6.1%}  {category}")
+        if profile["budget_s"]:
+            state = "EXCEEDED" if profile["budget_exceeded"] else "ok"
+            lines.append(f"\nBudget: {profile['budget_s']:.1f}s ({profile['budget_mode']}) -> {state}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _summarize(profile):
+        steps = [
+            {"node_id": profile["node_id"], "step": path, "category": node["category"],
+             "duration_ms": round(node["duration_ms"], 1), "self_ms": round(self_ms, 1)}
+            for _, node, path, self_ms in StepProfiler._walk(profile["children"])
+        ]
+        return {
+            "node_id": profile["node_id"],
+            "duration_ms": round(profile["duration_ms"], 1),
+            "budget_exceeded": profile["budget_exceeded"],
+            "categories": {k: round(v, 1) for k, v in StepProfiler.category_totals(profile).items()},
+            "slowest_steps": sorted(steps, key=lambda s: -s["self_ms"])[:StepProfiler.TOP_N],
+        }
+
+    @staticmethod
+    def flush():
+        """Worker session end: attach every test's flame text + write this worker's JSON part."""
+        profiles, StepProfiler._finished = StepProfiler._finished, []
+        if not profiles:
+            return
+
+        # Called from pytest_sessionfinish: a report problem must never fail the run
+        attached = 0
+        if AllureResults.is_active():
+            try:
+                items = []
+                for profile in profiles:
+                    source = AllureResults.write_attachment(StepProfiler.render_flame(profile), "txt")
+                    items.append((profile["node_id"], {"name": "⏱️ Step Timings", "source": source, "type": "text/plain"}))
+                attached = AllureResults.inject_attachments(items)
+            except OSError as e:
+                StepProfiler.logger.warning(f"Step Timings not attached: {e}")
+
+        try:
+            os.makedirs(StepProfiler.RESULTS_DIR, exist_ok=True)
+            worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+            with open(os.path.join(StepProfiler.RESULTS_DIR, f"worker_{worker}.json"), "w") as f:
+                json.dump([StepProfiler._summarize(p) for p in profiles], f, indent=2)
+        except OSError as e:
+            StepProfiler.logger.warning(f"Step profile part not written: {e}")
+        StepProfiler.logger.info(f"⏱️ Step profiles: {len(profiles)} tests, {attached} attached")
+
+    @staticmethod
+    def reset_run():
+        """Master, before workers start: drop the parts of the previous run."""
+        if not os.path.isdir(StepProfiler.RESULTS_DIR):
+            return
+        for name in os.listdir(StepProfiler.RESULTS_DIR):
+            if name.startswith("worker_") and name.endswith(".json"):
+                os.remove(os.path.join(StepProfiler.RESULTS_DIR, name))
+
+    @staticmethod
+    def merge_run():
+        """Master session end: one run_profile.json out of every worker part."""
+        if not os.path.isdir(StepProfiler.RESULTS_DIR):
+            return None
+
+        tests = []
+        for name in sorted(os.listdir(StepProfiler.RESULTS_DIR)):
+            if name.startswith("worker_") and name.endswith(".json"):
+                with open(os.path.join(StepProfiler.RESULTS_DIR, name), "r") as f:
+                    tests.extend(json.load(f))
+        if not tests:
+            return None
+
+        categories = {}
+        for test in tests:
+            for category, ms in test["categories"].items():
+                categories[category] = round(categories.get(category, 0.0) + ms, 1)
+        steps = [step for test in tests for step in test["slowest_steps"]]
+
+        run = {
+            "tests": len(tests),
+            "total_ms": round(sum(t["duration_ms"] for t in tests), 1),
+            "budget_exceeded": [t["node_id"] for t in tests if t["budget_exceeded"]],
+            "categories": dict(sorted(categories.items(), key=lambda item: -item[1])),
+            "slowest_tests": sorted(
+                ({"node_id": t["node_id"], "duration_ms": t["duration_ms"]} for t in tests),
+                key=lambda t: -t["duration_ms"]
+            )[:StepProfiler.TOP_N],
+            "slowest_steps": sorted(steps, key=lambda s: -s["self_ms"])[:StepProfiler.TOP_N],
+        }
+        path = os.path.join(StepProfiler.RESULTS_DIR, "run_profile.json")
+        with open(path, "w") as f:
+            json.dump(run, f, indent=2)
+        StepProfiler.logger.info(f"⏱️ Run profile written: {path}")
+        return run
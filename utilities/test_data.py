@@ -1,11 +1,13 @@
+from typing import ClassVar
+
 class TestData:
-    VALID_USERS = [
+    VALID_USERS: ClassVar[list] = [
         ("standard_user", "secret_sauce"),
         ("problem_user", "secret_sauce"),
         ("performance_glitch_user", "secret_sauce")
     ]
     
-    INVALID_LOGIN_DATA = [
+    INVALID_LOGIN_DATA: ClassVar[list] = [
         ("locked_out_user", "secret_sauce", "LOCKED"),
         ("standard_user", "wrong_password", "INVALID"),
         ("not_exist_user", "secret_sauce", "INVALID")
@@ -1,10 +1,11 @@
 import os
 import json
 import fcntl
-import glob
 import logging
+import time
 import docker
 from docker.errors import NotFound
+from utilities.allure_results import AllureResults
 
 class VideoManager:
     """
@@ -12,11 +13,14 @@ class VideoManager:
     1. No Time/Sleep.
     2. No API/Request polling.
     3. Waits for Docker 'destroy' event instead of just Process Exit.
+    4. One shared event subscription for every container in the manifest (resolved as a set).
     This guarantees that code execution is blocked 100% until Selenoid cleanup is complete.
     """
     
-    ALLURE_RESULTS_DIR = "/app/allure-results"
+    ALLURE_RESULTS_DIR = AllureResults.RESULTS_DIR
     CLEANUP_MANIFEST = os.path.join(ALLURE_RESULTS_DIR, "cleanup_manifest.jsonl")
+    # Overall upper bound for waiting on 'destroy' events at session finish (seconds)
+    CLEANUP_DEADLINE = int(os.getenv("VIDEO_CLEANUP_TIMEOUT", "120"))
     logger = logging.getLogger("VideoManager")
 
     @staticmethod
@@ -52,84 +56,102 @@ class VideoManager:
             VideoManager.logger.error(f"Manifest Error: {e}")
 
     @staticmethod
-    def _match_json_to_test(json_data, target_node_id):
-        full_name = json_data.get("fullName", "")
-        norm_target = target_node_id.replace("/", ".").replace("::", ".")
-        if full_name and full_name in norm_target:
-            return True
-        if json_data.get("name", "") in target_node_id:
-            return True
-        return False
+    def inject_videos(entries):
+        """
+        Batch injection of 'keep' entries (indexed lookup, each result file rewritten once).
+        """
+        items = [
+            (entry.get("node_id", ""), {"name": "Test Video", "source": entry.get("video"), "type": "video/mp4"})
+            for entry in entries
+        ]
+        return AllureResults.inject_attachments(items)
 
     @staticmethod
     def inject_video(node_id, video_filename):
-        json_files = glob.glob(os.path.join(VideoManager.ALLURE_RESULTS_DIR, "*-result.json"))
-        for json_file in json_files:
-            try:
-                with open(json_file, "r+") as f:
-                    data = json.load(f)
-                    if VideoManager._match_json_to_test(data, node_id):
-                        video_att = {"name": "Test Video", "source": video_filename, "type": "video/mp4"}
-                        target_step = data.get("afters", [])[-1] if data.get("afters") else data
-                        
-                        if "attachments" not in target_step:
-                            target_step["attachments"] = []
-                        
-                        if not any(a['source'] == video_filename for a in target_step.get("attachments", [])):
-                             if isinstance(target_step, list):
-                                 data.setdefault("attachments", []).append(video_att)
-                             else:
-                                 target_step["attachments"].append(video_att)
-                        
-                        f.seek(0)
-                        json.dump(data, f, indent=4)
-                        f.truncate()
-                        return
-            except Exception:
-                continue
+        VideoManager.inject_videos([{"node_id": node_id, "video": video_filename}])
 
     @staticmethod
-    def _block_until_container_removed(container_id):
+    def _wait_for_containers_removed(container_ids, on_removed):
         """
-        [INDUSTRIAL STANDARD]
-        Does not wait for 'Process Exit' only.
-        Locks code execution until 'destroy' (full removal) signal is received from Docker Daemon.
-        This ensures Python never says 'Done' before Selenoid says 'REMOVED'.
+        [SHARED EVENT SUBSCRIPTION]
+        Opens ONE Docker event stream for all manifest containers and resolves them as a set.
+        - on_removed(container_id) is called as soon as a container is confirmed gone.
+        - Containers that are already gone are resolved immediately.
+        - The stream is bounded by CLEANUP_DEADLINE (Docker closes it at 'until').
+        Returns the set of container IDs still pending when the deadline hit.
         """
-        if not container_id:
-            return
-        client = docker.from_env()
-        
-        try:
-            # 1. Check if container still exists
-            try:
-                container = client.containers.get(container_id)
-            except NotFound:
-                # If already deleted, no need to wait
-                VideoManager.logger.info(f"✅ Container already gone: {container_id[:12]}")
-                return
+        pending = set(container_ids)
+        if not pending:
+            return pending
 
-            VideoManager.logger.info(f"⏳ Awaiting Full Deletion (Event Listener): {container_id[:12]}")
+        try:
+            client = docker.from_env()
+        except Exception as e:
+            VideoManager.logger.warning(f"Docker Client Error: {e}")
+            return pending
 
-            # 2. First wait for Exit (Just to be safe)
-            container.wait() 
+        start = int(time.time())
+        deadline = start + VideoManager.CLEANUP_DEADLINE
+        event_stream = None
 
-            # 3. THE MAIN EVENT: Listen for 'destroy' signal
-            # This process consumes no CPU, waits for push notification over network socket.
+        try:
+            # 1. Subscribe FIRST ('since' replays anything that happens during the existence check)
             event_stream = client.events(
-                filters={'container': container_id, 'event': 'destroy'}, 
+                since=start,
+                until=deadline,
+                filters={"type": "container", "event": "destroy", "container": list(pending)},
                 decode=True
             )
-            
-            # This loop won't spin; it waits right there until Docker says "I deleted it".
-            for _ in event_stream:
-                VideoManager.logger.info(f"💣 Destroy Signal Received: {container_id[:12]}")
-                break # Event received, lock released.
-
-        except NotFound:
-            pass # Race condition: Deleted before we started listening.
+
+            # 2. Containers that are already gone do not need to wait for an event
+            for c_id in list(pending):
+                try:
+                    client.containers.get(c_id)
+                except NotFound:
+                    VideoManager.logger.info(f"✅ Container already gone: {c_id[:12]}")
+                    pending.discard(c_id)
+                    on_removed(c_id)
+
+            if pending:
+                VideoManager.logger.info(f"⏳ Awaiting Full Deletion (Event Listener): {len(pending)} container(s)")
+
+            # 3. THE MAIN EVENT: one stream, every 'destroy' resolves one member of the set
+            for event in event_stream if pending else ():
+                c_id = event.get("id") or event.get("Actor", {}).get("ID")
+                matched = next((p for p in pending if c_id and c_id.startswith(p)), None)
+                if matched is None:
+                    continue
+                VideoManager.logger.info(f"💣 Destroy Signal Received: {matched[:12]}")
+                pending.discard(matched)
+                on_removed(matched)
+                if not pending:
+                    break
+
         except Exception as e:
             VideoManager.logger.warning(f"Event Wait Error: {e}")
+        finally:
+            if event_stream is not None:
+                try:
+                    event_stream.close()
+                except Exception:
+                    pass
+            client.close()
+
+        return pending
+
+    @staticmethod
+    def _process_entry(entry, stats):
+        f_path = os.path.join(VideoManager.ALLURE_RESULTS_DIR, entry.get("video"))
+        if entry.get("action") == "keep":
+            # Injected in one batch after the waiting phase (each result file rewritten once)
+            stats["keep"].append(entry)
+        elif entry.get("action") == "delete":
+            if os.path.exists(f_path):
+                try:
+                    os.remove(f_path)
+                    stats["deleted"] += 1
+                except Exception:
+                    pass
 
     @staticmethod
     def post_process_cleanup():
@@ -148,27 +170,35 @@ class VideoManager:
         except Exception:
             pass
 
-        # 1. Waiting Phase (Destroy Event)
-        unique_containers = {e.get("container_id") for e in manifest_entries if e.get("container_id")}
-        for c_id in unique_containers:
-            VideoManager._block_until_container_removed(c_id)
-
-        # 2. Processing Phase
-        processed = 0
-        deleted = 0
+        # Group videos by their container; entries without a container have nothing to wait for
+        entries_by_container = {}
+        stats = {"keep": [], "deleted": 0}
         for entry in manifest_entries:
-            f_path = os.path.join(VideoManager.ALLURE_RESULTS_DIR, entry.get("video"))
-            if entry.get("action") == "keep":
-                VideoManager.inject_video(entry.get("node_id"), entry.get("video"))
-                processed += 1
-            elif entry.get("action") == "delete":
-                if os.path.exists(f_path):
-                    try:
-                        os.remove(f_path)
-                        deleted += 1
-                    except Exception:
-                        pass
+            c_id = entry.get("container_id")
+            if c_id:
+                entries_by_container.setdefault(c_id, []).append(entry)
+            else:
+                VideoManager._process_entry(entry, stats)
+
+        def on_removed(c_id):
+            for entry in entries_by_container.pop(c_id, []):
+                VideoManager._process_entry(entry, stats)
+
+        # 1. Waiting + Processing Phase (single shared 'destroy' subscription)
+        timed_out = VideoManager._wait_for_containers_removed(entries_by_container.keys(), on_removed)
+
+        # 2. Deadline hit: process what is left so the report is not missing entries
+        if timed_out:
+            VideoManager.logger.warning(
+                f"⚠️ Cleanup deadline ({VideoManager.CLEANUP_DEADLINE}s) reached. "
+                f"Processing {len(timed_out)} container(s) without destroy signal."
+            )
+            for c_id in timed_out:
+                on_removed(c_id)
+
+        # 3. Injection Phase (indexed, batched)
+        processed = VideoManager.inject_videos(stats["keep"])
 
         if os.path.exists(VideoManager.CLEANUP_MANIFEST):
             os.remove(VideoManager.CLEANUP_MANIFEST)
-        VideoManager.logger.info(f"✅ Done. Added to Report: {processed} | Deleted: {deleted}")
\ No newline at end of file
+        VideoManager.logger.info(f"✅ Done. Added to Report: {processed} | Deleted: {stats['deleted']}")
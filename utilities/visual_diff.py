@@ -0,0 +1,130 @@
+import os
+import math
+import hashlib
+import numpy as np
+from PIL import Image
+
+class VisualDiff:
+    """
+    [LOCAL PRE-FILTER] AI'dan önce hızlı yerel karşılaştırma.
+    1. Algısal hash (dHash): sayfa tamamen farklıysa bant analizi atlanır, tam görsel gönderilir.
+    2. NumPy ile bant bazlı piksel farkı: yalnızca değişen yatay bantlar bulunur.
+    3. Onaylı baseline: hatasız geçen son canlı ekran görüntüsü saklanır; sayfa o günden beri
+       değişmediyse model çağrısı tamamen atlanır.
+    Bölgeler normalize (0-1) y aralıklarıdır; ReportHelper'daki y_start/y_end sözleşmesiyle aynı.
+    """
+
+    WORK_WIDTH = 512
+    BAND_HEIGHT = int(os.getenv("VISUAL_DIFF_BAND_HEIGHT", "32"))           # çalışma çözünürlüğünde px
+    PIXEL_TOLERANCE = int(os.getenv("VISUAL_DIFF_PIXEL_TOLERANCE", "16"))   # 0-255 gri fark eşiği
+    BAND_RATIO = float(os.getenv("VISUAL_DIFF_BAND_RATIO", "0.002"))        # bantta değişen piksel oranı
+    PHASH_MAX_DISTANCE = int(os.getenv("VISUAL_PHASH_MAX_DISTANCE", "24"))  # 64 bit üzerinden
+    FULL_IMAGE_RATIO = 0.6  # değişen alan bundan büyükse bant kırpmaya değmez
+    ASPECT_TOLERANCE = 0.02 # en/boy oranları bundan fazla farklıysa aynı y aralıkları aynı içeriği göstermez
+    BASELINE_DIR = "temp/visual_baselines"
+
+    @staticmethod
+    def dhash(img, hash_size=8):
+        small = np.asarray(
+            img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR),
+            dtype=np.int16
+        )
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    @staticmethod
+    def _gray(img, size):
+        return np.asarray(img.convert("L").resize(size, Image.Resampling.BILINEAR), dtype=np.int16)
+
+    @staticmethod
+    def compare(reference, candidate):
+        """
+        Döner: {"match": bool, "regions": [(y_start, y_end), ...] | None, "distance": int}
+        regions=None -> tam görsel gönderilmeli.
+        """
+        distance = bin(VisualDiff.dhash(reference) ^ VisualDiff.dhash(candidate)).count("1")
+        if distance > VisualDiff.PHASH_MAX_DISTANCE:
+            return {"match": False, "regions": None, "distance": distance}
+
+        # Orantısız yerleşim: normalize bantlar iki görselde farklı yerlere denk gelir -> tam görsel
+        ref_aspect = reference.height / reference.width
+        cand_aspect = candidate.height / candidate.width
+        if abs(ref_aspect - cand_aspect) > VisualDiff.ASPECT_TOLERANCE * ref_aspect:
+            return {"match": False, "regions": None, "distance": distance}
+
+        width = VisualDiff.WORK_WIDTH
+        height = max(1, round(width * reference.height / reference.width))
+        band = VisualDiff.BAND_HEIGHT
+        n_bands = math.ceil(height / band)
+
+        # Vektörize fark: (bant, satır, sütun) -> bant başına değişen piksel oranı
+        changed = np.zeros((n_bands * band, width), dtype=bool)
+        changed[:height] = np.abs(
+            VisualDiff._gray(reference, (width, height)) - VisualDiff._gray(candidate, (width, height))
+        ) > VisualDiff.PIXEL_TOLERANCE
+        ratios = changed.reshape(n_bands, band, width).mean(axis=(1, 2))
+        dirty = np.flatnonzero(ratios > VisualDiff.BAND_RATIO)
+
+        if dirty.size == 0:
+            return {"match": True, "regions": [], "distance": distance}
+
+        # Komşu bantları birleştir (+1 bant bağlam payı)
+        regions = []
+        for b in dirty:
+            start, end = max(0, b - 1), min(n_bands, b + 2)
+            if regions and start <= regions[-1][1]:
+                regions[-1][1] = max(regions[-1][1], end)
+            else:
+                regions.append([start, end])
+
+        regions = [(s * band / height, min(1.0, e * band / height)) for s, e in regions]
+        if sum(e - s for s, e in regions) > VisualDiff.FULL_IMAGE_RATIO:
+            return {"match": False, "regions": None, "distance": distance}
+        return {"match": False, "regions": regions, "distance": distance}
+
+    @staticmethod
+    def stack_bands(img, regions):
+        """Değişen bantları alt alta dizer (önceden ayrılmış tek tampon)."""
+        crops = [img.crop((0, int(img.height * s), img.width, int(img.height * e))) for s, e in regions]
+        stacked = Image.new(img.mode, (img.width, sum(c.height for c in crops)))
+        offset = 0
+        for crop in crops:
+            stacked.paste(crop, (0, offset))
+            offset += crop.height
+        return stacked
+
+    @staticmethod
+    def _to_full(y, regions):
+        """Dizilmiş görseldeki normalize y -> tam sayfadaki normalize y."""
+        pos = min(max(float(y), 0.0), 1.0) * sum(e - s for s, e in regions)
+        for s, e in regions:
+            if pos <= e - s:
+                return s + pos
+            pos -= e - s
+        return regions[-1][1]
+
+    @staticmethod
+    def map_errors(errors, regions):
+        for err in errors:
+            err["y_start"] = VisualDiff._to_full(err.get("y_start", 0), regions)
+            err["y_end"] = VisualDiff._to_full(err.get("y_end", 0), regions)
+        return errors
+
+    # --- APPROVED BASELINES ---
+    @staticmethod
+    def baseline_key(figma_bytes):
+        return hashlib.sha256(figma_bytes).hexdigest()[:16]
+
+    @staticmethod
+    def load_baseline(key):
+        path = os.path.join(VisualDiff.BASELINE_DIR, f"{key}.png")
+        return Image.open(path) if os.path.exists(path) else None
+
+    @staticmethod
+    def save_baseline(key, live_bytes):
+        os.makedirs(VisualDiff.BASELINE_DIR, exist_ok=True)
+        path = os.path.join(VisualDiff.BASELINE_DIR, f"{key}.png")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(live_bytes)
+        os.replace(tmp_path, path)
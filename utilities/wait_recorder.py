@@ -0,0 +1,57 @@
+import logging
+import threading
+import allure
+from typing import ClassVar
+from allure_commons.types import AttachmentType
+
+class WaitRecorder:
+    """
+    [WAIT TIMINGS] Records how long every BasePage wait really took.
+    - Per test: one "Wait Timings" attachment (slowest first), reset for the next lease.
+    - Per worker: totals by wait name, logged at session end (where the suite spends its time).
+    One recorder lives on each driver session (like ScreenshotPolicy).
+    """
+
+    _totals: ClassVar[dict] = {}  # name -> [count, total_ms, timeouts]
+    _totals_lock = threading.Lock()
+    logger = logging.getLogger("WaitRecorder")
+
+    def __init__(self):
+        self.entries = []
+
+    @staticmethod
+    def for_driver(driver):
+        recorder = getattr(driver, "wait_recorder", None)
+        if recorder is None:
+            recorder = WaitRecorder()
+            driver.wait_recorder = recorder
+        return recorder
+
+    def record(self, name, duration_ms, ok, detail=""):
+        self.entries.append((name, duration_ms, ok, detail))
+        with WaitRecorder._totals_lock:
+            total = WaitRecorder._totals.setdefault(name, [0, 0.0, 0])
+            total[0] += 1
+            total[1] += duration_ms
+            total[2] += 0 if ok else 1
+
+    def finish(self):
+        """Test end: attach this test's waits, reset for the next lease."""
+        if self.entries:
+            lines = [
+                f"{duration_ms:8.0f}ms  {'ok     ' if ok else 'timeout'}  {name}  {detail}".rstrip()
+                for name, duration_ms, ok, detail in sorted(self.entries, key=lambda e: -e[1])
+            ]
+            total_ms = sum(e[1] for e in self.entries)
+            lines.append(f"{total_ms:8.0f}ms  total ({len(self.entries)} waits)")
+            allure.attach("\n".join(lines), name="Wait Timings", attachment_type=AttachmentType.TEXT)
+        self.entries = []
+
+    @staticmethod
+    def log_run_summary():
+        with WaitRecorder._totals_lock:
+            totals = sorted(WaitRecorder._totals.items(), key=lambda item: -item[1][1])
+        for name, (count, total_ms, timeouts) in totals:
+            WaitRecorder.logger.info(
+                f"⏳ {name}: {count}x | total {total_ms / 1000:.1f}s | avg {total_ms / count:.0f}ms | timeouts: {timeouts}"
+            )